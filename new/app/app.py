@@ -1,13 +1,18 @@
 import reflex as rx
+from starlette.applications import Starlette
+from starlette.routing import Route
 from app.components.sidebar import sidebar
 from app.components.property_form import property_form
-from app.components.analysis_card import analysis_card
+from app.components.bulk_upload import bulk_upload
+from app.components.analysis_history import analysis_history
 from app.components.loan_calculator import loan_calculator_page
 from app.components.chat_interface import chat_page
 from app.components.status_bar import status_bar
 from app.states.state import PropMateState
 from app.states.loan_state import LoanState
 from app.states.chat_state import ChatState
+from app.services.metrics import metrics_endpoint
+from app.services.lifecycle import lifespan
 
 
 def index() -> rx.Component:
@@ -26,14 +31,8 @@ def index() -> rx.Component:
                 class_name="text-center",
             ),
             property_form(),
-            rx.el.div(
-                rx.el.h3(
-                    "Analysis History",
-                    class_name="text-2xl font-bold tracking-tight text-gray-900",
-                ),
-                rx.foreach(PropMateState.property_database, analysis_card),
-                class_name="space-y-4",
-            ),
+            bulk_upload(),
+            analysis_history(),
             class_name=(
                 "flex flex-1 flex-col gap-4 p-4 md:gap-8 md:p-6 "
                 "transition-all duration-200 ease-out motion-reduce:transition-none"
@@ -85,6 +84,8 @@ def chat() -> rx.Component:
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    # Prometheus scrape target alongside the Reflex backend routes.
+    api_transformer=Starlette(routes=[Route("/metrics", metrics_endpoint)]),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
@@ -94,6 +95,10 @@ app = rx.App(
         ),
     ],
 )
-app.add_page(index, on_load=LoanState.on_load_calculate)
-app.add_page(loans, on_load=LoanState.on_load_calculate)
-app.add_page(chat, on_load=ChatState.on_page_load)
\ No newline at end of file
+app.add_page(index, on_load=[LoanState.on_load_calculate, PropMateState.load_history])
+app.add_page(loans, on_load=[LoanState.on_load_calculate, LoanState.sync_emi_inputs])
+app.add_page(chat, on_load=ChatState.on_page_load)
+# Freeze settings, warm services and start the maintenance loops (loan offer
+# refresher, analysis flusher, comparables index) before serving; drain, stop
+# the loops and close on shutdown.
+app.register_lifespan_task(lifespan)
@@ -1,5 +1,5 @@
 import reflex as rx
-from app.states.state import Property
+from app.states.state import Comparable, Property
 
 
 def info_badge(icon: str, text: rx.Var, bg_color: str) -> rx.Component:
@@ -10,10 +10,23 @@ def info_badge(icon: str, text: rx.Var, bg_color: str) -> rx.Component:
     )
 
 
+def listing_chip(text) -> rx.Component:
+    return rx.el.span(
+        text, class_name="px-2 py-0.5 rounded-full bg-gray-100 text-xs text-gray-700"
+    )
+
+
 def tavily_result_card(result: dict) -> rx.Component:
+    # price/area/bedrooms are extracted from the snippet; absent on old entries.
     return rx.el.a(
         rx.el.div(
             rx.el.h5(result["title"], class_name="font-semibold text-blue-600"),
+            rx.el.div(
+                rx.cond(result["price_label"], listing_chip(result["price_label"])),
+                rx.cond(result["area"], listing_chip(result["area"].to(str) + " sqft")),
+                rx.cond(result["bedrooms"], listing_chip(result["bedrooms"].to(str) + " BHK")),
+                class_name="flex flex-wrap gap-1",
+            ),
             rx.el.p(result["content"], class_name="text-xs text-gray-600 line-clamp-2"),
             rx.el.p(
                 rx.el.span("Source: "),
@@ -32,6 +45,42 @@ def tavily_result_card(result: dict) -> rx.Component:
     )
 
 
+def comparable_row(comp: Comparable) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(comp["location"], class_name="py-1 pr-2 truncate"),
+        rx.el.td(comp["bedrooms"].to_string(), " BHK", class_name="py-1 pr-2"),
+        rx.el.td(comp["area"].to_string(), " sqft", class_name="py-1 pr-2"),
+        rx.el.td("₹ ", comp["price_per_sqft"].to_string(), "/sqft", class_name="py-1 text-right"),
+        class_name="border-t text-gray-700",
+    )
+
+
+def comparables_section(property: Property) -> rx.Component:
+    return rx.cond(
+        property["comparables"].length() > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h5("Comparables", class_name="font-semibold text-gray-800"),
+                rx.el.span(
+                    "₹/sqft p25 ",
+                    property["ppsf_p25"].to_string(),
+                    " · median ",
+                    property["ppsf_p50"].to_string(),
+                    " · p75 ",
+                    property["ppsf_p75"].to_string(),
+                    class_name="text-xs text-gray-500",
+                ),
+                class_name="flex flex-wrap items-baseline justify-between gap-2 mt-4 mb-2",
+            ),
+            rx.el.table(
+                rx.el.tbody(rx.foreach(property["comparables"], comparable_row)),
+                class_name="w-full text-xs table-fixed",
+            ),
+            aria_label="Comparable properties",
+        ),
+    )
+
+
 def analysis_card(property: Property) -> rx.Component:
     score_color = rx.cond(
         property["investment_score"] > 75,
@@ -91,6 +140,7 @@ def analysis_card(property: Property) -> rx.Component:
             ),
             class_name="grid md:grid-cols-2 gap-4 mt-4",
         ),
+        comparables_section(property),
         rx.cond(
             property["tavily_results"].length() > 0,
             rx.el.div(
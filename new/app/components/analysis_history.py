@@ -0,0 +1,66 @@
+import reflex as rx
+from app.components.analysis_card import analysis_card
+from app.states.state import PropMateState
+
+
+def pager_button(label: str, icon: str, on_click, disabled: rx.Var) -> rx.Component:
+    return rx.el.button(
+        rx.icon(icon, class_name="h-4 w-4"),
+        label,
+        type="button",
+        on_click=on_click,
+        disabled=disabled,
+        class_name=(
+            "flex items-center gap-1 px-3 py-1 text-sm font-medium border rounded-lg "
+            "hover:bg-gray-50 disabled:opacity-40 transition-colors duration-200 "
+            "motion-reduce:transition-none focus-visible:outline-none "
+            "focus-visible:ring-2 focus-visible:ring-teal-500"
+        ),
+    )
+
+
+def analysis_history() -> rx.Component:
+    """One page of analyses; older pages are fetched from the server-side store."""
+    first = PropMateState.history_offset + 1
+    last = PropMateState.history_offset + PropMateState.property_database.length()
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3(
+                "Analysis History",
+                class_name="text-2xl font-bold tracking-tight text-gray-900",
+            ),
+            rx.cond(
+                PropMateState.history_total > 0,
+                rx.el.span(
+                    first.to_string(),
+                    "–",
+                    last.to_string(),
+                    " of ",
+                    PropMateState.history_total.to_string(),
+                    class_name="text-sm text-gray-500",
+                ),
+            ),
+            class_name="flex items-baseline justify-between",
+        ),
+        rx.foreach(PropMateState.property_database, analysis_card),
+        rx.cond(
+            PropMateState.has_newer_history | PropMateState.has_older_history,
+            rx.el.nav(
+                pager_button(
+                    "Newer",
+                    "chevron-left",
+                    PropMateState.newer_history_page,
+                    ~PropMateState.has_newer_history,
+                ),
+                pager_button(
+                    "Older",
+                    "chevron-right",
+                    PropMateState.older_history_page,
+                    ~PropMateState.has_older_history,
+                ),
+                aria_label="Analysis history pages",
+                class_name="flex justify-between",
+            ),
+        ),
+        class_name="space-y-4",
+    )
@@ -0,0 +1,84 @@
+import reflex as rx
+from app.states.state import PropMateState
+
+
+UPLOAD_ID = "bulk_csv"
+
+
+def bulk_upload() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3("Bulk Analysis", class_name="text-lg font-semibold"),
+            rx.el.p(
+                "Upload a CSV with area, bedrooms, bathrooms, floor and location columns.",
+                class_name="text-sm text-gray-500",
+            ),
+            class_name="space-y-1",
+        ),
+        rx.upload.root(
+            rx.el.div(
+                rx.icon("upload", class_name="h-5 w-5 text-teal-600"),
+                rx.el.span(
+                    rx.cond(
+                        rx.selected_files(UPLOAD_ID).length() > 0,
+                        rx.selected_files(UPLOAD_ID)[0],
+                        "Drop a CSV here or click to choose",
+                    ),
+                    class_name="text-sm text-gray-600",
+                ),
+                class_name="flex items-center gap-2",
+            ),
+            id=UPLOAD_ID,
+            accept={"text/csv": [".csv"]},
+            max_files=1,
+            class_name="p-4 border-2 border-dashed rounded-lg cursor-pointer hover:bg-gray-50",
+        ),
+        rx.el.button(
+            rx.cond(
+                PropMateState.is_bulk_running,
+                rx.el.div(
+                    rx.spinner(class_name="h-4 w-4 mr-2", aria_hidden=True),
+                    "Analyzing portfolio...",
+                    class_name="flex items-center",
+                ),
+                "Analyze CSV",
+            ),
+            type="button",
+            on_click=PropMateState.handle_bulk_upload(rx.upload_files(upload_id=UPLOAD_ID)),
+            disabled=PropMateState.is_bulk_running,
+            aria_busy=PropMateState.is_bulk_running,
+            class_name=(
+                "w-full bg-teal-600 text-white font-semibold py-2 px-4 rounded-lg "
+                "hover:bg-teal-700 transition-colors duration-200 motion-reduce:transition-none "
+                "focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-teal-500 disabled:bg-gray-400"
+            ),
+        ),
+        rx.cond(
+            PropMateState.bulk_total > 0,
+            rx.el.div(
+                rx.el.progress(
+                    value=PropMateState.bulk_done,
+                    max=PropMateState.bulk_total,
+                    class_name="w-full h-2 accent-teal-600",
+                ),
+                rx.el.p(
+                    PropMateState.bulk_done.to_string(),
+                    " / ",
+                    PropMateState.bulk_total.to_string(),
+                    " properties analyzed",
+                    class_name="text-xs text-gray-500",
+                ),
+                role="status",
+                aria_live="polite",
+                class_name="space-y-1",
+            ),
+        ),
+        rx.foreach(
+            PropMateState.bulk_errors,
+            lambda err: rx.el.p(err, class_name="text-xs text-red-600"),
+        ),
+        class_name=(
+            "p-6 bg-white rounded-lg shadow-sm border border-gray-200 space-y-4 "
+            "transition-shadow duration-200 motion-reduce:transition-none"
+        ),
+    )
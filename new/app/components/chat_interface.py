@@ -20,6 +20,17 @@ def message_bubble(message: Message) -> rx.Component:
     )
 
 
+def streaming_bubble() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.markdown(ChatState.streaming_reply, class_name="prose text-sm"),
+            class_name="p-3 rounded-r-lg rounded-bl-lg bg-gray-200 text-gray-800",
+        ),
+        class_name="flex justify-start w-full",
+        aria_busy=True,
+    )
+
+
 def quick_question_button(question: str) -> rx.Component:
     return rx.el.button(
         question,
@@ -37,6 +48,7 @@ def chat_page() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.foreach(ChatState.messages, message_bubble),
+            rx.cond(ChatState.streaming_reply != "", streaming_bubble()),
             class_name="flex-1 p-4 space-y-4 overflow-y-auto scroll-smooth",
             role="log",
             aria_live="polite",
@@ -1,5 +1,101 @@
 import reflex as rx
-from app.states.loan_state import LoanState, LoanOffer
+from reflex.components.el.elements.forms import Input
+from reflex.event import EventHandler, no_args_event_spec
+from reflex.experimental.client_state import ClientStateVar
+from reflex.vars.base import Var, VarData
+from app.states.loan_state import (
+    INTEREST_RATE_INPUT,
+    LOAN_AMOUNT_INPUT,
+    TENURE_YEARS_INPUT,
+    LoanState,
+    LoanOffer,
+    ScenarioRow,
+    YearRow,
+)
+
+
+# Raw value of the input event, passed to client-state setters. Range inputs
+# otherwise get a `Number(...)` cast that the experimental setter mis-binds.
+_EVENT_VALUE = Var(_js_expr='_e?.["target"]?.["value"]')
+
+
+class RangeInput(Input):
+    """`<input>` with a pointer-up trigger, fired at the end of mouse, touch
+    and pen drags alike (touch drags never fire mouse-up)."""
+
+    on_pointer_up: EventHandler[no_args_event_spec]
+
+
+def _js(expr: str, *deps: Var) -> Var:
+    """A raw JS expression Var that carries the hooks/imports of `deps`."""
+    return Var(
+        _js_expr=expr,
+        _var_type=str,
+        _var_data=VarData.merge(*[d._get_all_var_data() for d in deps]),
+    )
+
+
+def client_emi_figures(
+    amount: ClientStateVar, years: ClientStateVar, rate: ClientStateVar
+) -> tuple[Var, Var, Var]:
+    """EMI, total interest and total payment computed in the browser.
+
+    Mirrors `loan_engine.emi` and formats like the server (`₹ 1,234,567`), so
+    dragging a slider re-renders locally without any websocket traffic.
+    """
+    a, y, r = amount.value, years.value, rate.value
+    calc = (
+        f"((P, r, n) => {{ const e = r === 0 ? P / n : "
+        f"P * r * Math.pow(1 + r, n) / (Math.pow(1 + r, n) - 1); "
+        f"return [e, Math.max(e * n - P, 0), e * n]; }})"
+        f"(Number({a}), Number({r}) / 1200, Math.max(Number({y}) * 12, 1))"
+    )
+
+    def inr(index: int) -> Var:
+        return _js(
+            f'("₹ " + Math.round({calc}[{index}]).toLocaleString("en-US"))', a, y, r
+        )
+
+    return inr(0), inr(1), inr(2)
+
+
+def client_slider_field(
+    label: str,
+    value: ClientStateVar,
+    on_commit: rx.event.EventHandler,
+    min_val: int,
+    max_val: int,
+    step: int,
+) -> rx.Component:
+    """Slider whose ticks only update client state; the final value is sent
+    to the server once, when the drag/keypress ends or focus leaves."""
+    commit = on_commit(value.value)
+    return rx.el.div(
+        rx.el.label(
+            label, " ( ", value.value, " )", class_name="font-medium text-gray-700"
+        ),
+        RangeInput.create(
+            type="range",
+            key=label,
+            # Controlled, so values pushed by `sync_emi_inputs` move the thumb.
+            value=value.value,
+            on_change=value.set_value(_EVENT_VALUE),
+            on_pointer_up=commit,
+            on_key_up=commit,
+            on_blur=commit,
+            min=min_val,
+            max=max_val,
+            step=step,
+            aria_valuemin=min_val,
+            aria_valuemax=max_val,
+            aria_valuenow=value.value,
+            class_name=(
+                "w-full h-2 bg-gray-200 rounded-lg appearance-none cursor-pointer accent-teal-600 "
+                "focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-teal-500"
+            ),
+        ),
+        class_name="space-y-2",
+    )
 
 
 def slider_field(
@@ -40,6 +136,85 @@ def emi_summary_card(label: str, value: rx.Var, bg_color: str) -> rx.Component:
     )
 
 
+def scenario_row(row: ScenarioRow) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["name"], class_name="py-1 pr-4 font-medium text-gray-900"),
+        rx.el.td(row["tenure"], class_name="py-1 pr-4"),
+        rx.el.td(row["total_interest"], class_name="py-1 pr-4"),
+        rx.el.td(row["interest_saved"], class_name="py-1 text-teal-700"),
+        class_name="border-t",
+    )
+
+
+def year_row(row: YearRow) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["year"], class_name="py-1 pr-4"),
+        rx.el.td(row["principal"], class_name="py-1 pr-4"),
+        rx.el.td(row["interest"], class_name="py-1 pr-4"),
+        rx.el.td(row["prepayment"], class_name="py-1 pr-4"),
+        rx.el.td(row["balance"], class_name="py-1"),
+        class_name="border-t",
+    )
+
+
+def table_head(*labels: str) -> rx.Component:
+    return rx.el.thead(
+        rx.el.tr(
+            *[
+                rx.el.th(label, class_name="py-1 pr-4 text-left font-medium text-gray-500")
+                for label in labels
+            ]
+        )
+    )
+
+
+def repayment_plan() -> rx.Component:
+    return rx.el.div(
+        rx.el.h3("Prepayment & Step-up Planner", class_name="text-xl font-semibold"),
+        rx.el.div(
+            slider_field(
+                "Annual Prepayment (₹)",
+                LoanState.annual_prepayment,
+                LoanState.set_annual_prepayment,
+                0,
+                2000000,
+                10000,
+            ),
+            slider_field(
+                "EMI Step-up (% per year)",
+                LoanState.step_up_pct,
+                LoanState.set_step_up_pct,
+                0,
+                15,
+                0.5,
+            ),
+            class_name="grid md:grid-cols-2 gap-6",
+        ),
+        rx.el.table(
+            table_head("Scenario", "Tenure", "Total Interest", "Interest Saved"),
+            rx.el.tbody(rx.foreach(LoanState.scenario_comparison, scenario_row)),
+            class_name="w-full text-sm text-gray-700",
+        ),
+        rx.el.details(
+            rx.el.summary(
+                "Year-by-year schedule", class_name="cursor-pointer font-medium text-gray-800"
+            ),
+            rx.el.div(
+                rx.el.table(
+                    table_head("Year", "Principal", "Interest", "Prepayment", "Balance"),
+                    rx.el.tbody(rx.foreach(LoanState.yearly_schedule, year_row)),
+                    class_name="w-full text-sm text-gray-700",
+                ),
+                class_name="max-h-80 overflow-y-auto mt-2",
+            ),
+        ),
+        class_name=(
+            "p-6 bg-white rounded-lg shadow-sm border space-y-6 "
+            "transition-shadow duration-200 motion-reduce:transition-none"
+        ),
+    )
+
+
 def loan_offer_card(offer: LoanOffer) -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -68,7 +243,13 @@ def loan_offer_card(offer: LoanOffer) -> rx.Component:
 
 
 def loan_calculator_page() -> rx.Component:
+    # Client-side copies of the EMI inputs, synced from the server on load.
+    amount, years, rate = LOAN_AMOUNT_INPUT, TENURE_YEARS_INPUT, INTEREST_RATE_INPUT
+    emi, total_interest, total_payment = client_emi_figures(amount, years, rate)
     return rx.el.div(
+        amount,
+        years,
+        rate,
         rx.el.div(
             rx.el.h1(
                 "Loan & EMI Calculator", class_name="text-3xl font-bold text-gray-900"
@@ -82,25 +263,25 @@ def loan_calculator_page() -> rx.Component:
             rx.el.div(
                 rx.el.h3("EMI Calculator", class_name="text-xl font-semibold mb-4"),
                 rx.el.div(
-                    slider_field(
+                    client_slider_field(
                         "Loan Amount (₹)",
-                        LoanState.loan_amount,
+                        amount,
                         LoanState.set_loan_amount,
                         100000,
                         20000000,
                         100000,
                     ),
-                    slider_field(
+                    client_slider_field(
                         "Loan Tenure (Years)",
-                        LoanState.tenure_years,
+                        years,
                         LoanState.set_tenure_years,
                         1,
                         30,
                         1,
                     ),
-                    slider_field(
+                    client_slider_field(
                         "Interest Rate (%)",
-                        LoanState.interest_rate,
+                        rate,
                         LoanState.set_interest_rate,
                         5.0,
                         15.0,
@@ -109,12 +290,12 @@ def loan_calculator_page() -> rx.Component:
                     class_name="space-y-6",
                 ),
                 rx.el.div(
-                    emi_summary_card("Monthly EMI", LoanState.emi, "bg-teal-100"),
+                    emi_summary_card("Monthly EMI", emi, "bg-teal-100"),
                     emi_summary_card(
-                        "Total Interest", LoanState.total_interest, "bg-orange-100"
+                        "Total Interest", total_interest, "bg-orange-100"
                     ),
                     emi_summary_card(
-                        "Total Payment", LoanState.total_payment, "bg-blue-100"
+                        "Total Payment", total_payment, "bg-blue-100"
                     ),
                     class_name="grid md:grid-cols-3 gap-4 mt-8",
                 ),
@@ -149,6 +330,14 @@ def loan_calculator_page() -> rx.Component:
                         ),
                     class_name="flex justify-between items-center mb-4",
                 ),
+                rx.cond(
+                    LoanState.loan_offers.length() > 0,
+                    rx.el.p(
+                        LoanState.loan_offers_age_label,
+                        class_name="text-xs text-gray-500 -mt-2 mb-4",
+                        aria_live="polite",
+                    ),
+                ),
                 rx.cond(
                     LoanState.is_fetching_loans,
                     rx.el.div(
@@ -178,5 +367,6 @@ def loan_calculator_page() -> rx.Component:
             ),
             class_name="grid lg:grid-cols-2 gap-8",
         ),
+        repayment_plan(),
         class_name="space-y-8",
     )
\ No newline at end of file
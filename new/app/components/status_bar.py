@@ -20,6 +20,7 @@ def status_bar() -> rx.Component:
             metric("Web", PropMateState.last_web_fetch_duration_ms.to_string() + " ms", "globe"),
             metric("Loans", LoanState.last_fetch_duration_ms.to_string() + " ms", "landmark"),
             metric("Chat", ChatState.last_chat_duration_ms.to_string() + " ms", "message-square"),
+            metric("First token", ChatState.last_chat_ttft_ms.to_string() + " ms", "zap"),
             class_name="flex flex-wrap gap-2 items-center",
         ),
         aria_label="Performance metrics",
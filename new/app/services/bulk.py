@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+from typing import AsyncIterator, Awaitable, Callable, Sequence, TypeVar
+
+from .valuation import predict_many
+
+
+REQUIRED_COLUMNS = ("area", "bedrooms", "bathrooms", "floor", "location")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def parse_property_csv(
+    data: bytes | str, max_rows: int = 5000
+) -> tuple[list[dict], list[str]]:
+    """Parse an uploaded portfolio CSV into property rows.
+
+    Column names are matched case-insensitively. Invalid rows are skipped and
+    reported, so one bad line does not reject the whole upload.
+
+    Returns:
+        (rows, errors), rows having int area/bedrooms/bathrooms/floor and a
+        str location.
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    reader = csv.DictReader(io.StringIO(text))
+    fields = {(f or "").strip().lower(): f for f in (reader.fieldnames or [])}
+    missing = [c for c in REQUIRED_COLUMNS if c not in fields]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+    rows: list[dict] = []
+    errors: list[str] = []
+    for line_no, rec in enumerate(reader, start=2):
+        if len(rows) >= max_rows:
+            errors.append(f"Stopped after {max_rows} rows.")
+            break
+        try:
+            row = {
+                c: int(float(rec[fields[c]] or 0))
+                for c in REQUIRED_COLUMNS
+                if c != "location"
+            }
+        except (TypeError, ValueError):
+            errors.append(f"Line {line_no}: non-numeric area/bedrooms/bathrooms/floor.")
+            continue
+        if row["area"] <= 0:
+            errors.append(f"Line {line_no}: area must be positive.")
+            continue
+        row["location"] = (rec[fields["location"]] or "").strip()
+        rows.append(row)
+    return rows, errors
+
+
+def value_rows(rows: Sequence[dict], batch_size: int = 512) -> list[int]:
+    """Predicted values for every row, in vectorized batches."""
+    values: list[int] = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        values.extend(int(v) for v in predict_many(batch))
+    return values
+
+
+async def map_bounded(
+    items: Sequence[T],
+    fn: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+) -> AsyncIterator[tuple[int, R | BaseException]]:
+    """Run `fn` over items with at most `concurrency` in flight.
+
+    Yields (index, result) in completion order; a failed call yields its
+    exception instead of aborting the rest.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(i: int, item: T) -> tuple[int, R | BaseException]:
+        async with sem:
+            try:
+                return i, await fn(item)
+            except Exception as e:
+                return i, e
+
+    tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(items)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
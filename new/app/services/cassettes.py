@@ -0,0 +1,244 @@
+"""Record and replay upstream exchanges (`PROPMATE_UPSTREAM_MODE`).
+
+In `record` mode each successful Tavily and OpenAI response is stored in a
+SQLite cassette, keyed by its normalized request. In `replay` mode requests
+are answered from the cassette without any network, rate limiting or
+retries; a request that was never recorded raises `CassetteMissError`.
+`live`, the default, does neither.
+
+Requests are normalized before keying: headers (and with them API keys) are
+never stored, JSON keys are sorted and whitespace in strings is collapsed.
+Responses are reduced to the fields the clients read and stored zlib
+compressed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from .errors import CassetteMissError
+from .settings import get_cassette_db_path, get_upstream_mode
+
+
+def normalize_request(value: Any) -> Any:
+    """Canonical form of a JSON request body: sorted keys, collapsed whitespace."""
+    if isinstance(value, dict):
+        return {k: normalize_request(value[k]) for k in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [normalize_request(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def cassette_key(upstream: str, endpoint: str, request: dict) -> str:
+    canonical = json.dumps(
+        [upstream, endpoint, normalize_request(request)],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(
+        json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    )
+
+
+def _unpack(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class CassetteStore:
+    """SQLite store of recorded exchanges, with an in-memory read cache.
+
+    Safe to share between threads; WAL lets several workers record at once.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._memo: dict[str, Any] = {}
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS exchanges ("
+                "key TEXT PRIMARY KEY, upstream TEXT NOT NULL, endpoint TEXT NOT NULL, "
+                "request BLOB NOT NULL, response BLOB NOT NULL, recorded_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memo:
+                self.hits += 1
+                return self._memo[key]
+            row = self._conn.execute(
+                "SELECT response FROM exchanges WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            value = self._memo[key] = _unpack(row[0])
+        return value
+
+    def put(self, key: str, upstream: str, endpoint: str, request: dict, response: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO exchanges "
+                "(key, upstream, endpoint, request, response, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    upstream,
+                    endpoint,
+                    _pack(normalize_request(request)),
+                    _pack(response),
+                    time.time(),
+                ),
+            )
+            self._memo[key] = response
+            self.recorded += 1
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[CassetteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_cassette_store() -> CassetteStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CassetteStore(get_cassette_db_path())
+    return _store
+
+
+def reset_cassette_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+def _identity(response: Any) -> Any:
+    return response
+
+
+def _replay(upstream: str, endpoint: str, request: dict) -> Any:
+    response = get_cassette_store().get(cassette_key(upstream, endpoint, request))
+    if response is None:
+        raise CassetteMissError(
+            f"No recorded {upstream} response for this request (PROPMATE_UPSTREAM_MODE=replay)."
+        )
+    return response
+
+
+def exchange(
+    upstream: str,
+    endpoint: str,
+    request: dict,
+    fetch: Callable[[], Any],
+    compact: Callable[[Any], Any] = _identity,
+) -> Any:
+    """Run `fetch()` for `request` according to the upstream mode.
+
+    Args:
+        upstream: Upstream name, part of the key.
+        endpoint: Path of the endpoint, part of the key (not the base URL,
+            so recordings replay against any host).
+        request: JSON body sent upstream.
+        fetch: Makes the live call and returns the decoded response.
+        compact: Reduces a response to what the caller reads before storing.
+
+    Raises:
+        CassetteMissError: In replay mode, for a request never recorded.
+    """
+    mode = get_upstream_mode()
+    if mode == "replay":
+        return _replay(upstream, endpoint, request)
+    response = fetch()
+    if mode == "record":
+        response = compact(response)
+        get_cassette_store().put(
+            cassette_key(upstream, endpoint, request), upstream, endpoint, request, response
+        )
+    return response
+
+
+async def exchange_async(
+    upstream: str,
+    endpoint: str,
+    request: dict,
+    fetch: Callable[[], Awaitable[Any]],
+    compact: Callable[[Any], Any] = _identity,
+) -> Any:
+    """Async counterpart of `exchange`; `fetch()` returns an awaitable."""
+    mode = get_upstream_mode()
+    if mode == "replay":
+        return _replay(upstream, endpoint, request)
+    response = await fetch()
+    if mode == "record":
+        response = compact(response)
+        get_cassette_store().put(
+            cassette_key(upstream, endpoint, request), upstream, endpoint, request, response
+        )
+    return response
+
+
+async def exchange_stream(
+    upstream: str,
+    endpoint: str,
+    request: dict,
+    stream: Callable[[], AsyncIterator[str]],
+) -> AsyncIterator[str]:
+    """Streaming counterpart of `exchange`, for text deltas.
+
+    Only streams read to the end are recorded; replay yields the recorded
+    deltas back to back.
+    """
+    mode = get_upstream_mode()
+    if mode == "replay":
+        for delta in _replay(upstream, endpoint, request)["deltas"]:
+            yield delta
+        return
+    deltas: list[str] = []
+    agen = stream()
+    try:
+        async for delta in agen:
+            if mode == "record":
+                deltas.append(delta)
+            yield delta
+    finally:
+        await agen.aclose()
+    if mode == "record":
+        get_cassette_store().put(
+            cassette_key(upstream, endpoint, request),
+            upstream,
+            endpoint,
+            request,
+            {"deltas": deltas},
+        )
@@ -0,0 +1,278 @@
+"""Semantic cache in front of the chat reply functions.
+
+Near-duplicate questions (the quick-question buttons, re-asked or reworded
+queries) are answered from memory instead of another OpenAI round trip.
+Queries are embedded locally with a signed hashing vectorizer over word
+unigrams and bigrams (no model, no network) and compared by cosine
+similarity with the cached queries in a NumPy matrix. A cached reply answers
+a new query when:
+
+- its context key matches: the model, the conversation so far (as compacted
+  for the request) and the figures in the query (`3 bhk`, `90l`), so replies
+  are never reused under a different history or different numbers; and
+- the queries' similarity is at least `PROPMATE_CHAT_CACHE_THRESHOLD`.
+
+Entries expire after `PROPMATE_CHAT_CACHE_TTL` seconds; past
+`PROPMATE_CHAT_CACHE_SIZE` entries the least recently used is evicted.
+Errors and streams that were not read to the end are never cached.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Optional
+
+from .cache import CacheStats
+from .chat_history import compact_history
+from .lazy import lazy_import
+from .metrics import timed
+from .openai_client import (
+    generate_chat_reply,
+    generate_chat_reply_async,
+    stream_chat_reply_async,
+)
+from .search_cache import normalize_query
+from .settings import (
+    get_chat_cache_size,
+    get_chat_cache_threshold,
+    get_chat_cache_ttl,
+    get_openai_model,
+)
+from .tracing import span
+
+np = lazy_import("numpy")
+
+
+# Width of the hashed feature space.
+DIM = 1 << 11
+_TOKEN = re.compile(r"\w+")
+# Filler that rewording adds or drops without changing the question.
+_STOPWORDS = frozenset(
+    "a about an and any are be can could do does for give i is it me my of on or "
+    "please s show tell that the there this to what whats which with would you".split()
+)
+
+_cache: Optional[SemanticCache] = None
+_enabled: Optional[bool] = None
+_init_lock = threading.Lock()
+
+
+def _words(query: str) -> list[str]:
+    return _TOKEN.findall(normalize_query(query))
+
+
+def embed(query: str) -> np.ndarray:
+    """L2-normalized hashed bag of words and word pairs, `DIM` wide (float32)."""
+    words = [w for w in _words(query) if w not in _STOPWORDS]
+    vector = np.zeros(DIM, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        # crc32 is stable across processes; its top bit picks the sign.
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % DIM] += -1.0 if h & 0x80000000 else 1.0
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def context_key(query: str, history: list[dict] | None = None) -> str:
+    """What must match for a cached reply to be reused, besides the query's meaning."""
+    figures = sorted(w for w in _words(query) if any(c.isdigit() for c in w))
+    context = [
+        (m["role"], m["content"]) for m in compact_history(history, query)
+    ]
+    blob = json.dumps(
+        [get_openai_model(), figures, context], separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """Thread-safe LRU cache of replies, looked up by query similarity within a context.
+
+    Args:
+        maxsize: Max entries; the least recently used entry is evicted past it.
+        ttl: Time-to-live in seconds of each entry.
+        threshold: Min cosine similarity between queries for a hit.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 3600.0,
+        threshold: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.threshold = threshold
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # One row per slot; rows of free slots are stale and never read.
+        self._vectors = np.zeros((self.maxsize, DIM), dtype=np.float32)
+        self._contexts: list[Optional[str]] = [None] * self.maxsize
+        self._by_context: dict[str, list[int]] = {}
+        # slot -> (expires_at, reply), least recently used first.
+        self._entries: OrderedDict[int, tuple[float, str]] = OrderedDict()
+        self._free = list(range(self.maxsize - 1, -1, -1))
+
+    def _drop(self, slot: int) -> None:
+        del self._entries[slot]
+        context = self._contexts[slot]
+        slots = self._by_context[context]
+        slots.remove(slot)
+        if not slots:
+            del self._by_context[context]
+        self._contexts[slot] = None
+        self._free.append(slot)
+
+    def _nearest(self, context: str, vector: np.ndarray) -> Optional[int]:
+        slots = self._by_context.get(context)
+        if not slots:
+            return None
+        sims = self._vectors[slots] @ vector
+        best = int(np.argmax(sims))
+        return slots[best] if sims[best] >= self.threshold else None
+
+    def get(self, context: str, vector: np.ndarray) -> Optional[str]:
+        """Reply cached for the most similar query in `context`, or None."""
+        with self._lock:
+            now = self._clock()
+            for slot in [s for s in self._by_context.get(context, ()) if self._entries[s][0] <= now]:
+                self._drop(slot)
+                self.stats.expirations += 1
+            slot = self._nearest(context, vector)
+            if slot is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(slot)
+            self.stats.hits += 1
+            return self._entries[slot][1]
+
+    def set(self, context: str, vector: np.ndarray, reply: str) -> None:
+        with self._lock:
+            # A near-duplicate of a cached query replaces it rather than adding a row.
+            slot = self._nearest(context, vector)
+            if slot is None:
+                if not self._free:
+                    self._drop(next(iter(self._entries)))
+                    self.stats.evictions += 1
+                slot = self._free.pop()
+                self._vectors[slot] = vector
+                self._contexts[slot] = context
+                self._by_context.setdefault(context, []).append(slot)
+            self._entries[slot] = (self._clock() + self.ttl, reply)
+            self._entries.move_to_end(slot)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._drop(slot)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _get_cache() -> Optional[SemanticCache]:
+    """The process-wide cache, or None when `PROPMATE_CHAT_CACHE_SIZE` is 0."""
+    global _cache, _enabled
+    if _enabled is None:
+        with _init_lock:
+            if _enabled is None:
+                size = get_chat_cache_size()
+                if size > 0:
+                    _cache = SemanticCache(
+                        maxsize=size,
+                        ttl=get_chat_cache_ttl(),
+                        threshold=get_chat_cache_threshold(),
+                    )
+                _enabled = size > 0
+    return _cache
+
+
+def _lookup(
+    query: str, history: list[dict] | None
+) -> tuple[Optional[SemanticCache], str, Optional[np.ndarray], Optional[str]]:
+    """(cache, context, vector, cached reply); cache is None when not caching."""
+    cache = _get_cache()
+    if cache is None or not query.strip():
+        return None, "", None, None
+    with span("chat_cache.lookup") as s:
+        context = context_key(query, history)
+        vector = embed(query)
+        reply = cache.get(context, vector)
+        s.set(hit=reply is not None)
+    return cache, context, vector, reply
+
+
+@timed
+def generate_chat_reply_cached(query: str, history: list[dict] | None = None) -> str:
+    """`generate_chat_reply` behind the semantic cache; same arguments and errors."""
+    cache, context, vector, reply = _lookup(query, history)
+    if reply is not None:
+        return reply
+    reply = generate_chat_reply(query, history=history)
+    if cache is not None:
+        cache.set(context, vector, reply)
+    return reply
+
+
+@timed
+async def generate_chat_reply_cached_async(
+    query: str, history: list[dict] | None = None
+) -> str:
+    """Async version of `generate_chat_reply_cached`."""
+    cache, context, vector, reply = _lookup(query, history)
+    if reply is not None:
+        return reply
+    reply = await generate_chat_reply_async(query, history=history)
+    if cache is not None:
+        cache.set(context, vector, reply)
+    return reply
+
+
+@timed
+async def stream_chat_reply_cached_async(
+    query: str, history: list[dict] | None = None
+) -> AsyncIterator[str]:
+    """`stream_chat_reply_async` behind the semantic cache.
+
+    A hit yields the whole cached reply at once; a miss streams as usual and
+    caches the reply once the stream has been read to the end.
+    """
+    cache, context, vector, reply = _lookup(query, history)
+    if reply is not None:
+        yield reply
+        return
+    parts: list[str] = []
+    agen = stream_chat_reply_async(query, history=history)
+    try:
+        async for delta in agen:
+            parts.append(delta)
+            yield delta
+    finally:
+        await agen.aclose()
+    reply = "".join(parts).strip()
+    if cache is not None and reply:
+        cache.set(context, vector, reply)
+
+
+def chat_cache_stats() -> Optional[dict]:
+    """Hit/miss/eviction counters and size, or None when disabled."""
+    cache = _get_cache()
+    if cache is None:
+        return None
+    return {**cache.stats.as_dict(), "size": len(cache)}
+
+
+def reset_chat_cache() -> None:
+    """Forget every cached reply; rebuilt from settings on next use."""
+    global _cache, _enabled
+    with _init_lock:
+        _cache = None
+        _enabled = None
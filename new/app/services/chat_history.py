@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional
+
+from .cache import TTLCache
+from .settings import get_chat_history_token_budget
+
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+# Per-message framing overhead in the chat format (role, separators).
+_MESSAGE_OVERHEAD = 4
+_SUMMARY_LINE_CHARS = 160
+_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# Summaries keyed by a hash of the folded prefix; a longer prefix extends the
+# longest cached one instead of re-summarizing from the start.
+_summaries = TTLCache(maxsize=1024, ttl=3600.0)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (no tokenizer dependency).
+
+    Takes the larger of a word/punctuation count and ~4 characters per token,
+    which tracks BPE tokenizers closely enough for budgeting.
+    """
+    if not text:
+        return 0
+    return max(len(_WORD.findall(text)), (len(text) + 3) // 4)
+
+
+def message_tokens(message: dict) -> int:
+    return estimate_tokens(str(message.get("content") or "")) + _MESSAGE_OVERHEAD
+
+
+def dedupe_turns(history: list[dict], query: str = "") -> list[dict]:
+    """Drop empty turns, consecutive repeats, and a trailing copy of `query`.
+
+    Callers often pass history that already ends with the new user query,
+    which the payload builder appends again.
+    """
+    out: list[dict] = []
+    last: tuple = ()
+    for m in history:
+        role = m.get("role")
+        content = str(m.get("content") or "")
+        key = (role, content.strip())
+        if not role or not key[1] or key == last:
+            continue
+        out.append({"role": role, "content": content})
+        last = key
+    if query and last == ("user", query.strip()):
+        out.pop()
+    return out
+
+
+def _summary_line(message: dict) -> str:
+    text = " ".join(str(message["content"]).split())
+    first = _SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(first) > _SUMMARY_LINE_CHARS:
+        first = first[: _SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    speaker = "User" if message["role"] == "user" else "Assistant"
+    return f"- {speaker}: {first}"
+
+
+def _prefix_hashes(turns: list[dict]) -> list[str]:
+    hashes: list[str] = []
+    h = hashlib.sha1()
+    for m in turns:
+        h.update(f"{m['role']}\x00{m['content']}\x01".encode("utf-8"))
+        hashes.append(h.copy().hexdigest())
+    return hashes
+
+
+def summarize_turns(turns: list[dict], max_tokens: int) -> str:
+    """Fold turns into a running extractive summary, reusing cached prefixes."""
+    if not turns:
+        return ""
+    hashes = _prefix_hashes(turns)
+    lines: list[str] = []
+    start = 0
+    for i in range(len(turns) - 1, -1, -1):
+        cached = _summaries.get(hashes[i])
+        if cached is not None:
+            lines = list(cached)
+            start = i + 1
+            break
+    for i in range(start, len(turns)):
+        lines.append(_summary_line(turns[i]))
+        _summaries.set(hashes[i], tuple(lines))
+    # Keep the most recent lines that fit the summary budget.
+    kept: list[str] = []
+    used = estimate_tokens(_SUMMARY_PREFIX)
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return _SUMMARY_PREFIX + "\n".join(reversed(kept)) if kept else ""
+
+
+def compact_history(
+    history: list[dict] | None,
+    query: str = "",
+    budget: Optional[int] = None,
+) -> list[dict]:
+    """Return history that fits a token budget, oldest turns folded into a summary.
+
+    Args:
+        history: Prior messages with 'role' and 'content'.
+        query: The new user query (appended separately by the caller).
+        budget: Token budget for history; defaults to PROPMATE_CHAT_TOKEN_BUDGET.
+
+    Returns:
+        Recent turns verbatim, preceded by one system summary message when
+        older turns had to be folded.
+    """
+    turns = dedupe_turns(history or [], query)
+    budget = get_chat_history_token_budget() if budget is None else budget
+    if not turns:
+        return []
+    if sum(message_tokens(m) for m in turns) <= budget:
+        return turns
+
+    # A quarter of the budget goes to the summary; recent turns get the rest.
+    summary_budget = max(budget // 4, 0)
+    recent: list[dict] = []
+    used = 0
+    for m in reversed(turns):
+        cost = message_tokens(m)
+        if used + cost > budget - summary_budget:
+            break
+        recent.append(m)
+        used += cost
+    recent.reverse()
+    folded = turns[: len(turns) - len(recent)]
+
+    summary = summarize_turns(folded, summary_budget - _MESSAGE_OVERHEAD)
+    if not summary:
+        return recent
+    return [{"role": "system", "content": summary}] + recent
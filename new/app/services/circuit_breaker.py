@@ -0,0 +1,278 @@
+"""Per-upstream circuit breakers.
+
+A breaker watches the outcomes of recent calls to one upstream. When too
+many of them fail or are slow it opens, and calls fail at once with
+`CircuitOpenError` instead of waiting out a timeout. After a cool-down it
+lets a few probe calls through (half-open); if they succeed it closes again,
+otherwise it reopens.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from .errors import APIError, CircuitOpenError
+from .settings import (
+    get_breaker_error_rate,
+    get_breaker_half_open_calls,
+    get_breaker_min_calls,
+    get_breaker_open_seconds,
+    get_breaker_slow_call_seconds,
+    get_breaker_slow_rate,
+    get_breaker_window,
+)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class Transition:
+    upstream: str
+    from_state: str
+    to_state: str
+    reason: str
+    at: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def is_failure(error: Optional[BaseException]) -> bool:
+    """Whether an outcome says the upstream is unhealthy.
+
+    Only transient errors count; auth failures, bad requests and 429s are
+    answers from a healthy upstream.
+    """
+    return isinstance(error, APIError) and error.retryable
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding time window.
+
+    Args:
+        upstream: Name used in errors and transitions.
+        window: Seconds of call outcomes considered.
+        min_calls: Calls needed in the window before the breaker may trip.
+        error_rate: Failure fraction that opens the circuit.
+        slow_call: Seconds after which a successful call counts as slow.
+        slow_rate: Slow-call fraction that opens the circuit.
+        open_seconds: Cool-down before probes are let through.
+        half_open_calls: Concurrent probes allowed while half-open; that
+            many successes close the circuit.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        window: float = 30.0,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call: float = 5.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        on_transition: Optional[Callable[[Transition], None]] = None,
+    ) -> None:
+        self.upstream = upstream
+        self.window = window
+        self.min_calls = max(min_calls, 1)
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(half_open_calls, 1)
+        self._clock = clock
+        self._on_transition = on_transition
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._since = clock()
+        # (finished_at, failed, slow) for calls inside the window.
+        self._outcomes: deque[tuple[float, bool, bool]] = deque()
+        self._probes = 0
+        self._probe_successes = 0
+        self._pending: list[Transition] = []
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(self._clock())
+            state = self._state
+        self._emit()
+        return state
+
+    def _transition(self, to_state: str, reason: str, now: float) -> None:
+        # Called with the lock held; listeners run later, from `_emit`.
+        self._pending.append(
+            Transition(self.upstream, self._state, to_state, reason, time.time())
+        )
+        self._state = to_state
+        self._since = now
+        self._outcomes.clear()
+        self._probes = 0
+        self._probe_successes = 0
+
+    def _emit(self) -> None:
+        with self._lock:
+            changes, self._pending = self._pending, []
+        if self._on_transition is not None:
+            for change in changes:
+                self._on_transition(change)
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._since >= self.open_seconds:
+            self._transition(HALF_OPEN, "cool-down elapsed", now)
+
+    def before_call(self) -> None:
+        """Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                probe slots taken.
+        """
+        with self._lock:
+            now = self._clock()
+            self._maybe_half_open(now)
+            admitted = self._state == CLOSED
+            if self._state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                admitted = True
+            retry_after = max(self.open_seconds - (now - self._since), 0.0)
+        self._emit()
+        if admitted:
+            return
+        raise CircuitOpenError(self.upstream, retry_after)
+
+    def record(self, duration: Optional[float], error: Optional[BaseException]) -> None:
+        """Record the outcome of an admitted call.
+
+        `duration` is None when latency shouldn't be judged (e.g. streams).
+        """
+        failed = is_failure(error)
+        slow = not failed and duration is not None and duration >= self.slow_call
+        with self._lock:
+            self._record(failed, slow)
+        self._emit()
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        # Called with the lock held.
+        now = self._clock()
+        if self._state == HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+            if failed or slow:
+                self._transition(OPEN, "probe failed" if failed else "probe slow", now)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self._transition(CLOSED, "probes succeeded", now)
+            return
+        if self._state == OPEN:
+            # A call admitted before the circuit opened.
+            return
+        self._outcomes.append((now, failed, slow))
+        self._prune(now)
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._outcomes if f)
+        slows = sum(1 for _, _, s in self._outcomes if s)
+        if failures / calls >= self.error_rate:
+            self._transition(OPEN, f"error rate {failures}/{calls}", now)
+        elif slows / calls >= self.slow_rate:
+            self._transition(OPEN, f"slow calls {slows}/{calls}", now)
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that ended without an outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            self._maybe_half_open(now)
+            self._prune(now)
+            snap = {
+                "state": self._state,
+                "seconds_in_state": round(now - self._since, 3),
+                "calls": len(self._outcomes),
+                "failures": sum(1 for _, f, _ in self._outcomes if f),
+                "slow_calls": sum(1 for _, _, s in self._outcomes if s),
+            }
+        self._emit()
+        return snap
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_transitions: deque[Transition] = deque(maxlen=200)
+_listeners: list[Callable[[Transition], None]] = []
+
+
+def _notify(change: Transition) -> None:
+    _transitions.append(change)
+    for listener in list(_listeners):
+        try:
+            listener(change)
+        except Exception:
+            # A broken monitor must not break upstream calls.
+            pass
+
+
+def add_transition_listener(listener: Callable[[Transition], None]) -> None:
+    """Call `listener(transition)` on every state change of any breaker."""
+    _listeners.append(listener)
+
+
+def remove_transition_listener(listener: Callable[[Transition], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(upstream)
+            if breaker is None:
+                breaker = _breakers[upstream] = CircuitBreaker(
+                    upstream,
+                    window=get_breaker_window(),
+                    min_calls=get_breaker_min_calls(),
+                    error_rate=get_breaker_error_rate(),
+                    slow_call=get_breaker_slow_call_seconds(),
+                    slow_rate=get_breaker_slow_rate(),
+                    open_seconds=get_breaker_open_seconds(),
+                    half_open_calls=get_breaker_half_open_calls(),
+                    on_transition=_notify,
+                )
+    return breaker
+
+
+def breaker_states() -> dict[str, dict]:
+    """Current state and window counts per upstream, for monitoring."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.upstream: b.snapshot() for b in breakers}
+
+
+def breaker_transitions() -> list[dict]:
+    """Recent state changes, oldest first."""
+    return [t.as_dict() for t in list(_transitions)]
+
+
+def reset_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+    _transitions.clear()
@@ -0,0 +1,297 @@
+"""k-nearest comparable properties over stored analyses and listings.
+
+Points live in one KD-tree per locality plus a global tree used to top up
+localities with too few points. Features are scaled with fixed weights (not
+fitted), so inserts never invalidate the scaling:
+
+- log(area) x 4: a 25% size difference is about one unit;
+- bedrooms x 1, bathrooms x 0.5, floor x 0.1.
+
+New points are searched by brute force until a background rebuild folds them
+into the trees, so inserts are cheap and lookups stay sub-millisecond.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+
+from .lazy import lazy_import
+from .metrics import timed
+from .settings import (
+    get_comparables_k,
+    get_comparables_max_pending,
+    get_comparables_max_rows,
+    get_comparables_rebuild_interval,
+)
+from .valuation import normalize_locality
+
+np = lazy_import("numpy")
+
+
+FEATURE_WEIGHTS = (4.0, 1.0, 0.5, 0.1)
+_GLOBAL = "\x00all"
+
+
+def features(rows: Sequence[dict]) -> np.ndarray:
+    """Scaled feature matrix (n x 4) for property dicts."""
+    raw = np.array(
+        [
+            [
+                float(r.get("area") or 0),
+                float(r.get("bedrooms") or 0),
+                float(r.get("bathrooms") or 0),
+                float(r.get("floor") or 0),
+            ]
+            for r in rows
+        ],
+        dtype=float,
+    ).reshape(len(rows), 4)
+    raw[:, 0] = np.log(np.maximum(raw[:, 0], 1.0))
+    return raw * FEATURE_WEIGHTS
+
+
+@dataclass
+class _Partition:
+    tree: object = None
+    tree_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    pending: list[int] = field(default_factory=list)
+
+
+class ComparablesIndex:
+    """Incremental k-NN index of priced properties.
+
+    Args:
+        max_pending: Unindexed points in a partition past which
+            `needs_rebuild()` reports True.
+    """
+
+    def __init__(self, max_pending: int = 4096) -> None:
+        self.max_pending = max(1, max_pending)
+        self._X = np.zeros((1024, 4))
+        self._items: list[tuple] = []
+        self._partitions: dict[str, _Partition] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, rows: Sequence[dict], values: Sequence[float], source: str = "analysis") -> None:
+        """Insert properties with their total values (₹); rows without area are skipped."""
+        kept = [(r, float(v)) for r, v in zip(rows, values) if (r.get("area") or 0) > 0 and v > 0]
+        if not kept:
+            return
+        X = features([r for r, _ in kept])
+        with self._lock:
+            start = len(self._items)
+            end = start + len(kept)
+            if end > len(self._X):
+                cap = max(end, 2 * len(self._X))
+                self._X = np.resize(self._X, (cap, 4))
+            self._X[start:end] = X
+            localities: dict[str, str] = {}
+            for offset, (r, v) in enumerate(kept):
+                location = str(r.get("location", ""))
+                locality = localities.get(location)
+                if locality is None:
+                    locality = localities[location] = normalize_locality(location)
+                # Tuples keep a million points affordable; dicts are built per hit.
+                self._items.append(
+                    (
+                        location,
+                        int(r["area"]),
+                        int(r.get("bedrooms") or 0),
+                        int(r.get("bathrooms") or 0),
+                        int(r.get("floor") or 0),
+                        int(v),
+                        source,
+                        str(r.get("url", "")),
+                    )
+                )
+                for key in (locality, _GLOBAL):
+                    part = self._partitions.get(key)
+                    if part is None:
+                        part = self._partitions[key] = _Partition()
+                    part.pending.append(start + offset)
+
+    def needs_rebuild(self) -> bool:
+        with self._lock:
+            return any(len(p.pending) >= self.max_pending for p in self._partitions.values())
+
+    def rebuild(self, key: Optional[str] = None) -> int:
+        """Fold pending points into the KD-trees; returns points indexed.
+
+        Trees are built outside the lock, so lookups and inserts continue
+        against the previous tree meanwhile.
+        """
+        from sklearn.neighbors import KDTree
+
+        with self._lock:
+            keys = [key] if key is not None else list(self._partitions)
+            work = []
+            for k in keys:
+                part = self._partitions.get(k)
+                if part is None or not part.pending:
+                    continue
+                ids = np.concatenate([part.tree_ids, np.array(part.pending, dtype=np.int64)])
+                work.append((k, ids, self._X[ids].copy(), len(part.pending)))
+        built = 0
+        for k, ids, X, folded in work:
+            tree = KDTree(X, leaf_size=40)
+            with self._lock:
+                part = self._partitions[k]
+                part.tree, part.tree_ids = tree, ids
+                # Points inserted while the tree was building stay pending.
+                part.pending = part.pending[folded:]
+            built += len(ids)
+        return built
+
+    def _search(self, part: _Partition, q: np.ndarray, k: int) -> list[tuple[float, int]]:
+        found: list[tuple[float, int]] = []
+        if part.tree is not None:
+            dist, ind = part.tree.query(q[None, :], k=min(k, len(part.tree_ids)))
+            found.extend(zip(dist[0].tolist(), part.tree_ids[ind[0]].tolist()))
+        if part.pending:
+            ids = np.array(part.pending, dtype=np.int64)
+            d = np.sqrt(((self._X[ids] - q) ** 2).sum(axis=1))
+            top = np.argsort(d)[:k]
+            found.extend(zip(d[top].tolist(), ids[top].tolist()))
+        found.sort()
+        return found[:k]
+
+    def _item(self, i: int) -> dict:
+        location, area, bedrooms, bathrooms, floor, value, source, url = self._items[i]
+        return {
+            "location": location,
+            "area": area,
+            "bedrooms": bedrooms,
+            "bathrooms": bathrooms,
+            "floor": floor,
+            "value": value,
+            "price_per_sqft": int(value / area),
+            "source": source,
+            "url": url,
+        }
+
+    def query(self, row: dict, k: int = 5) -> list[dict]:
+        """The k nearest stored properties, same locality first, nearest first."""
+        return self.query_many([row], k)[0]
+
+    def query_many(self, rows: Sequence[dict], k: int = 5) -> list[list[dict]]:
+        X = features(rows)
+        out: list[list[dict]] = []
+        with self._lock:
+            for row, q in zip(rows, X):
+                local = self._partitions.get(normalize_locality(row.get("location", "")))
+                hits = self._search(local, q, k) if local is not None else []
+                if len(hits) < k and _GLOBAL in self._partitions:
+                    seen = {i for _, i in hits}
+                    extra = self._search(self._partitions[_GLOBAL], q, k + len(hits))
+                    hits += [(d, i) for d, i in extra if i not in seen][: k - len(hits)]
+                out.append([self._item(i) for _, i in hits])
+        return out
+
+
+def ppsf_percentiles(comparables: Sequence[dict]) -> dict[str, int]:
+    """25th/50th/75th percentile price per sqft of comparables (0 when empty)."""
+    rates = np.array([c["price_per_sqft"] for c in comparables], dtype=float)
+    if rates.size == 0:
+        return {"p25": 0, "p50": 0, "p75": 0}
+    p25, p50, p75 = np.percentile(rates, [25, 50, 75])
+    return {"p25": int(p25), "p50": int(p50), "p75": int(p75)}
+
+
+_index: Optional[ComparablesIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ComparablesIndex:
+    """The process-wide index; empty until `load_index` or inserts fill it."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ComparablesIndex(max_pending=get_comparables_max_pending())
+    return _index
+
+
+def reset_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def load_index(records: Iterable[dict], source: str = "analysis") -> int:
+    """Bulk-insert repository-shaped records ({entry, value}) and build the trees."""
+    index = get_index()
+    rows: list[dict] = []
+    values: list[float] = []
+    for r in records:
+        rows.append(r["entry"])
+        values.append(r["value"])
+    index.add(rows, values, source=source)
+    index.rebuild()
+    return len(rows)
+
+
+def load_pages(pages: Iterable[list[dict]], source: str = "analysis") -> int:
+    """Insert pages of comparable rows (with `value`) one by one, then build the trees."""
+    index = get_index()
+    loaded = 0
+    for page in pages:
+        index.add(page, [r["value"] for r in page], source=source)
+        loaded += len(page)
+    index.rebuild()
+    return loaded
+
+
+def load_analyses(limit: int) -> int:
+    """Load the newest `limit` stored analyses; see `load_pages`."""
+    from .repository import get_repository
+
+    return load_pages(get_repository().iter_comparables(limit))
+
+
+def load_listings(limit: int) -> int:
+    """Load the `limit` most recently seen priced listings; see `load_pages`."""
+    from .listings import get_listings_store
+
+    return load_pages(get_listings_store().iter_comparables(limit), "listing")
+
+
+@timed
+def comparables_for(rows: Sequence[dict], k: Optional[int] = None) -> list[list[dict]]:
+    """Top-k comparables for each row from the process-wide index."""
+    return get_index().query_many(rows, get_comparables_k() if k is None else k)
+
+
+async def run_index_maintainer(interval: Optional[float] = None) -> None:
+    """Load stored analyses and listings, then fold new points into the trees.
+
+    Rebuilds every `interval` seconds, or sooner once a partition has
+    `max_pending` unindexed points. Started by `lifecycle.lifespan`;
+    builds run in a worker thread.
+    """
+    try:
+        await asyncio.to_thread(load_analyses, get_comparables_max_rows())
+    except Exception:
+        # Comparables fill in from new analyses instead.
+        pass
+    try:
+        await asyncio.to_thread(load_listings, get_comparables_max_rows())
+    except Exception:
+        pass
+    interval = get_comparables_rebuild_interval() if interval is None else interval
+    loop = asyncio.get_running_loop()
+    last = loop.time()
+    while True:
+        await asyncio.sleep(min(interval, 1.0))
+        index = get_index()
+        if loop.time() - last < interval and not index.needs_rebuild():
+            continue
+        last = loop.time()
+        try:
+            await asyncio.to_thread(index.rebuild)
+        except Exception:
+            pass
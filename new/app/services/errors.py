@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
 class ConfigError(Exception):
     """Raised when required configuration (e.g., API keys) is missing."""
 
@@ -7,8 +12,38 @@ class AuthenticationError(Exception):
 
 
 class RateLimitError(Exception):
-    """Raised when an external API rate limit is exceeded (429)."""
+    """Raised when an external API rate limit is exceeded (429).
+
+    `retry_after` is the server's Retry-After hint in seconds, when given.
+    """
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class APIError(Exception):
-    """Raised when an external API request fails for other reasons."""
\ No newline at end of file
+    """Raised when an external API request fails for other reasons.
+
+    `retryable` marks transient failures (timeouts, connection errors, 5xx).
+    """
+
+    def __init__(self, message: str = "", retryable: bool = False) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CircuitOpenError(APIError):
+    """Raised without calling an upstream whose circuit breaker is open.
+
+    `retry_after` is the time in seconds until the breaker lets probe calls through.
+    """
+
+    def __init__(self, upstream: str, retry_after: float = 0.0) -> None:
+        super().__init__(f"{upstream} is unavailable (circuit open).")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CassetteMissError(APIError):
+    """Raised in replay mode for a request that was never recorded."""
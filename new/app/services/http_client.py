@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib.util
+import socket
+import threading
+from typing import Optional
+
+from .lazy import lazy_import
+from .settings import (
+    get_http2_enabled,
+    get_http_keepalive_expiry,
+    get_http_max_connections,
+    get_http_max_keepalive_connections,
+)
+from .tracing import traceparent
+
+httpx = lazy_import("httpx")
+
+
+# Long-lived clients, one per upstream ("openai", "tavily", ...). Reusing them
+# keeps DNS, TCP and TLS setup off the hot path of every request.
+_lock = threading.Lock()
+_clients: dict[str, httpx.Client] = {}
+# Async clients are bound to the event loop that created them.
+_async_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=get_http_max_connections(),
+        max_keepalive_connections=get_http_max_keepalive_connections(),
+        keepalive_expiry=get_http_keepalive_expiry(),
+    )
+
+
+def _http2() -> bool:
+    # Only enable HTTP/2 when the optional `h2` dependency is importable.
+    return get_http2_enabled() and importlib.util.find_spec("h2") is not None
+
+
+def _inject_trace(request: httpx.Request) -> None:
+    # Lets upstream logs be joined with our spans.
+    header = traceparent()
+    if header is not None:
+        request.headers["traceparent"] = header
+
+
+async def _ainject_trace(request: httpx.Request) -> None:
+    _inject_trace(request)
+
+
+def get_client(upstream: str) -> httpx.Client:
+    """Return the shared sync client for an upstream, creating it on first use.
+
+    Per-call timeouts are passed on each request, not on the client.
+    """
+    client = _clients.get(upstream)
+    if client is not None and not client.is_closed:
+        return client
+    with _lock:
+        client = _clients.get(upstream)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                limits=_limits(),
+                http2=_http2(),
+                event_hooks={"request": [_inject_trace]},
+            )
+            _clients[upstream] = client
+        return client
+
+
+def get_async_client(upstream: str) -> httpx.AsyncClient:
+    """Return the shared async client for an upstream on the running loop."""
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(upstream)
+    if entry is not None:
+        owner, client = entry
+        if owner is loop and not client.is_closed:
+            return client
+        if owner is not loop:
+            _discard_async_client(owner, client)
+    client = httpx.AsyncClient(
+        limits=_limits(), http2=_http2(), event_hooks={"request": [_ainject_trace]}
+    )
+    _async_clients[upstream] = (loop, client)
+    return client
+
+
+def _drop_connections(client: httpx.AsyncClient) -> None:
+    # Without its loop the pool cannot be closed gracefully; shut the sockets down.
+    pool = getattr(client._transport, "_pool", None)
+    for conn in list(getattr(pool, "_connections", ())):
+        stream = getattr(getattr(conn, "_connection", None), "_network_stream", None)
+        sock = stream.get_extra_info("socket") if stream is not None else None
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+    if pool is not None:
+        pool._connections.clear()
+
+
+def _discard_async_client(owner: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Release an async client created on another loop than the running one."""
+    if client.is_closed:
+        return
+    if owner.is_running() and not owner.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), owner)
+    else:
+        _drop_connections(client)
+
+
+def close_clients() -> None:
+    """Close every shared sync client. Async clients need `aclose_clients`."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    """Close every shared client, sync and async, e.g. on app shutdown."""
+    close_clients()
+    entries = list(_async_clients.values())
+    _async_clients.clear()
+    loop = asyncio.get_running_loop()
+    for owner, client in entries:
+        # Clients from another loop cannot be awaited here.
+        if owner is loop:
+            await client.aclose()
+        else:
+            _discard_async_client(owner, client)
+
+
+async def preconnect(
+    urls: dict[str, str], connections: int = 1, timeout: float = 5.0
+) -> dict[str, Optional[str]]:
+    """Open keep-alive connections to upstreams before the first real call.
+
+    Sends `connections` concurrent HEAD requests to each `{upstream: url}` on
+    that upstream's shared async client, so DNS, TCP and TLS setup are done
+    and the connections wait in the pool. Any HTTP status counts as
+    connected.
+
+    Returns:
+        The error per upstream, or None where it connected.
+    """
+
+    async def head(upstream: str, url: str) -> Optional[str]:
+        try:
+            await get_async_client(upstream).head(url, timeout=httpx.Timeout(timeout))
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    names = list(urls)
+    results = await asyncio.gather(
+        *(head(name, urls[name]) for name in names for _ in range(max(connections, 1)))
+    )
+    per = max(connections, 1)
+    return {
+        name: next((r for r in results[i * per:(i + 1) * per] if r), None)
+        for i, name in enumerate(names)
+    }
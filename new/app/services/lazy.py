@@ -0,0 +1,35 @@
+"""Deferred imports for heavy third-party modules.
+
+`np = lazy_import("numpy")` binds a placeholder module; the real import
+happens on the first attribute access (`np.array`, `httpx.Timeout`), not when
+the importing module is loaded. Importing `app.app` therefore stays cheap for
+`reflex` compiles, CLI commands and tests, and the cost moves to the first
+handler that needs the library, or to startup warm-up
+(`app/services/lifecycle.py`).
+
+After the first access the placeholder holds the module's attributes
+directly, so later lookups cost the same as with a plain import.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Placeholder that imports the module it names on first attribute access."""
+
+    def __getattr__(self, attr: str):
+        # Only reached for attributes not copied in yet, i.e. before the import.
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """`name` as a module, imported when first used (or now if already loaded)."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
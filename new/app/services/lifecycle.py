@@ -0,0 +1,149 @@
+"""App startup and shutdown hooks.
+
+`lifespan` runs as an app lifespan task. Before the server takes traffic it
+validates and freezes the settings, loads the heavy services (valuation
+model, stores, scikit-learn) and opens keep-alive connections to the
+upstreams, so the first analysis or chat after a deploy costs what later ones
+do, then starts the maintenance loops (`MAINTENANCE_TASKS`). On shutdown it
+waits up to `PROPMATE_SHUTDOWN_GRACE` seconds for running event handlers,
+stops the maintenance loops, then flushes buffered writes and closes pools
+and stores.
+
+The loops are owned here rather than registered as lifespan tasks of their
+own: Reflex exits context-manager lifespan tasks before it cancels coroutine
+ones, so they would outlive `close_resources` and `thaw_settings`.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from .cassettes import get_cassette_store, reset_cassette_store
+from .chat_cache import chat_cache_stats
+from .circuit_breaker import get_breaker
+from .comparables import get_index, run_index_maintainer
+from .http_client import aclose_clients, preconnect
+from .listings import get_listings_store, reset_listings_store
+from .loan_offers import run_refresher
+from .metrics import EVENTS_IN_FLIGHT
+from .rate_limit import get_bucket, reset_buckets
+from .repository import get_repository, reset_repository, run_flusher
+from .search_cache import cache_stats, reset_cache, run_cache_pruner
+from .settings import (
+    freeze_settings,
+    get_openai_base_url,
+    get_prewarm_connections,
+    get_prewarm_enabled,
+    get_shutdown_grace,
+    get_tavily_base_url,
+    get_upstream_mode,
+    thaw_settings,
+)
+from .tracing import get_exporter
+from .valuation import estimate_value, get_model
+
+
+# Imported lazily by the code that uses them, but always needed soon after startup.
+HEAVY_MODULES = ("numpy", "httpx", "sklearn.neighbors")
+UPSTREAMS = ("openai", "tavily")
+# Loops that run for the app's lifetime:
+# - run_refresher keeps the server-wide loan offer snapshot warm;
+# - run_flusher writes buffered analyses even when sessions go quiet;
+# - run_index_maintainer loads the comparables index and keeps its trees fresh;
+# - run_cache_pruner deletes expired search results from the SQLite tier.
+MAINTENANCE_TASKS: tuple[Callable[[], Awaitable[None]], ...] = (
+    run_refresher,
+    run_flusher,
+    run_index_maintainer,
+    run_cache_pruner,
+)
+
+
+def warm_services() -> None:
+    """Import heavy modules and build the process-wide services. Blocking."""
+    for module in HEAVY_MODULES:
+        importlib.import_module(module)
+    get_model()
+    estimate_value(1000, 2, 2, 1, "")
+    get_repository()
+    get_listings_store()
+    get_index()
+    cache_stats()
+    chat_cache_stats()
+    get_exporter()
+    for upstream in UPSTREAMS:
+        get_bucket(upstream)
+        get_breaker(upstream)
+    if get_upstream_mode() != "live":
+        get_cassette_store()
+
+
+async def warm_up() -> dict[str, Optional[str]]:
+    """Warm the services, then connect to the upstreams unless replaying.
+
+    Returns:
+        Connection errors by upstream (None where it connected).
+    """
+    await asyncio.to_thread(warm_services)
+    connections = get_prewarm_connections()
+    if get_upstream_mode() == "replay" or connections == 0:
+        return {}
+    return await preconnect(
+        {"openai": get_openai_base_url(), "tavily": get_tavily_base_url()}, connections
+    )
+
+
+async def drain(timeout: float, interval: float = 0.05) -> bool:
+    """Wait until no event handler is running.
+
+    Returns:
+        False if handlers were still running after `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while EVENTS_IN_FLIGHT.total() > 0:
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+
+def start_maintenance() -> list[asyncio.Task]:
+    return [asyncio.create_task(fn()) for fn in MAINTENANCE_TASKS]
+
+
+async def stop_maintenance(tasks: list[asyncio.Task]) -> None:
+    """Cancel the maintenance loops and wait until they have finished."""
+    for task in tasks:
+        task.cancel()
+    # A loop's own cleanup may fail (e.g. its final flush); close_resources retries.
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def close_resources() -> None:
+    """Flush buffered analyses and close stores and connection pools."""
+    reset_repository()
+    reset_listings_store()
+    reset_cassette_store()
+    reset_cache()
+    reset_buckets()
+    await aclose_clients()
+
+
+@contextlib.asynccontextmanager
+async def lifespan() -> AsyncIterator[None]:
+    """Startup and shutdown around the app's lifetime; see the module docstring."""
+    freeze_settings()
+    tasks: list[asyncio.Task] = []
+    try:
+        if get_prewarm_enabled():
+            await warm_up()
+        tasks = start_maintenance()
+        yield
+    finally:
+        await drain(get_shutdown_grace())
+        await stop_maintenance(tasks)
+        await close_resources()
+        thaw_settings()
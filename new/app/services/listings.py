@@ -0,0 +1,380 @@
+"""Structured listings extracted from web search snippets.
+
+Tavily results are free text. `extract_listing` pulls price, area, BHK and
+locality out of a snippet with compiled patterns, and `ListingsStore` keeps
+the results in SQLite, deduplicated by canonical URL and by content hash, so
+repeated searches grow a local listings corpus rather than re-parsing and
+re-storing the same snippets.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .metrics import timed
+from .settings import get_listings_db_path
+from .valuation import normalize_locality
+
+
+_CRORE = 10_000_000
+_LAKH = 100_000
+_SQM_TO_SQFT = 10.7639
+
+# Never stop inside a number ("8,500" must not backtrack to "8,50").
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)(?!\d|[,.]\d)"
+_UNIT = r"(crores?|cr|lakhs?|lacs?|l)\b"
+# "₹ 1.2 Cr", "Rs. 85 Lakh", "INR 95,00,000"; not "₹ 8,500/sq ft" or rents.
+_PRICE_CURRENCY = re.compile(
+    r"(?:₹|\brs\.?|\binr)\s*" + _AMOUNT + r"\s*(?:" + _UNIT + r")?(?!\s*(?:/|per\b))",
+    re.IGNORECASE,
+)
+# "1.2 Cr", "85 lakhs" without a currency sign.
+_PRICE_UNIT = re.compile(r"\b(\d+(?:\.\d+)?)\s*" + _UNIT, re.IGNORECASE)
+_AREA = re.compile(
+    _AMOUNT
+    + r"\s*(sq\.?\s*(?:ft|feet)|sqft|square\s*(?:feet|foot|ft)"
+    + r"|sq\.?\s*m(?:tr?s?)?|sqm|square\s*met(?:er|re)s?)\b",
+    re.IGNORECASE,
+)
+_BHK = re.compile(r"\b(\d{1,2})\s*(?:bhk|bed(?:room)?s?|br)\b", re.IGNORECASE)
+# Capitalized place names after "in": "3 BHK Flat for Sale in Baner, Pune".
+_LOCALITY = re.compile(
+    r"\bin\s+([A-Z][\w.'-]*(?:\s+[A-Z0-9][\w.'-]*){0,3}(?:,\s*[A-Z][\w.'-]*(?:\s+[A-Z0-9][\w.'-]*){0,2})?)"
+)
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|gclid|fbclid|ref|ref_src|source|mc_\w+)$", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+# Below one lakh a "price" is almost always a rent, deposit or EMI.
+_MIN_PRICE = _LAKH
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _scale(amount: float, unit: Optional[str]) -> int:
+    unit = (unit or "").lower()
+    if unit.startswith("c"):
+        return int(amount * _CRORE)
+    if unit.startswith("l"):
+        return int(amount * _LAKH)
+    return int(amount)
+
+
+def parse_price(text: str) -> int:
+    """First plausible sale price in rupees, or 0."""
+    for pattern in (_PRICE_CURRENCY, _PRICE_UNIT):
+        for m in pattern.finditer(text):
+            price = _scale(_number(m.group(1)), m.group(2))
+            if price >= _MIN_PRICE:
+                return price
+    return 0
+
+
+def parse_area(text: str) -> int:
+    """First built-up area in sqft (square metres are converted), or 0."""
+    m = _AREA.search(text)
+    if not m:
+        return 0
+    area = _number(m.group(1))
+    if "m" in m.group(2).lower():
+        area *= _SQM_TO_SQFT
+    return int(area)
+
+
+def parse_bedrooms(text: str) -> int:
+    m = _BHK.search(text)
+    return int(m.group(1)) if m else 0
+
+
+def parse_locality(text: str) -> str:
+    m = _LOCALITY.search(text)
+    return m.group(1).strip(" .,") if m else ""
+
+
+def canonical_url(url: str) -> str:
+    """Normalized URL for deduplication; "" if not http(s).
+
+    http and https are treated alike; host is lowercased without `www.`;
+    fragment, tracking params and trailing slash are dropped; query params
+    are sorted.
+    """
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.netloc:
+        return ""
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not _TRACKING_PARAMS.match(k)
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def content_hash(title: str, content: str) -> str:
+    """Hash of the whitespace- and case-normalized snippet text."""
+    text = _SPACES.sub(" ", f"{title}\n{content}").strip().lower()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def format_price(price: int) -> str:
+    """Indian-style short price: "₹ 1.25 Cr", "₹ 85 L"; "" for 0."""
+    if price >= _CRORE:
+        return f"₹ {price / _CRORE:.2f}".rstrip("0").rstrip(".") + " Cr"
+    if price >= _LAKH:
+        return f"₹ {price / _LAKH:.1f}".rstrip("0").rstrip(".") + " L"
+    return f"₹ {price:,}" if price else ""
+
+
+def extract_listing(result: dict) -> dict:
+    """Structured fields from one search result (missing numbers are 0)."""
+    title = str(result.get("title") or "")
+    content = str(result.get("content") or "")
+    text = f"{title}\n{content}"
+    location = parse_locality(title) or parse_locality(content)
+    return {
+        "url": str(result.get("url") or ""),
+        "title": title,
+        "price": parse_price(text),
+        "area": parse_area(text),
+        "bedrooms": parse_bedrooms(text),
+        "location": location,
+        "locality": normalize_locality(location),
+    }
+
+
+_COLUMNS = ("canonical_url", "content_hash", "url", "title", "price", "area", "bedrooms", "location", "locality")
+
+
+class ListingsStore:
+    """Extracted listings in SQLite, unique by canonical URL and content hash."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "canonical_url TEXT PRIMARY KEY, content_hash TEXT NOT NULL UNIQUE, "
+                "url TEXT NOT NULL, title TEXT NOT NULL, price INTEGER NOT NULL, "
+                "area INTEGER NOT NULL, bedrooms INTEGER NOT NULL, "
+                "location TEXT NOT NULL, locality TEXT NOT NULL, "
+                "first_seen REAL NOT NULL, last_seen REAL NOT NULL, "
+                "seen_count INTEGER NOT NULL DEFAULT 1)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_listings_locality_bedrooms_area "
+                "ON listings (locality, bedrooms, area)"
+            )
+
+    def _row(self, row: tuple) -> dict:
+        return dict(zip(_COLUMNS, row))
+
+    def ingest(self, results: Sequence[dict]) -> tuple[list[Optional[dict]], list[dict]]:
+        """Store new listings from search results.
+
+        Results whose canonical URL or content hash is already stored are not
+        re-extracted; their stored record is returned and marked seen again.
+
+        Returns:
+            (records aligned with `results`, None where a result has no
+            usable URL; the listings that were new).
+        """
+        keyed = []
+        for r in results:
+            canon = canonical_url(str(r.get("url") or ""))
+            digest = content_hash(str(r.get("title") or ""), str(r.get("content") or ""))
+            keyed.append((r, canon, digest))
+        canons = [c for _, c, _ in keyed if c]
+        digests = [h for _, c, h in keyed if c]
+        now = time.time()
+        records: list[Optional[dict]] = []
+        new: list[dict] = []
+        with self._lock, self._conn:
+            known: dict[str, dict] = {}
+            if canons:
+                marks = ",".join("?" * len(canons))
+                for row in self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM listings "
+                    f"WHERE canonical_url IN ({marks}) OR content_hash IN ({marks})",
+                    canons + digests,
+                ):
+                    rec = self._row(row)
+                    known[rec["canonical_url"]] = known[rec["content_hash"]] = rec
+            seen: list[str] = []
+            for result, canon, digest in keyed:
+                if not canon:
+                    records.append(None)
+                    continue
+                rec = known.get(canon) or known.get(digest)
+                if rec is None:
+                    rec = {"canonical_url": canon, "content_hash": digest, **extract_listing(result)}
+                    known[canon] = known[digest] = rec
+                    new.append(rec)
+                else:
+                    seen.append(rec["canonical_url"])
+                records.append(rec)
+            if new:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO listings ({', '.join(_COLUMNS)}, first_seen, last_seen) "
+                    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})",
+                    [tuple(r[c] for c in _COLUMNS) + (now, now) for r in new],
+                )
+            if seen:
+                self._conn.executemany(
+                    "UPDATE listings SET last_seen = ?, seen_count = seen_count + 1 "
+                    "WHERE canonical_url = ?",
+                    [(now, c) for c in seen],
+                )
+        return records, new
+
+    def find(
+        self,
+        location: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        priced_only: bool = False,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Stored listings, most recently seen first."""
+        clauses: list[str] = []
+        params: list = []
+        if location is not None:
+            clauses.append("locality = ?")
+            params.append(normalize_locality(location))
+        if bedrooms is not None:
+            clauses.append("bedrooms = ?")
+            params.append(bedrooms)
+        if priced_only:
+            clauses.append("price > 0 AND area > 0")
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM listings{where} "
+                "ORDER BY last_seen DESC LIMIT ?",
+                params + [max(limit, 0)],
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def iter_comparables(self, limit: int, page_size: int = 10000) -> Iterator[list[dict]]:
+        """The `limit` most recently seen priced listings, in pages.
+
+        Rows are `comparable_row`s with the listing's price as `value`; only
+        those columns are read, and the lock is released between pages.
+        """
+        cursor = None
+        while limit > 0:
+            where = "price > 0 AND area > 0"
+            params: list = []
+            if cursor is not None:
+                where += " AND (last_seen, rowid) < (?, ?)"
+                params.extend(cursor)
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT last_seen, rowid, location, area, bedrooms, url, price "
+                    f"FROM listings WHERE {where} "
+                    "ORDER BY last_seen DESC, rowid DESC LIMIT ?",
+                    params + [min(max(page_size, 1), limit)],
+                ).fetchall()
+            if not rows:
+                return
+            cursor = rows[-1][:2]
+            limit -= len(rows)
+            yield [
+                {
+                    **comparable_row(
+                        {"location": r[2], "area": r[3], "bedrooms": r[4], "url": r[5]}
+                    ),
+                    "value": r[6],
+                }
+                for r in rows
+            ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def comparable_row(listing: dict) -> dict:
+    """A listing shaped like an analysis entry for the comparables index.
+
+    Snippets rarely state bathrooms or floor; assume one bathroom per
+    bedroom and the ground floor.
+    """
+    return {
+        "location": listing["location"],
+        "area": listing["area"],
+        "bedrooms": listing["bedrooms"],
+        "bathrooms": listing["bedrooms"],
+        "floor": 0,
+        "url": listing["url"],
+    }
+
+
+_store: Optional[ListingsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_listings_store() -> ListingsStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ListingsStore(get_listings_db_path())
+    return _store
+
+
+def reset_listings_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+@timed
+def ingest_results(results: Sequence[dict]) -> list[dict]:
+    """Store search results as listings and index new priced ones as comparables.
+
+    Returns the results with extracted `price`, `price_label`, `area` and
+    `bedrooms` added.
+    """
+    from .comparables import get_index
+
+    records, new = get_listings_store().ingest(results)
+    priced = [r for r in new if r["price"] > 0 and r["area"] > 0]
+    if priced:
+        get_index().add(
+            [comparable_row(r) for r in priced],
+            [r["price"] for r in priced],
+            source="listing",
+        )
+    out = []
+    for result, rec in zip(results, records):
+        rec = rec or {"price": 0, "area": 0, "bedrooms": 0}
+        out.append(
+            {
+                **result,
+                "price": rec["price"],
+                "price_label": format_price(rec["price"]),
+                "area": rec["area"],
+                "bedrooms": rec["bedrooms"],
+            }
+        )
+    return out
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Repayment variant to simulate alongside the standard schedule.
+
+    Args:
+        name: Label shown in comparisons.
+        prepayments: One-off part-prepayments as {month (1-based): amount}.
+        annual_prepayment: Lump sum paid at the end of every 12th month.
+        step_up_pct: Yearly EMI increase in percent (0 keeps the EMI flat).
+    """
+
+    name: str = "Standard"
+    prepayments: dict[int, float] = field(default_factory=dict)
+    annual_prepayment: float = 0.0
+    step_up_pct: float = 0.0
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """Month-by-month amortization, one row per scenario (shape S x months)."""
+
+    scenarios: tuple[Scenario, ...]
+    emi: float
+    payment: np.ndarray
+    prepayment: np.ndarray
+    interest: np.ndarray
+    principal: np.ndarray
+    balance: np.ndarray
+    tenure_months: np.ndarray
+
+    @property
+    def total_interest(self) -> np.ndarray:
+        return self.interest.sum(axis=1)
+
+    @property
+    def total_paid(self) -> np.ndarray:
+        return (self.payment + self.prepayment).sum(axis=1)
+
+
+def emi(principal: float, annual_rate: float, months: int) -> float:
+    """Equated monthly installment for a fully amortizing loan."""
+    n = max(int(months), 1)
+    r = float(annual_rate) / 12.0 / 100.0
+    if r == 0:
+        return float(principal) / n
+    growth = (1.0 + r) ** n
+    return float(principal) * r * growth / (growth - 1.0)
+
+
+def amortize(
+    principal: float,
+    annual_rate: float,
+    months: int,
+    scenarios: Sequence[Scenario] = (Scenario(),),
+) -> Schedule:
+    """Amortize a loan under several scenarios in one vectorized pass.
+
+    Uses the closed form B_k = (1+r)^k * (P - sum_{j<=k} (pay_j + pre_j) / (1+r)^j),
+    so every month of every scenario is computed with array ops instead of a
+    Python loop. The month the balance reaches zero closes the loan; its
+    payment is trimmed to the outstanding amount and later months are zero.
+    """
+    n = max(int(months), 1)
+    P = float(principal)
+    r = float(annual_rate) / 12.0 / 100.0
+    base_emi = emi(P, annual_rate, n)
+    scenarios = tuple(scenarios) or (Scenario(),)
+    S = len(scenarios)
+
+    k = np.arange(1, n + 1)
+    step = np.array([s.step_up_pct for s in scenarios], dtype=float)[:, None] / 100.0
+    pay = base_emi * (1.0 + step) ** ((k - 1) // 12)[None, :]
+
+    pre = np.zeros((S, n))
+    annual = np.array([s.annual_prepayment for s in scenarios], dtype=float)
+    pre[:, 11::12] += annual[:, None]
+    for i, s in enumerate(scenarios):
+        for month, amount in s.prepayments.items():
+            if 1 <= month <= n:
+                pre[i, month - 1] += float(amount)
+
+    if r == 0:
+        balance = P - np.cumsum(pay + pre, axis=1)
+    else:
+        discount = (1.0 + r) ** -k
+        balance = (1.0 + r) ** k * (P - np.cumsum((pay + pre) * discount, axis=1))
+
+    # Float error leaves ~1e-7 on the last month of an exact schedule.
+    tol = max(P, 1.0) * 1e-9
+    closed = balance <= tol
+    closed[:, -1] = True
+    close_idx = closed.argmax(axis=1)
+    active = k[None, :] <= (close_idx + 1)[:, None]
+
+    prev = np.concatenate([np.full((S, 1), P), balance[:, :-1]], axis=1)
+    interest = np.where(active, prev * r, 0.0)
+
+    rows = np.arange(S)
+    final_due = prev[rows, close_idx] * (1.0 + r)
+    pay = np.where(active, pay, 0.0)
+    pre = np.where(active, pre, 0.0)
+    pay[rows, close_idx] = np.minimum(pay[rows, close_idx], final_due)
+    pre[rows, close_idx] = final_due - pay[rows, close_idx]
+
+    principal_paid = pay + pre - interest
+    balance = np.where(active, np.maximum(balance, 0.0), 0.0)
+    balance[rows, close_idx] = 0.0
+
+    return Schedule(
+        scenarios=scenarios,
+        emi=base_emi,
+        payment=pay,
+        prepayment=pre,
+        interest=interest,
+        principal=principal_paid,
+        balance=balance,
+        tenure_months=close_idx + 1,
+    )
+
+
+def yearly_totals(schedule: Schedule) -> dict[str, np.ndarray]:
+    """Aggregate a schedule by loan year; every array is shaped S x years."""
+    S, n = schedule.payment.shape
+    years = -(-n // 12)
+    pad = years * 12 - n
+
+    def by_year(a: np.ndarray) -> np.ndarray:
+        return np.pad(a, ((0, 0), (0, pad))).reshape(S, years, 12)
+
+    return {
+        "payment": by_year(schedule.payment).sum(axis=2),
+        "prepayment": by_year(schedule.prepayment).sum(axis=2),
+        "interest": by_year(schedule.interest).sum(axis=2),
+        "principal": by_year(schedule.principal).sum(axis=2),
+        # Closing balance of each year (trailing padding months are zero).
+        "balance": np.pad(
+            schedule.balance, ((0, 0), (0, pad)), mode="edge"
+        ).reshape(S, years, 12)[:, :, -1],
+    }
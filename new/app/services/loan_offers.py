@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .metrics import timed
+from .openai_client import extract_loan_offers_from_tavily_async
+from .settings import get_loan_offers_refresh_interval, get_loan_offers_ttl
+from .tavily_client import search_web_async
+from .tracing import span
+
+
+# Query common Indian banks for home loan rates.
+LOAN_OFFERS_QUERY = (
+    "latest home loan interest rates from HDFC, SBI, ICICI, Axis Bank in India"
+)
+
+
+@dataclass(frozen=True)
+class LoanOfferSnapshot:
+    """Server-wide loan offers as of `fetched_at` (epoch seconds)."""
+
+    offers: list[dict] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+    def age_seconds(self, now: Optional[float] = None) -> float:
+        return max((now if now is not None else time.time()) - self.fetched_at, 0.0)
+
+    def is_stale(self, ttl: Optional[float] = None, now: Optional[float] = None) -> bool:
+        ttl = get_loan_offers_ttl() if ttl is None else ttl
+        return self.age_seconds(now) >= ttl
+
+
+_snapshot: Optional[LoanOfferSnapshot] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def get_snapshot() -> Optional[LoanOfferSnapshot]:
+    """Return the current snapshot without touching the network."""
+    return _snapshot
+
+
+async def _fetch() -> LoanOfferSnapshot:
+    global _snapshot
+    with span("loan_offers.refresh"):
+        tavily_results = await search_web_async(LOAN_OFFERS_QUERY, max_results=5)
+        offers = await extract_loan_offers_from_tavily_async(tavily_results)
+    _snapshot = LoanOfferSnapshot(offers=offers, fetched_at=time.time())
+    return _snapshot
+
+
+def trigger_refresh() -> asyncio.Task:
+    """Start a refresh unless one is already in flight; return its task.
+
+    Concurrent callers share the same task, so a burst of sessions causes a
+    single Tavily search and a single OpenAI extraction.
+    """
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.get_running_loop().create_task(
+            _fetch(), name="propmate_loan_offers_refresh"
+        )
+        # Failures surface to awaiting callers; don't warn about unretrieved errors.
+        _refresh_task.add_done_callback(
+            lambda t: t.cancelled() or t.exception()
+        )
+    return _refresh_task
+
+
+@timed
+async def refresh_snapshot() -> LoanOfferSnapshot:
+    """Refresh now (or join the in-flight refresh) and return the result.
+
+    Raises:
+        ConfigError, AuthenticationError, RateLimitError, APIError
+    """
+    return await asyncio.shield(trigger_refresh())
+
+
+@timed
+async def get_loan_offer_snapshot() -> LoanOfferSnapshot:
+    """Return the snapshot immediately, revalidating in the background.
+
+    Only the very first call (no snapshot yet) waits for the upstreams. An
+    expired snapshot is still returned, with a refresh started behind it.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        return await refresh_snapshot()
+    if snapshot.is_stale():
+        trigger_refresh()
+    return snapshot
+
+
+async def run_refresher(interval: Optional[float] = None) -> None:
+    """Keep the snapshot warm forever; started by `lifecycle.lifespan`."""
+    while True:
+        try:
+            await refresh_snapshot()
+        except Exception:
+            # Keep serving the previous snapshot; retry on the next tick.
+            pass
+        await asyncio.sleep(
+            get_loan_offers_refresh_interval() if interval is None else interval
+        )
+
+
+def reset_snapshot() -> None:
+    global _snapshot, _refresh_task
+    _snapshot = None
+    _refresh_task = None
@@ -0,0 +1,482 @@
+"""In-process metrics: counters, latency histograms and a Prometheus text export.
+
+Service functions are wrapped with `timed`, and state event handlers with
+`timed_event`. Each records its duration in a histogram and counts
+exceptions by class. `render()` produces the Prometheus text format served at
+`/metrics`. Buckets are cumulative, so a Prometheus server can sum them across
+workers and compute server-wide p50/p95/p99 with `histogram_quantile`.
+`Histogram.quantile` gives the same estimate for a single process.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Callable, Iterable, Optional, TypeVar
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    Transition,
+    add_transition_listener,
+    breaker_states,
+)
+
+
+F = TypeVar("F", bound=Callable)
+
+# Seconds; dense below 1s for handlers, up to a minute for upstream calls.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75,
+    1.0, 1.5, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        pass
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; `observe` is O(log buckets) and allocation-free."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        # Index of the first bucket whose upper bound holds the value.
+        lo, hi = 0, len(self.buckets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if value <= self.buckets[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets))
+            series.counts[lo] += 1
+            series.sum += value
+            series.count += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series.count if series else 0
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """Estimate the q-quantile by linear interpolation inside its bucket.
+
+        Same method as Prometheus' `histogram_quantile`; None without data.
+        """
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None or series.count == 0:
+                return None
+            counts = list(series.counts)
+            total = series.count
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i else 0.0
+                if upper == math.inf:
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-2]
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(s.counts), s.sum, s.count) for key, s in self._series.items()
+            )
+        lines: list[str] = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are read from `fn` at export time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        fn: Callable[[], dict[tuple[str, ...], float]],
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self._fn = fn
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._fn().items())
+        ]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Clear recorded values, keeping the registered metrics."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+SERVICE_SECONDS: Histogram = _registry.register(
+    Histogram(
+        "propmate_service_duration_seconds",
+        "Duration of service function calls.",
+        ("function",),
+    )
+)
+EVENT_SECONDS: Histogram = _registry.register(
+    Histogram(
+        "propmate_event_duration_seconds",
+        "Duration of state event handlers, background work included.",
+        ("handler",),
+    )
+)
+UPSTREAM_SECONDS: Histogram = _registry.register(
+    Histogram(
+        "propmate_upstream_request_duration_seconds",
+        "Duration of single upstream HTTP attempts.",
+        ("upstream", "outcome"),
+    )
+)
+ERRORS: Counter = _registry.register(
+    Counter(
+        "propmate_errors_total",
+        "Exceptions raised by service functions and event handlers, by class.",
+        ("source", "error"),
+    )
+)
+EVENTS_IN_FLIGHT: Gauge = _registry.register(
+    Gauge(
+        "propmate_events_in_flight",
+        "State event handlers currently running; shutdown waits for them.",
+        ("handler",),
+    )
+)
+CIRCUIT_TRANSITIONS: Counter = _registry.register(
+    Counter(
+        "propmate_circuit_transitions_total",
+        "Circuit breaker state changes.",
+        ("upstream", "to_state"),
+    )
+)
+
+_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _breaker_state_samples() -> dict[tuple[str, ...], float]:
+    return {(name,): _STATE_CODES[s["state"]] for name, s in breaker_states().items()}
+
+
+_registry.register(
+    CallbackGauge(
+        "propmate_circuit_state",
+        "Circuit breaker state: 0 closed, 1 half-open, 2 open.",
+        ("upstream",),
+        _breaker_state_samples,
+    )
+)
+
+
+def _count_transition(change: Transition) -> None:
+    CIRCUIT_TRANSITIONS.inc(upstream=change.upstream, to_state=change.to_state)
+
+
+add_transition_listener(_count_transition)
+
+
+def _instrument(
+    fn: F, histogram: Histogram, label: str, name: str, in_flight: Optional[Gauge] = None
+) -> F:
+    """Wrap a function, coroutine or (async) generator to time it and count errors.
+
+    With `in_flight`, the gauge counts calls that have started but not finished.
+    """
+
+    def start() -> float:
+        if in_flight is not None:
+            in_flight.inc(**{label: name})
+        return time.perf_counter()
+
+    def done(started: float, error: Optional[BaseException]) -> None:
+        histogram.observe(time.perf_counter() - started, **{label: name})
+        if in_flight is not None:
+            in_flight.dec(**{label: name})
+        if isinstance(error, Exception):
+            ERRORS.inc(source=name, error=type(error).__name__)
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def agen_wrapper(*args, **kwargs):
+            started = start()
+            error: Optional[BaseException] = None
+            agen = fn(*args, **kwargs)
+            try:
+                async for item in agen:
+                    yield item
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                await agen.aclose()
+                done(started, error)
+
+        return agen_wrapper  # type: ignore[return-value]
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = start()
+            error: Optional[BaseException] = None
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                done(started, error)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def gen_wrapper(*args, **kwargs):
+            started = start()
+            error: Optional[BaseException] = None
+            try:
+                return (yield from fn(*args, **kwargs))
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                done(started, error)
+
+        return gen_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = start()
+        error: Optional[BaseException] = None
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            done(started, error)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def timed(fn: F) -> F:
+    """Record a service function's latency and errors as `<module>.<name>`."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+    return _instrument(fn, SERVICE_SECONDS, "function", name)
+
+
+def timed_event(fn: F) -> F:
+    """Record an event handler's latency and errors as `<State>.<handler>`.
+
+    Put it below `@rx.event`, so Reflex sees the wrapper with the original
+    signature. Running handlers are counted in `EVENTS_IN_FLIGHT`.
+    """
+    return _instrument(fn, EVENT_SECONDS, "handler", fn.__qualname__, EVENTS_IN_FLIGHT)
+
+
+def observe_upstream(upstream: str, seconds: float, error: Optional[BaseException]) -> None:
+    """Record one HTTP attempt to an upstream."""
+    outcome = "ok" if error is None else type(error).__name__
+    UPSTREAM_SECONDS.observe(seconds, upstream=upstream, outcome=outcome)
+
+
+def render() -> str:
+    return _registry.render()
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Starlette route serving the registry in Prometheus text format."""
+    return Response(render(), headers={"Content-Type": CONTENT_TYPE})
@@ -1,30 +1,120 @@
 from __future__ import annotations
 
-import httpx
+import json
+import time
+from typing import AsyncIterator
 
+from .cassettes import exchange, exchange_async, exchange_stream
+from .chat_history import compact_history
 from .errors import APIError, AuthenticationError, RateLimitError, ConfigError
-from .settings import get_openai_api_key, get_openai_model
+from .http_client import get_async_client, get_client
+from .lazy import lazy_import
+from .metrics import timed
+from .settings import get_openai_api_key, get_openai_base_url, get_openai_model
+from .singleflight import coalesce, coalesce_async
+from .tracing import span
+from .upstream import admit_async, call, call_async, is_transient, parse_retry_after
 
+httpx = lazy_import("httpx")
 
-def generate_chat_reply(query: str, history: list[dict] | None = None) -> str:
-    """Generate a reply using OpenAI Chat Completions.
 
-    Args:
-        query: User query string.
-        history: Optional prior messages, each with keys 'role' and 'content'.
+def _chat_completions_url() -> str:
+    return f"{get_openai_base_url().rstrip('/')}/chat/completions"
 
-    Returns:
-        Assistant text reply.
 
-    Raises:
-        ConfigError, AuthenticationError, RateLimitError, APIError
-    """
+def _headers() -> dict:
     api_key = get_openai_api_key(required=True)
-    model = get_openai_model()
-    headers = {
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
+
+
+def _check_response(resp: httpx.Response) -> dict:
+    if resp.status_code == 401 or resp.status_code == 403:
+        raise AuthenticationError("OpenAI authentication failed.")
+    if resp.status_code == 429:
+        raise RateLimitError(
+            "OpenAI rate limit exceeded.", retry_after=parse_retry_after(resp.headers)
+        )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _post_chat_completion(headers: dict, payload: dict, timeout: float) -> dict:
+    """POST to Chat Completions, joining an identical request already in flight.
+
+    The shared call is rate limited and retried (see `upstream.call`).
+    """
+    return coalesce(
+        "openai",
+        _chat_completions_url(),
+        payload,
+        lambda: call(
+            "openai", lambda t: _send_chat_completion(headers, payload, t), timeout
+        ),
+    )
+
+
+async def _post_chat_completion_async(
+    headers: dict, payload: dict, timeout: float
+) -> dict:
+    """Async counterpart of `_post_chat_completion`."""
+    return await coalesce_async(
+        "openai",
+        _chat_completions_url(),
+        payload,
+        lambda: call_async(
+            "openai", lambda t: _send_chat_completion_async(headers, payload, t), timeout
+        ),
+    )
+
+
+def _send_chat_completion(headers: dict, payload: dict, timeout: float) -> dict:
+    """POST to Chat Completions on the shared client and map errors."""
+    try:
+        resp = get_client("openai").post(
+            _chat_completions_url(),
+            headers=headers,
+            json=payload,
+            timeout=httpx.Timeout(timeout),
+        )
+        return _check_response(resp)
+    except httpx.TimeoutException as e:
+        raise APIError("OpenAI request timed out.", retryable=True) from e
+    except httpx.HTTPStatusError as e:
+        raise APIError(
+            f"OpenAI HTTP error: {e.response.status_code}",
+            retryable=is_transient(e.response.status_code),
+        ) from e
+    except httpx.RequestError as e:
+        raise APIError(f"OpenAI request error: {e}", retryable=True) from e
+
+
+async def _send_chat_completion_async(
+    headers: dict, payload: dict, timeout: float
+) -> dict:
+    """Async counterpart of `_send_chat_completion`."""
+    try:
+        resp = await get_async_client("openai").post(
+            _chat_completions_url(),
+            headers=headers,
+            json=payload,
+            timeout=httpx.Timeout(timeout),
+        )
+        return _check_response(resp)
+    except httpx.TimeoutException as e:
+        raise APIError("OpenAI request timed out.", retryable=True) from e
+    except httpx.HTTPStatusError as e:
+        raise APIError(
+            f"OpenAI HTTP error: {e.response.status_code}",
+            retryable=is_transient(e.response.status_code),
+        ) from e
+    except httpx.RequestError as e:
+        raise APIError(f"OpenAI request error: {e}", retryable=True) from e
+
+
+def _chat_payload(query: str, history: list[dict] | None) -> dict:
     messages: list[dict] = [
         {
             "role": "system",
@@ -35,53 +125,184 @@ def generate_chat_reply(query: str, history: list[dict] | None = None) -> str:
         }
     ]
     if history:
-        messages.extend(history)
+        # Deduplicated and trimmed to the token budget; older turns summarized.
+        with span("chat_history.compact", turns=len(history)):
+            messages.extend(compact_history(history, query))
     if query:
         messages.append({"role": "user", "content": query})
 
-    payload = {
-        "model": model,
+    return {
+        "model": get_openai_model(),
         "messages": messages,
         "temperature": 0.7,
     }
 
+
+def _compact(data: dict) -> dict:
+    # Only the reply text is read back; kept for recorded cassettes.
     try:
-        with httpx.Client(timeout=httpx.Timeout(15.0)) as client:
-            resp = client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-            if resp.status_code == 401 or resp.status_code == 403:
-                raise AuthenticationError("OpenAI authentication failed.")
-            if resp.status_code == 429:
-                raise RateLimitError("OpenAI rate limit exceeded.")
-            resp.raise_for_status()
-            data = resp.json()
-    except httpx.TimeoutException as e:
-        raise APIError("OpenAI request timed out.") from e
-    except httpx.HTTPStatusError as e:
-        raise APIError(f"OpenAI HTTP error: {e.response.status_code}") from e
-    except httpx.RequestError as e:
-        raise APIError(f"OpenAI request error: {e}") from e
+        content = data["choices"][0]["message"]["content"]
+    except Exception:
+        return data
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
 
+
+def _complete(payload: dict, timeout: float) -> dict:
+    """Chat Completions response for `payload`, live or from the cassette store."""
+    return exchange(
+        "openai",
+        "/chat/completions",
+        payload,
+        lambda: _post_chat_completion(_headers(), payload, timeout),
+        _compact,
+    )
+
+
+async def _complete_async(payload: dict, timeout: float) -> dict:
+    """Async counterpart of `_complete`."""
+    return await exchange_async(
+        "openai",
+        "/chat/completions",
+        payload,
+        lambda: _post_chat_completion_async(_headers(), payload, timeout),
+        _compact,
+    )
+
+
+def _parse_chat_reply(data: dict) -> str:
     try:
         return data["choices"][0]["message"]["content"].strip()
     except Exception:
         raise APIError("Unexpected OpenAI response format.")
 
 
-def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
-    """Use OpenAI to extract structured loan offers from Tavily results.
+@timed
+def generate_chat_reply(query: str, history: list[dict] | None = None) -> str:
+    """Generate a reply using OpenAI Chat Completions.
 
-    Returns a list of {bank_name, interest_rate, processing_fee} dicts.
+    Args:
+        query: User query string.
+        history: Optional prior messages, each with keys 'role' and 'content'.
+
+    Returns:
+        Assistant text reply.
+
+    Raises:
+        ConfigError, AuthenticationError, RateLimitError, APIError
     """
-    api_key = get_openai_api_key(required=True)
-    model = get_openai_model()
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    payload = _chat_payload(query, history)
+    data = _complete(payload, timeout=15.0)
+    return _parse_chat_reply(data)
+
+
+@timed
+async def generate_chat_reply_async(
+    query: str, history: list[dict] | None = None
+) -> str:
+    """Async version of `generate_chat_reply`; same arguments and errors."""
+    payload = _chat_payload(query, history)
+    data = await _complete_async(payload, timeout=15.0)
+    return _parse_chat_reply(data)
+
+
+_STREAM_DONE = object()
+
+
+def _parse_stream_line(line: str) -> object:
+    """Parse one SSE line from a streamed completion.
+
+    Returns the content delta (possibly empty), or `_STREAM_DONE` at the end.
+    """
+    if not line.startswith("data:"):
+        # Blank keep-alive lines, comments and event names carry no tokens.
+        return ""
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return _STREAM_DONE
+    try:
+        chunk = json.loads(data)
+        delta = chunk["choices"][0].get("delta") or {}
+    except (ValueError, KeyError, IndexError, TypeError):
+        raise APIError("Unexpected OpenAI stream format.")
+    return delta.get("content") or ""
+
+
+@timed
+async def stream_chat_reply_async(
+    query: str, history: list[dict] | None = None
+) -> AsyncIterator[str]:
+    """Stream a reply from Chat Completions, yielding text deltas as they arrive.
+
+    Same arguments and errors as `generate_chat_reply`; status errors are
+    raised before the first token. The request waits for the OpenAI rate
+    limiter and counts toward its circuit breaker, but is not retried,
+    since tokens may already have been shown.
+    """
+    payload = _chat_payload(query, history)
+    payload["stream"] = True
+    async for delta in exchange_stream(
+        "openai",
+        "/chat/completions",
+        payload,
+        lambda: _stream_chat_completion(_headers(), payload),
+    ):
+        yield delta
+
+
+async def _stream_chat_completion(headers: dict, payload: dict) -> AsyncIterator[str]:
+    """Stream `payload` from Chat Completions on the shared client and map errors."""
+    breaker = await admit_async("openai")
+    started = time.monotonic()
+    try:
+        async with get_async_client("openai").stream(
+            "POST",
+            _chat_completions_url(),
+            headers=headers,
+            json=payload,
+            timeout=httpx.Timeout(15.0),
+        ) as resp:
+            if resp.status_code == 401 or resp.status_code == 403:
+                raise AuthenticationError("OpenAI authentication failed.")
+            if resp.status_code == 429:
+                raise RateLimitError(
+                    "OpenAI rate limit exceeded.",
+                    retry_after=parse_retry_after(resp.headers),
+                )
+            if resp.status_code >= 400:
+                raise APIError(
+                    f"OpenAI HTTP error: {resp.status_code}",
+                    retryable=is_transient(resp.status_code),
+                )
+            # Judge latency by time to first byte, not the length of the reply.
+            breaker.record(time.monotonic() - started, None)
+            breaker = None
+            async for line in resp.aiter_lines():
+                delta = _parse_stream_line(line)
+                if delta is _STREAM_DONE:
+                    break
+                if delta:
+                    yield delta
+    except httpx.TimeoutException as e:
+        error = APIError("OpenAI request timed out.", retryable=True)
+        if breaker is not None:
+            breaker.record(time.monotonic() - started, error)
+        raise error from e
+    except httpx.RequestError as e:
+        error = APIError(f"OpenAI request error: {e}", retryable=True)
+        if breaker is not None:
+            breaker.record(time.monotonic() - started, error)
+        raise error from e
+    except Exception as e:
+        if breaker is not None:
+            breaker.record(time.monotonic() - started, e)
+        raise
+    except BaseException:
+        if breaker is not None:
+            breaker.release()
+        raise
+
+
+def _loan_offers_payload(tavily_results: list[dict]) -> dict:
     system_prompt = (
         "You are a financial data extractor. Based on the provided search results "
         "about home loan interest rates in India, extract the bank name, interest "
@@ -89,8 +310,8 @@ def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
         "Respond ONLY with a JSON object containing a single key 'loan_offers', which is a list of objects. "
         "Each object must have these keys: 'bank_name', 'interest_rate', 'processing_fee'."
     )
-    payload = {
-        "model": model,
+    return {
+        "model": get_openai_model(),
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Tavily Search Results: {tavily_results}"},
@@ -100,26 +321,8 @@ def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
         "temperature": 0,
     }
 
-    try:
-        with httpx.Client(timeout=httpx.Timeout(20.0)) as client:
-            resp = client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-            if resp.status_code == 401 or resp.status_code == 403:
-                raise AuthenticationError("OpenAI authentication failed.")
-            if resp.status_code == 429:
-                raise RateLimitError("OpenAI rate limit exceeded.")
-            resp.raise_for_status()
-            data = resp.json()
-    except httpx.TimeoutException as e:
-        raise APIError("OpenAI request timed out.") from e
-    except httpx.HTTPStatusError as e:
-        raise APIError(f"OpenAI HTTP error: {e.response.status_code}") from e
-    except httpx.RequestError as e:
-        raise APIError(f"OpenAI request error: {e}") from e
 
+def _parse_loan_offers(data: dict) -> list[dict]:
     try:
         content = data["choices"][0]["message"]["content"].strip()
     except Exception:
@@ -127,8 +330,6 @@ def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
 
     # Parse JSON response with fallback.
     try:
-        import json
-
         parsed = json.loads(content)
         offers = parsed.get("loan_offers") or []
         if isinstance(offers, list):
@@ -145,4 +346,25 @@ def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
         return []
     except Exception as e:
         # Fallback: return empty to allow UI to degrade gracefully.
-        raise APIError("Failed to parse loan offers JSON.") from e
\ No newline at end of file
+        raise APIError("Failed to parse loan offers JSON.") from e
+
+
+@timed
+def extract_loan_offers_from_tavily(tavily_results: list[dict]) -> list[dict]:
+    """Use OpenAI to extract structured loan offers from Tavily results.
+
+    Returns a list of {bank_name, interest_rate, processing_fee} dicts.
+    """
+    payload = _loan_offers_payload(tavily_results)
+    data = _complete(payload, timeout=20.0)
+    return _parse_loan_offers(data)
+
+
+@timed
+async def extract_loan_offers_from_tavily_async(
+    tavily_results: list[dict],
+) -> list[dict]:
+    """Async version of `extract_loan_offers_from_tavily`."""
+    payload = _loan_offers_payload(tavily_results)
+    data = await _complete_async(payload, timeout=20.0)
+    return _parse_loan_offers(data)
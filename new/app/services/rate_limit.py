@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Protocol
+
+from .errors import RateLimitError
+from .settings import get_rate_limit, get_rate_limit_db_path
+
+
+class Bucket(Protocol):
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available and return 0, else return seconds to wait."""
+        ...
+
+
+class TokenBucket:
+    """In-process token bucket: `rate` tokens per second, up to `capacity`.
+
+    Args:
+        rate: Refill rate in tokens per second.
+        capacity: Max burst size; the bucket starts full.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = max(rate, 1e-9)
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in SQLite, shared by every worker process.
+
+    Each acquisition is one short write transaction, so workers on the same
+    host draw from a single budget per upstream.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self.rate = max(rate, 1e-9)
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so read-modify-write
+            # can't interleave with another process.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                level = self.capacity if row is None else row[0] + max(now - row[1], 0.0) * self.rate
+                level = min(self.capacity, level)
+                wait = 0.0
+                if level >= tokens:
+                    level -= tokens
+                else:
+                    wait = (tokens - level) / self.rate
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (self.name, level, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def acquire(bucket: Bucket, timeout: float) -> None:
+    """Block until a token is available.
+
+    Raises:
+        RateLimitError: If no token frees up within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        wait = bucket.try_acquire()
+        if wait <= 0:
+            return
+        if time.monotonic() + wait > deadline:
+            raise RateLimitError("Client-side rate limit: no capacity before deadline.", retry_after=wait)
+        time.sleep(wait)
+
+
+async def acquire_async(bucket: Bucket, timeout: float) -> None:
+    """Async version of `acquire`.
+
+    A `SQLiteTokenBucket` is taken from a worker thread: its transaction can
+    wait up to the busy timeout for another process's write lock.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    blocking = isinstance(bucket, SQLiteTokenBucket)
+    while True:
+        wait = await asyncio.to_thread(bucket.try_acquire) if blocking else bucket.try_acquire()
+        if wait <= 0:
+            return
+        if loop.time() + wait > deadline:
+            raise RateLimitError("Client-side rate limit: no capacity before deadline.", retry_after=wait)
+        await asyncio.sleep(wait)
+
+
+_buckets: dict[str, Bucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(upstream: str) -> Optional[Bucket]:
+    """The limiter for an upstream, or None when its rate is unlimited (0)."""
+    bucket = _buckets.get(upstream)
+    if bucket is not None:
+        return bucket
+    rate, burst = get_rate_limit(upstream)
+    if rate <= 0:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(upstream)
+        if bucket is None:
+            path = get_rate_limit_db_path()
+            bucket = (
+                SQLiteTokenBucket(path, upstream, rate, burst)
+                if path
+                else TokenBucket(rate, burst)
+            )
+            _buckets[upstream] = bucket
+    return bucket
+
+
+def reset_buckets() -> None:
+    with _buckets_lock:
+        for bucket in _buckets.values():
+            if isinstance(bucket, SQLiteTokenBucket):
+                bucket.close()
+        _buckets.clear()
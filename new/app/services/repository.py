@@ -0,0 +1,509 @@
+"""Persistent, indexed storage for property analyses.
+
+Each analysis is stored with its indexed fields (session, normalized
+locality, bedrooms, area, value, creation time) next to the full entry, so
+history pages and comparisons are index lookups. Backends:
+
+- `SQLiteBackend`: a local file, the default (`sqlite:///path/to/analyses.db`).
+- `MongoBackend`: any pymongo-compatible collection (`mongodb://...`).
+
+Writes are buffered by `AnalysisRepository` and written in batches by
+`run_flusher`, off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from statistics import median
+from typing import Any, Callable, Iterator, Optional, Protocol, Sequence
+
+from .settings import (
+    get_analysis_db_url,
+    get_analysis_flush_interval,
+    get_analysis_write_batch_size,
+)
+from .valuation import normalize_locality
+
+
+@dataclass(frozen=True)
+class AnalysisQuery:
+    """Filters for analysis lookups; None leaves a field unconstrained."""
+
+    session: Optional[str] = None
+    location: Optional[str] = None
+    bedrooms: Optional[int] = None
+    min_area: Optional[int] = None
+    max_area: Optional[int] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+
+
+# What the comparables index needs from a stored analysis; `location` is the
+# entry's display location (the indexed `locality` is its normalized form).
+COMPARABLE_FIELDS = ("location", "area", "bedrooms", "bathrooms", "floor", "value")
+
+
+class AnalysisBackend(Protocol):
+    """Storage backend for analysis records.
+
+    A record is a dict with keys session, locality, bedrooms, area, value,
+    created_at and entry (the full analysis dict).
+    """
+
+    def insert_many(self, records: Sequence[dict]) -> None: ...
+
+    def find(
+        self, query: AnalysisQuery, limit: int, offset: int = 0
+    ) -> list[dict]:
+        """Matching records, newest first."""
+        ...
+
+    def count(self, query: AnalysisQuery) -> int: ...
+
+    def iter_comparables(self, limit: int, page_size: int) -> Iterator[list[dict]]:
+        """Newest `limit` records as `COMPARABLE_FIELDS`-only rows, in pages."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteBackend:
+    """Analyses in one SQLite table with indexes for every query shape."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "id INTEGER PRIMARY KEY, session TEXT NOT NULL, "
+                "locality TEXT NOT NULL, bedrooms INTEGER NOT NULL, "
+                "area INTEGER NOT NULL, value INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, entry TEXT NOT NULL)"
+            )
+            for name, columns in (
+                ("session_created", "session, created_at"),
+                ("locality_bedrooms_area", "locality, bedrooms, area"),
+                ("bedrooms_area", "bedrooms, area"),
+                ("area", "area"),
+                ("created", "created_at"),
+            ):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_analyses_{name} "
+                    f"ON analyses ({columns})"
+                )
+
+    @staticmethod
+    def _where(query: AnalysisQuery) -> tuple[str, list]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        for column, op, value in (
+            ("session", "=", query.session),
+            ("locality", "=", None if query.location is None else normalize_locality(query.location)),
+            ("bedrooms", "=", query.bedrooms),
+            ("area", ">=", query.min_area),
+            ("area", "<=", query.max_area),
+            ("created_at", ">=", query.since),
+            ("created_at", "<=", query.until),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def insert_many(self, records: Sequence[dict]) -> None:
+        rows = [
+            (
+                r["session"],
+                r["locality"],
+                r["bedrooms"],
+                r["area"],
+                r["value"],
+                r["created_at"],
+                json.dumps(r["entry"], separators=(",", ":"), ensure_ascii=False),
+            )
+            for r in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO analyses "
+                "(session, locality, bedrooms, area, value, created_at, entry) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def find(self, query: AnalysisQuery, limit: int, offset: int = 0) -> list[dict]:
+        where, params = self._where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session, locality, bedrooms, area, value, created_at, entry "
+                f"FROM analyses{where} ORDER BY created_at DESC, id DESC "
+                "LIMIT ? OFFSET ?",
+                params + [max(limit, 0), max(offset, 0)],
+            ).fetchall()
+        return [
+            {
+                "session": r[0],
+                "locality": r[1],
+                "bedrooms": r[2],
+                "area": r[3],
+                "value": r[4],
+                "created_at": r[5],
+                "entry": json.loads(r[6]),
+            }
+            for r in rows
+        ]
+
+    def count(self, query: AnalysisQuery) -> int:
+        where, params = self._where(query)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM analyses{where}", params
+            ).fetchone()[0]
+
+    def iter_comparables(self, limit: int, page_size: int) -> Iterator[list[dict]]:
+        # Keyset pages by id; the entry JSON is never decoded in Python and
+        # the lock is released between pages.
+        last_id = None
+        while limit > 0:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, json_extract(entry, '$.location'), area, bedrooms, "
+                    "json_extract(entry, '$.bathrooms'), json_extract(entry, '$.floor'), "
+                    "value FROM analyses"
+                    + ("" if last_id is None else " WHERE id < ?")
+                    + " ORDER BY id DESC LIMIT ?",
+                    ([] if last_id is None else [last_id]) + [min(page_size, limit)],
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            limit -= len(rows)
+            yield [dict(zip(COMPARABLE_FIELDS, r[1:])) for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MongoBackend:
+    """Analyses in a MongoDB collection (or anything with the pymongo API)."""
+
+    def __init__(self, collection: Any) -> None:
+        self._collection = collection
+        for keys in (
+            [("session", 1), ("created_at", -1)],
+            [("locality", 1), ("bedrooms", 1), ("area", 1)],
+            [("bedrooms", 1), ("area", 1)],
+            [("area", 1)],
+            [("created_at", -1)],
+        ):
+            collection.create_index(keys)
+
+    @classmethod
+    def from_url(cls, url: str, database: str = "propmate") -> "MongoBackend":
+        from pymongo import MongoClient
+
+        client = MongoClient(url)
+        backend = cls(client[database]["analyses"])
+        backend._client = client
+        return backend
+
+    @staticmethod
+    def _filter(query: AnalysisQuery) -> dict:
+        flt: dict[str, Any] = {}
+        if query.session is not None:
+            flt["session"] = query.session
+        if query.location is not None:
+            flt["locality"] = normalize_locality(query.location)
+        if query.bedrooms is not None:
+            flt["bedrooms"] = query.bedrooms
+        area = {
+            op: v
+            for op, v in (("$gte", query.min_area), ("$lte", query.max_area))
+            if v is not None
+        }
+        if area:
+            flt["area"] = area
+        created = {
+            op: v
+            for op, v in (("$gte", query.since), ("$lte", query.until))
+            if v is not None
+        }
+        if created:
+            flt["created_at"] = created
+        return flt
+
+    def insert_many(self, records: Sequence[dict]) -> None:
+        # insert_many adds _id to the dicts it is given; hand it copies.
+        self._collection.insert_many([dict(r) for r in records], ordered=False)
+
+    def find(self, query: AnalysisQuery, limit: int, offset: int = 0) -> list[dict]:
+        if limit <= 0:
+            return []
+        cursor = (
+            self._collection.find(self._filter(query), {"_id": 0})
+            .sort("created_at", -1)
+            .skip(max(offset, 0))
+            .limit(limit)
+        )
+        return list(cursor)
+
+    def count(self, query: AnalysisQuery) -> int:
+        return self._collection.count_documents(self._filter(query))
+
+    def iter_comparables(self, limit: int, page_size: int) -> Iterator[list[dict]]:
+        if limit <= 0:
+            return
+        projection = {
+            "_id": 0,
+            "entry.location": 1,
+            "area": 1,
+            "bedrooms": 1,
+            "entry.bathrooms": 1,
+            "entry.floor": 1,
+            "value": 1,
+        }
+        cursor = (
+            self._collection.find({}, projection)
+            .sort("created_at", -1)
+            .limit(limit)
+            .batch_size(page_size)
+        )
+        page: list[dict] = []
+        for doc in cursor:
+            entry = doc.get("entry", {})
+            page.append(
+                {
+                    "location": entry.get("location", ""),
+                    "area": doc["area"],
+                    "bedrooms": doc["bedrooms"],
+                    "bathrooms": entry.get("bathrooms", 0),
+                    "floor": entry.get("floor", 0),
+                    "value": doc["value"],
+                }
+            )
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def close(self) -> None:
+        client = getattr(self, "_client", None)
+        if client is not None:
+            client.close()
+
+
+def open_backend(url: str) -> AnalysisBackend:
+    """Backend for a `sqlite:///path` or `mongodb://` URL."""
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("mongodb://", "mongodb+srv://")):
+        return MongoBackend.from_url(url)
+    raise ValueError(f"Unsupported analysis store URL: {url!r}")
+
+
+class AnalysisRepository:
+    """Buffered writes and indexed queries over an `AnalysisBackend`.
+
+    Args:
+        backend: Where records are stored.
+        batch_size: Buffered records that trigger a flush.
+        flush_interval: Max seconds a record waits in the buffer.
+        clock: Wall-clock time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        backend: AnalysisBackend,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._buffer: list[dict] = []
+        self._buffered_since = 0.0
+        # Guards the buffer only; never held across backend I/O, so `add`
+        # cannot wait on the store.
+        self._lock = threading.Lock()
+        # Serializes flushes, so a read that flushes first waits for a write
+        # already in progress instead of missing its records.
+        self._flush_lock = threading.Lock()
+
+    def add(self, session: str, entries: Sequence[dict], values: Sequence[int]) -> None:
+        """Queue analyses (oldest first) with their numeric values for storage.
+
+        Never touches the backend, so it is safe on the event loop; the
+        records are written by `flush` (see `run_flusher`) or the next read.
+        """
+        now = self._clock()
+        records = [
+            {
+                "session": session,
+                "locality": normalize_locality(entry.get("location", "")),
+                "bedrooms": int(entry.get("bedrooms") or 0),
+                "area": int(entry.get("area") or 0),
+                "value": int(value),
+                # Keep insertion order within one call on coarse clocks.
+                "created_at": now + i * 1e-6,
+                "entry": dict(entry),
+            }
+            for i, (entry, value) in enumerate(zip(entries, values))
+        ]
+        with self._lock:
+            if not self._buffer:
+                self._buffered_since = now
+            self._buffer.extend(records)
+
+    def flush_due(self) -> bool:
+        """Whether a full batch is buffered or the oldest record waited `flush_interval`."""
+        with self._lock:
+            return bool(self._buffer) and (
+                len(self._buffer) >= self.batch_size
+                or self._clock() - self._buffered_since >= self.flush_interval
+            )
+
+    def flush(self) -> int:
+        """Write buffered records in one batch; returns how many were written. Blocking."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                since = self._buffered_since
+            if not batch:
+                return 0
+            try:
+                self.backend.insert_many(batch)
+            except Exception:
+                # Keep the records, ahead of any added meanwhile, for the next attempt.
+                with self._lock:
+                    self._buffer = batch + self._buffer
+                    self._buffered_since = since
+                raise
+        return len(batch)
+
+    def find(self, query: AnalysisQuery, limit: int = 50, offset: int = 0) -> list[dict]:
+        """Matching records, newest first (buffered writes are flushed first)."""
+        self.flush()
+        return self.backend.find(query, limit, offset)
+
+    def count(self, query: AnalysisQuery = AnalysisQuery()) -> int:
+        self.flush()
+        return self.backend.count(query)
+
+    def iter_comparables(
+        self, limit: int, page_size: int = 10000
+    ) -> Iterator[list[dict]]:
+        """The newest `limit` analyses as pages of `COMPARABLE_FIELDS` dicts.
+
+        Reads only those fields, a page at a time, so loading the comparables
+        index never holds every full entry in memory. Blocking.
+        """
+        self.flush()
+        return self.backend.iter_comparables(limit, max(1, page_size))
+
+    def history(self, session: str, offset: int = 0, limit: int = 10) -> list[dict]:
+        """A session's analysis entries, newest first."""
+        records = self.find(AnalysisQuery(session=session), limit, offset)
+        return [r["entry"] for r in records]
+
+    def compare(
+        self,
+        location: str,
+        bedrooms: Optional[int],
+        area: int,
+        tolerance: float = 0.2,
+        limit: int = 200,
+    ) -> dict:
+        """Summary of stored analyses similar to a property.
+
+        Matches the same locality and bedroom count with area within
+        `tolerance` (a fraction), using the locality/bedrooms/area index.
+
+        Returns:
+            {count, median_value, median_rate, min_value, max_value}; the
+            numbers are 0 when nothing matched.
+        """
+        slack = max(int(area * tolerance), 0)
+        records = self.find(
+            AnalysisQuery(
+                location=location,
+                bedrooms=bedrooms,
+                min_area=area - slack,
+                max_area=area + slack,
+            ),
+            limit=limit,
+        )
+        values = [r["value"] for r in records]
+        rates = [r["value"] / r["area"] for r in records if r["area"] > 0]
+        return {
+            "count": len(records),
+            "median_value": int(median(values)) if values else 0,
+            "median_rate": int(median(rates)) if rates else 0,
+            "min_value": min(values, default=0),
+            "max_value": max(values, default=0),
+        }
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.backend.close()
+
+
+_repository: Optional[AnalysisRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> AnalysisRepository:
+    """The process-wide repository, opened on first use from settings."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = AnalysisRepository(
+                    open_backend(get_analysis_db_url()),
+                    batch_size=get_analysis_write_batch_size(),
+                    flush_interval=get_analysis_flush_interval(),
+                )
+    return _repository
+
+
+def reset_repository() -> None:
+    global _repository
+    with _repository_lock:
+        if _repository is not None:
+            _repository.close()
+        _repository = None
+
+
+async def run_flusher(interval: Optional[float] = None) -> None:
+    """Write buffered analyses in a worker thread whenever a flush is due.
+
+    Checks every `interval` seconds (default: a quarter of
+    `PROPMATE_ANALYSIS_FLUSH_INTERVAL`, at most 0.25 s). Started by
+    `lifecycle.lifespan`.
+    """
+    if interval is None:
+        interval = min(get_analysis_flush_interval() / 4, 0.25)
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if _repository is not None and _repository.flush_due():
+                try:
+                    await asyncio.to_thread(_repository.flush)
+                except Exception:
+                    # Records stay buffered; retry on the next tick.
+                    pass
+    finally:
+        if _repository is not None:
+            await asyncio.to_thread(_repository.flush)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import unicodedata
+from typing import Optional
+
+from .cache import SQLiteCache, TTLCache
+from .metrics import timed
+from .settings import (
+    get_search_cache_db_path,
+    get_search_cache_size,
+    get_search_cache_ttl,
+)
+from .tavily_client import search_web, search_web_async
+
+
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d)")
+_BHK = re.compile(r"(\d+)\s*bhk\b")
+_RUPEE = re.compile(r"(?:₹|\brs\.?|\binr)\s*(?=\d)")
+_PUNCT = re.compile(r"[^\w\s₹.]+")
+_SPACES = re.compile(r"\s+")
+
+_memory: Optional[TTLCache] = None
+_disk: Optional[SQLiteCache] = None
+_init_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Canonicalize a search query so equivalent phrasings share a cache key.
+
+    Lowercases, folds unicode, drops thousands separators and punctuation,
+    and spells "3BHK"/"3 bhk" and "Rs 90"/"₹ 90" the same way.
+    """
+    q = unicodedata.normalize("NFKC", query or "").lower()
+    q = _THOUSANDS.sub("", q)
+    q = _RUPEE.sub("₹", q)
+    q = _BHK.sub(r"\1 bhk", q)
+    q = _PUNCT.sub(" ", q)
+    return _SPACES.sub(" ", q).strip()
+
+
+def cache_key(query: str, max_results: int) -> str:
+    return f"tavily:{max_results}:{normalize_query(query)}"
+
+
+def _tiers() -> tuple[TTLCache, Optional[SQLiteCache]]:
+    global _memory, _disk
+    if _memory is None:
+        with _init_lock:
+            if _memory is None:
+                ttl = get_search_cache_ttl()
+                db_path = get_search_cache_db_path()
+                _disk = SQLiteCache(db_path, ttl=ttl) if db_path else None
+                _memory = TTLCache(maxsize=get_search_cache_size(), ttl=ttl)
+    return _memory, _disk
+
+
+def _lookup(key: str) -> Optional[list[dict]]:
+    memory, disk = _tiers()
+    hit = memory.get(key)
+    if hit is None and disk is not None:
+        hit = disk.get(key)
+        if hit is not None:
+            # Promote so the next lookup in this process stays in memory.
+            memory.set(key, hit)
+    return None if hit is None else [dict(r) for r in hit]
+
+
+def _store(key: str, results: list[dict]) -> None:
+    memory, disk = _tiers()
+    memory.set(key, results)
+    if disk is not None:
+        disk.set(key, results)
+
+
+# The async versions read and write the SQLite tier from a worker thread.
+async def _lookup_async(key: str) -> Optional[list[dict]]:
+    memory, disk = _tiers()
+    hit = memory.get(key)
+    if hit is None and disk is not None:
+        hit = await asyncio.to_thread(disk.get, key)
+        if hit is not None:
+            memory.set(key, hit)
+    return None if hit is None else [dict(r) for r in hit]
+
+
+async def _store_async(key: str, results: list[dict]) -> None:
+    memory, disk = _tiers()
+    memory.set(key, results)
+    if disk is not None:
+        await asyncio.to_thread(disk.set, key, results)
+
+
+@timed
+def search_web_cached(query: str, max_results: int = 6) -> list[dict]:
+    """`search_web` behind the memory and (optional) SQLite cache tiers.
+
+    Errors are never cached; they propagate exactly as from `search_web`.
+    """
+    key = cache_key(query, max_results)
+    hit = _lookup(key)
+    if hit is not None:
+        return hit
+    results = search_web(query, max_results=max_results)
+    _store(key, results)
+    return [dict(r) for r in results]
+
+
+@timed
+async def search_web_cached_async(query: str, max_results: int = 6) -> list[dict]:
+    """Async version of `search_web_cached`."""
+    key = cache_key(query, max_results)
+    hit = await _lookup_async(key)
+    if hit is not None:
+        return hit
+    results = await search_web_async(query, max_results=max_results)
+    await _store_async(key, results)
+    return [dict(r) for r in results]
+
+
+def cache_stats() -> dict:
+    """Hit/miss/eviction counters per tier, e.g. for monitoring."""
+    memory, disk = _tiers()
+    return {
+        "memory": {**memory.stats.as_dict(), "size": len(memory)},
+        "disk": disk.stats.as_dict() if disk is not None else None,
+    }
+
+
+def prune_cache() -> int:
+    """Delete expired rows from the SQLite tier; returns how many. Blocking."""
+    _, disk = _tiers()
+    return disk.prune() if disk is not None else 0
+
+
+async def run_cache_pruner(interval: Optional[float] = None) -> None:
+    """Prune the SQLite tier every `interval` seconds (default: the cache TTL).
+
+    Expired rows are otherwise only deleted when looked up again. Started by
+    `lifecycle.lifespan`.
+    """
+    while True:
+        await asyncio.sleep(get_search_cache_ttl() if interval is None else interval)
+        try:
+            await asyncio.to_thread(prune_cache)
+        except Exception:
+            # Retry on the next tick.
+            pass
+
+
+def reset_cache() -> None:
+    """Forget both tiers (the SQLite file is kept); rebuilt from settings on next use."""
+    global _memory, _disk
+    with _init_lock:
+        if _disk is not None:
+            _disk.close()
+        _memory = None
+        _disk = None
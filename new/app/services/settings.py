@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import inspect
 import os
+import tempfile
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from dotenv import load_dotenv
 
@@ -13,8 +16,16 @@ _ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
 load_dotenv(_ENV_PATH, override=False)
 
 
+# Frozen copy of the environment served to every getter while the app runs
+# (see `freeze_settings`); None reads `os.environ` live.
+_snapshot: Optional[Mapping[str, str]] = None
+# Numeric settings whose values failed to parse, by name.
+_invalid: dict[str, str] = {}
+
+
 def _get(name: str, default: Optional[str] = None, required: bool = False) -> str:
-    val = os.getenv(name, default)
+    env = _snapshot if _snapshot is not None else os.environ
+    val = env.get(name, default)
     if required and not val:
         from .errors import ConfigError
 
@@ -31,10 +42,324 @@ def get_openai_model() -> str:
     return _get("OPENAI_MODEL", default="gpt-4o-mini", required=False)
 
 
+def get_openai_base_url() -> str:
+    # Default to official base URL; point at a compatible server to redirect.
+    return _get("OPENAI_BASE_URL", default="https://api.openai.com/v1", required=False)
+
+
 def get_tavily_api_key(required: bool = True) -> str:
     return _get("TAVILY_API_KEY", required=required)
 
 
 def get_tavily_base_url() -> str:
     # Default to official base URL.
-    return _get("TAVILY_BASE_URL", default="https://api.tavily.com", required=False)
\ No newline at end of file
+    return _get("TAVILY_BASE_URL", default="https://api.tavily.com", required=False)
+
+
+def _get_int(name: str, default: int) -> int:
+    raw = _get(name, default=str(default))
+    try:
+        return int(raw)
+    except ValueError:
+        _invalid[name] = raw
+        return default
+
+
+def _get_float(name: str, default: float) -> float:
+    raw = _get(name, default=str(default))
+    try:
+        return float(raw)
+    except ValueError:
+        _invalid[name] = raw
+        return default
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    val = _get(name, default="1" if default else "0").strip().lower()
+    return val in ("1", "true", "yes", "on")
+
+
+def get_http2_enabled() -> bool:
+    # HTTP/2 needs the optional `h2` package; the client registry falls back otherwise.
+    return _get_bool("PROPMATE_HTTP2", default=False)
+
+
+def get_http_max_connections() -> int:
+    return _get_int("PROPMATE_HTTP_MAX_CONNECTIONS", 100)
+
+
+def get_http_max_keepalive_connections() -> int:
+    return _get_int("PROPMATE_HTTP_MAX_KEEPALIVE", 20)
+
+
+def get_http_keepalive_expiry() -> float:
+    return _get_float("PROPMATE_HTTP_KEEPALIVE_EXPIRY", 30.0)
+
+
+def get_search_cache_ttl() -> float:
+    return _get_float("PROPMATE_SEARCH_CACHE_TTL", 900.0)
+
+
+def get_search_cache_size() -> int:
+    return _get_int("PROPMATE_SEARCH_CACHE_SIZE", 512)
+
+
+def get_search_cache_db_path() -> str:
+    # Empty disables the on-disk tier.
+    return _get("PROPMATE_SEARCH_CACHE_DB", default="", required=False)
+
+
+def get_loan_offers_ttl() -> float:
+    # Loan offers barely move within an hour; older snapshots are served stale.
+    return _get_float("PROPMATE_LOAN_OFFERS_TTL", 3600.0)
+
+
+def get_loan_offers_refresh_interval() -> float:
+    # Refresh a little before the TTL so sessions rarely see a stale snapshot.
+    return _get_float("PROPMATE_LOAN_OFFERS_REFRESH_INTERVAL", 3300.0)
+
+
+def get_chat_stream_fps() -> float:
+    # Max UI updates per second while a chat reply streams in.
+    return max(_get_float("PROPMATE_CHAT_STREAM_FPS", 15.0), 1.0)
+
+
+def get_chat_history_token_budget() -> int:
+    # Estimated tokens of prior turns sent with each chat request.
+    return _get_int("PROPMATE_CHAT_TOKEN_BUDGET", 1500)
+
+
+def get_chat_cache_size() -> int:
+    # Max cached chat replies per process; 0 disables the semantic cache.
+    return _get_int("PROPMATE_CHAT_CACHE_SIZE", 256)
+
+
+def get_chat_cache_ttl() -> float:
+    return _get_float("PROPMATE_CHAT_CACHE_TTL", 3600.0)
+
+
+def get_chat_cache_threshold() -> float:
+    # Min cosine similarity for a cached reply to answer a new query.
+    return _get_float("PROPMATE_CHAT_CACHE_THRESHOLD", 0.9)
+
+
+def get_valuation_model_dir() -> str:
+    # Root holding versioned model directories and a LATEST pointer file.
+    default = str(Path(__file__).resolve().parents[2] / "models" / "valuation")
+    return _get("PROPMATE_VALUATION_MODEL_DIR", default=default, required=False)
+
+
+def get_bulk_concurrency() -> int:
+    # Max Tavily enrichment calls in flight per bulk upload.
+    return max(_get_int("PROPMATE_BULK_CONCURRENCY", 8), 1)
+
+
+def get_bulk_max_rows() -> int:
+    return _get_int("PROPMATE_BULK_MAX_ROWS", 5000)
+
+
+def get_history_page_size() -> int:
+    # Analyses per Analysis History page held in session state.
+    return max(_get_int("PROPMATE_HISTORY_PAGE_SIZE", 10), 1)
+
+
+def get_analysis_db_url() -> str:
+    # sqlite:///path or mongodb://...; defaults to a SQLite file next to the app.
+    default = "sqlite:///" + str(Path(__file__).resolve().parents[2] / "analyses.db")
+    return _get("PROPMATE_ANALYSIS_DB_URL", default=default, required=False)
+
+
+def get_analysis_write_batch_size() -> int:
+    # Buffered analyses written per batch.
+    return _get_int("PROPMATE_ANALYSIS_BATCH_SIZE", 50)
+
+
+def get_analysis_flush_interval() -> float:
+    # Max seconds an analysis waits in the write buffer.
+    return _get_float("PROPMATE_ANALYSIS_FLUSH_INTERVAL", 2.0)
+
+
+def get_comparables_k() -> int:
+    # Comparables attached to each analysis.
+    return max(_get_int("PROPMATE_COMPARABLES_K", 5), 1)
+
+
+def get_comparables_rebuild_interval() -> float:
+    # Seconds between folding new points into the KD-trees.
+    return _get_float("PROPMATE_COMPARABLES_REBUILD_INTERVAL", 300.0)
+
+
+def get_comparables_max_pending() -> int:
+    # Unindexed points per partition that force an early rebuild.
+    return _get_int("PROPMATE_COMPARABLES_MAX_PENDING", 4096)
+
+
+def get_comparables_max_rows() -> int:
+    # Stored analyses loaded into the index at startup.
+    return _get_int("PROPMATE_COMPARABLES_MAX_ROWS", 1_000_000)
+
+
+def get_listings_db_path() -> str:
+    # SQLite file for listings extracted from search results.
+    default = str(Path(__file__).resolve().parents[2] / "listings.db")
+    return _get("PROPMATE_LISTINGS_DB", default=default, required=False)
+
+
+def get_rate_limit(upstream: str) -> tuple[float, float]:
+    # Client-side (requests per second, burst) per upstream; rate 0 disables.
+    prefix = f"PROPMATE_{upstream.upper()}"
+    return _get_float(f"{prefix}_RATE_LIMIT", 5.0), _get_float(f"{prefix}_BURST", 10.0)
+
+
+def get_rate_limit_db_path() -> str:
+    # SQLite file holding the shared token buckets; empty keeps them per process.
+    default = str(Path(tempfile.gettempdir()) / "propmate-ratelimit.db")
+    return _get("PROPMATE_RATE_LIMIT_DB", default=default, required=False)
+
+
+def get_retry_max_attempts() -> int:
+    return max(_get_int("PROPMATE_RETRY_MAX_ATTEMPTS", 3), 1)
+
+
+def get_retry_base_delay() -> float:
+    return _get_float("PROPMATE_RETRY_BASE_DELAY", 0.5)
+
+
+def get_retry_max_delay() -> float:
+    return _get_float("PROPMATE_RETRY_MAX_DELAY", 8.0)
+
+
+def get_upstream_deadline() -> float:
+    # Max seconds one upstream call may take, retries and queueing included.
+    return _get_float("PROPMATE_UPSTREAM_DEADLINE", 30.0)
+
+
+def get_breaker_window() -> float:
+    # Seconds of upstream call outcomes a circuit breaker looks at.
+    return _get_float("PROPMATE_BREAKER_WINDOW", 30.0)
+
+
+def get_breaker_min_calls() -> int:
+    return _get_int("PROPMATE_BREAKER_MIN_CALLS", 5)
+
+
+def get_breaker_error_rate() -> float:
+    # Fraction of failed calls in the window that opens the circuit.
+    return _get_float("PROPMATE_BREAKER_ERROR_RATE", 0.5)
+
+
+def get_breaker_slow_call_seconds() -> float:
+    return _get_float("PROPMATE_BREAKER_SLOW_CALL_SECONDS", 5.0)
+
+
+def get_breaker_slow_rate() -> float:
+    # Fraction of slow calls in the window that opens the circuit.
+    return _get_float("PROPMATE_BREAKER_SLOW_RATE", 0.8)
+
+
+def get_breaker_open_seconds() -> float:
+    # Cool-down before an open circuit lets probe calls through.
+    return _get_float("PROPMATE_BREAKER_OPEN_SECONDS", 30.0)
+
+
+def get_breaker_half_open_calls() -> int:
+    return _get_int("PROPMATE_BREAKER_HALF_OPEN_CALLS", 1)
+
+
+def get_trace_file() -> str:
+    # JSONL file receiving finished traces; empty disables export.
+    return _get("PROPMATE_TRACE_FILE", default="", required=False)
+
+
+def get_trace_min_ms() -> float:
+    # Only traces whose root span took at least this long are exported.
+    return _get_float("PROPMATE_TRACE_MIN_MS", 0.0)
+
+
+UPSTREAM_MODES = ("live", "record", "replay")
+
+
+def get_upstream_mode() -> str:
+    # live calls the upstreams; record also stores each exchange; replay only
+    # serves stored exchanges and never touches the network.
+    mode = _get("PROPMATE_UPSTREAM_MODE", default="live").strip().lower()
+    if mode not in UPSTREAM_MODES:
+        from .errors import ConfigError
+
+        raise ConfigError(
+            f"PROPMATE_UPSTREAM_MODE must be one of {', '.join(UPSTREAM_MODES)}; got {mode!r}"
+        )
+    return mode
+
+
+def get_cassette_db_path() -> str:
+    # SQLite file holding recorded upstream exchanges.
+    default = str(Path(__file__).resolve().parents[2] / "cassettes.db")
+    return _get("PROPMATE_CASSETTE_DB", default=default, required=False)
+
+
+def get_prewarm_enabled() -> bool:
+    # Open upstream connections and load heavy services before serving traffic.
+    return _get_bool("PROPMATE_PREWARM", default=True)
+
+
+def get_prewarm_connections() -> int:
+    # Keep-alive connections opened per upstream at startup.
+    return max(_get_int("PROPMATE_PREWARM_CONNECTIONS", 2), 0)
+
+
+def get_shutdown_grace() -> float:
+    # Seconds shutdown waits for running event handlers before closing pools.
+    return _get_float("PROPMATE_SHUTDOWN_GRACE", 30.0)
+
+
+def _validate() -> list[str]:
+    """Resolve every setting once; return a message per invalid value."""
+    from .errors import ConfigError
+
+    _invalid.clear()
+    problems: list[str] = []
+    for name, getter in sorted(globals().items()):
+        if not name.startswith("get_") or not inspect.isfunction(getter):
+            continue
+        params = inspect.signature(getter).parameters
+        try:
+            if "upstream" in params:
+                for upstream in ("openai", "tavily"):
+                    getter(upstream)
+            elif "required" in params:
+                # Missing keys are reported per request, as before.
+                getter(required=False)
+            else:
+                getter()
+        except ConfigError as e:
+            problems.append(str(e))
+    problems.extend(f"{n}={v!r} is not a number" for n, v in sorted(_invalid.items()))
+    return problems
+
+
+def freeze_settings() -> Mapping[str, str]:
+    """Validate the environment once and serve every getter from a frozen copy.
+
+    Called at app startup, so requests no longer read `os.environ` and a bad
+    value fails the deploy instead of a request. Until then (e.g. in tests)
+    getters read the environment live.
+
+    Raises:
+        ConfigError: Listing every invalid setting; nothing is frozen then.
+    """
+    global _snapshot
+    previous, _snapshot = _snapshot, MappingProxyType(dict(os.environ))
+    problems = _validate()
+    if problems:
+        from .errors import ConfigError
+
+        _snapshot = previous
+        raise ConfigError("Invalid settings: " + "; ".join(problems))
+    return _snapshot
+
+
+def thaw_settings() -> None:
+    """Drop the frozen copy; getters read the environment live again."""
+    global _snapshot
+    _snapshot = None
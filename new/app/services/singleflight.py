@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def request_key(upstream: str, url: str, payload: Any) -> str:
+    """Canonical hash of a request: key order and whitespace don't matter."""
+    blob = json.dumps(
+        [upstream, url, payload], sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FlightStats:
+    """Calls seen, calls that did the work, and calls that joined another."""
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key.
+
+    Every caller gets the leader's result, or its exception. Nothing is
+    cached: once the call finishes, the next caller starts a new one.
+    """
+
+    def __init__(self) -> None:
+        self.stats = FlightStats()
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        # Async calls are tasks, only shareable within their own event loop.
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.executions += 1
+            else:
+                self.stats.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.stats.calls += 1
+            task = self._tasks.get(key)
+            if task is not None and task.get_loop() is loop and not task.done():
+                self.stats.coalesced += 1
+            else:
+                self.stats.executions += 1
+                task = self._tasks[key] = loop.create_task(fn())
+                task.add_done_callback(lambda t: self._forget(key, t))
+        # Shielded: a cancelled caller must not cancel the call for the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        # Retrieve the outcome so an error nobody awaited isn't logged as lost.
+        if not task.cancelled():
+            task.exception()
+
+
+_flight = SingleFlight()
+
+
+def coalesce(upstream: str, url: str, payload: Any, fn: Callable[[], T]) -> T:
+    """Run `fn`, or join an identical call already in flight."""
+    return _flight.do(request_key(upstream, url, payload), fn)
+
+
+async def coalesce_async(
+    upstream: str, url: str, payload: Any, fn: Callable[[], Awaitable[T]]
+) -> T:
+    """Async version of `coalesce`."""
+    return await _flight.do_async(request_key(upstream, url, payload), fn)
+
+
+def flight_stats() -> dict:
+    return _flight.stats.as_dict()
+
+
+def reset_flight_stats() -> None:
+    _flight.stats = FlightStats()
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
-import httpx
-
+from .cassettes import exchange, exchange_async
 from .errors import APIError, AuthenticationError, RateLimitError
+from .http_client import get_async_client, get_client
+from .lazy import lazy_import
+from .metrics import timed
 from .settings import get_tavily_api_key, get_tavily_base_url
+from .singleflight import coalesce, coalesce_async
+from .upstream import call, call_async, is_transient, parse_retry_after
 
+httpx = lazy_import("httpx")
 
-def search_web(query: str, max_results: int = 6) -> list[dict]:
-    """Search the web using Tavily and return simplified results.
 
-    Each result has 'title', 'content', and 'url'.
-    """
+def _headers() -> dict:
     api_key = get_tavily_api_key(required=True)
-    base_url = get_tavily_base_url().rstrip("/")
-    headers = {
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
+
+
+def _request(query: str, max_results: int) -> tuple[str, dict]:
+    base_url = get_tavily_base_url().rstrip("/")
     payload = {
         "query": query,
         "max_results": max(1, min(max_results, 20)),
@@ -24,23 +29,93 @@ def search_web(query: str, max_results: int = 6) -> list[dict]:
         "include_answer": False,
         "include_raw_content": False,
     }
+    return f"{base_url}/search", payload
+
 
+def _check_response(resp: httpx.Response) -> dict:
+    if resp.status_code == 401 or resp.status_code == 403:
+        raise AuthenticationError("Tavily authentication failed.")
+    if resp.status_code == 429:
+        raise RateLimitError(
+            "Tavily rate limit exceeded.", retry_after=parse_retry_after(resp.headers)
+        )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _post_search(url: str, headers: dict, payload: dict) -> dict:
+    """POST to Tavily /search, joining an identical search already in flight.
+
+    The shared call is rate limited and retried (see `upstream.call`).
+    """
+    return coalesce(
+        "tavily",
+        url,
+        payload,
+        lambda: call(
+            "tavily", lambda timeout: _send_search(url, headers, payload, timeout), 15.0
+        ),
+    )
+
+
+async def _post_search_async(url: str, headers: dict, payload: dict) -> dict:
+    """Async counterpart of `_post_search`."""
+    return await coalesce_async(
+        "tavily",
+        url,
+        payload,
+        lambda: call_async(
+            "tavily",
+            lambda timeout: _send_search_async(url, headers, payload, timeout),
+            15.0,
+        ),
+    )
+
+
+def _send_search(url: str, headers: dict, payload: dict, timeout: float) -> dict:
+    """POST to Tavily /search on the shared client and map errors."""
     try:
-        with httpx.Client(timeout=httpx.Timeout(15.0)) as client:
-            resp = client.post(f"{base_url}/search", headers=headers, json=payload)
-            if resp.status_code == 401 or resp.status_code == 403:
-                raise AuthenticationError("Tavily authentication failed.")
-            if resp.status_code == 429:
-                raise RateLimitError("Tavily rate limit exceeded.")
-            resp.raise_for_status()
-            data = resp.json()
+        resp = get_client("tavily").post(
+            url, headers=headers, json=payload, timeout=httpx.Timeout(timeout)
+        )
+        return _check_response(resp)
     except httpx.TimeoutException as e:
-        raise APIError("Tavily request timed out.") from e
+        raise APIError("Tavily request timed out.", retryable=True) from e
     except httpx.HTTPStatusError as e:
-        raise APIError(f"Tavily HTTP error: {e.response.status_code}") from e
+        raise APIError(
+            f"Tavily HTTP error: {e.response.status_code}",
+            retryable=is_transient(e.response.status_code),
+        ) from e
     except httpx.RequestError as e:
-        raise APIError(f"Tavily request error: {e}") from e
+        raise APIError(f"Tavily request error: {e}", retryable=True) from e
 
+
+async def _send_search_async(
+    url: str, headers: dict, payload: dict, timeout: float
+) -> dict:
+    """Async counterpart of `_send_search`."""
+    try:
+        resp = await get_async_client("tavily").post(
+            url, headers=headers, json=payload, timeout=httpx.Timeout(timeout)
+        )
+        return _check_response(resp)
+    except httpx.TimeoutException as e:
+        raise APIError("Tavily request timed out.", retryable=True) from e
+    except httpx.HTTPStatusError as e:
+        raise APIError(
+            f"Tavily HTTP error: {e.response.status_code}",
+            retryable=is_transient(e.response.status_code),
+        ) from e
+    except httpx.RequestError as e:
+        raise APIError(f"Tavily request error: {e}", retryable=True) from e
+
+
+def _compact(data: dict) -> dict:
+    # What `_simplify` reads; kept for recorded cassettes.
+    return {"results": _simplify(data)}
+
+
+def _simplify(data: dict) -> list[dict]:
     out: list[dict] = []
     for item in (data.get("results") or []):
         out.append(
@@ -50,4 +125,31 @@ def search_web(query: str, max_results: int = 6) -> list[dict]:
                 "url": item.get("url") or "",
             }
         )
-    return out
\ No newline at end of file
+    return out
+
+
+@timed
+def search_web(query: str, max_results: int = 6) -> list[dict]:
+    """Search the web using Tavily and return simplified results.
+
+    Each result has 'title', 'content', and 'url'.
+    """
+    url, payload = _request(query, max_results)
+    data = exchange(
+        "tavily", "/search", payload, lambda: _post_search(url, _headers(), payload), _compact
+    )
+    return _simplify(data)
+
+
+@timed
+async def search_web_async(query: str, max_results: int = 6) -> list[dict]:
+    """Async version of `search_web`; same results and errors."""
+    url, payload = _request(query, max_results)
+    data = await exchange_async(
+        "tavily",
+        "/search",
+        payload,
+        lambda: _post_search_async(url, _headers(), payload),
+        _compact,
+    )
+    return _simplify(data)
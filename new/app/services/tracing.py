@@ -0,0 +1,164 @@
+"""Lightweight tracing: nested spans, W3C trace propagation and a JSONL exporter.
+
+`with span("valuation"):` times a stage. Spans nest through a context
+variable, so async tasks started inside a span inherit it as their parent.
+Outbound httpx requests carry the current span as a `traceparent` header
+(see `http_client`).
+
+Finished spans are buffered per trace and written as one JSON object per
+line when the root span ends, and only when the root took at least
+`PROPMATE_TRACE_MIN_MS`. Slow requests can then be broken down stage by stage.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from .settings import get_trace_file, get_trace_min_ms
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start", "end",
+        "attributes", "status", "error",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return (end - self.start) * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("propmate_span", default=None)
+
+
+class JSONLExporter:
+    """Append finished traces to a JSONL file.
+
+    Args:
+        path: File to append to; created if missing.
+        min_duration_ms: Only traces whose root span took at least this long
+            are written.
+        max_pending: Traces buffered at once; the oldest are dropped first.
+    """
+
+    def __init__(self, path: str, min_duration_ms: float = 0.0, max_pending: int = 1000) -> None:
+        self.path = path
+        self.min_duration_ms = min_duration_ms
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: OrderedDict[str, list[Span]] = OrderedDict()
+        # Traces already written, so spans that outlive their root (e.g.
+        # detached tasks) still land next to it.
+        self._written: OrderedDict[str, None] = OrderedDict()
+
+    def on_end(self, span: Span) -> None:
+        lines: list[Span] = []
+        with self._lock:
+            if span.parent_id is None:
+                spans = self._pending.pop(span.trace_id, [])
+                spans.append(span)
+                if span.duration_ms >= self.min_duration_ms:
+                    lines = spans
+                    self._written[span.trace_id] = None
+                    if len(self._written) > self.max_pending:
+                        self._written.popitem(last=False)
+            elif span.trace_id in self._written:
+                lines = [span]
+            else:
+                self._pending.setdefault(span.trace_id, []).append(span)
+                if len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+            if lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(
+                        "".join(json.dumps(s.as_dict(), default=str) + "\n" for s in lines)
+                    )
+
+
+_exporter: Optional[JSONLExporter] = None
+_exporter_ready = False
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[JSONLExporter]:
+    """The configured exporter, or None when `PROPMATE_TRACE_FILE` is unset."""
+    global _exporter, _exporter_ready
+    if not _exporter_ready:
+        with _exporter_lock:
+            if not _exporter_ready:
+                path = get_trace_file()
+                _exporter = JSONLExporter(path, get_trace_min_ms()) if path else None
+                _exporter_ready = True
+    return _exporter
+
+
+def reset_exporter() -> None:
+    global _exporter, _exporter_ready
+    with _exporter_lock:
+        _exporter = None
+        _exporter_ready = False
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a stage as a child of the current span (or start a new trace)."""
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end = time.time()
+        _current.reset(token)
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.on_end(current)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def traceparent() -> Optional[str]:
+    """W3C `traceparent` header value for the current span, if any."""
+    current = _current.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-01"
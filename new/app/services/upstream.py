@@ -0,0 +1,229 @@
+"""Resilient calls to upstream APIs: client-side rate limiting plus retries.
+
+`call` / `call_async` wrap one HTTP exchange. Each attempt must be admitted
+by the upstream's circuit breaker (failing fast while it is open), then
+takes a token from the upstream's bucket and runs the request with a
+timeout that never outlives the call's overall deadline. Rate limits (429) and transient
+failures are retried with exponential backoff and full jitter; a server
+Retry-After hint replaces the computed backoff.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Mapping, Optional, TypeVar
+
+from .circuit_breaker import CircuitBreaker, get_breaker
+from .errors import APIError, RateLimitError
+from .metrics import observe_upstream
+from .rate_limit import acquire, acquire_async, get_bucket
+from .settings import (
+    get_retry_base_delay,
+    get_retry_max_attempts,
+    get_retry_max_delay,
+    get_upstream_deadline,
+)
+from .tracing import span
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to retry one upstream call.
+
+    Args:
+        max_attempts: Total attempts, including the first.
+        base_delay: Backoff before the second attempt, doubled each time.
+        max_delay: Cap for a single backoff (Retry-After is capped too).
+        deadline: Seconds the whole call, retries included, may take.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 30.0
+
+    def delay(
+        self,
+        attempt: int,
+        error: Exception,
+        rand: Callable[[], float] = random.random,
+    ) -> Optional[float]:
+        """Seconds to wait before attempt `attempt + 1`, or None to give up."""
+        if isinstance(error, RateLimitError):
+            if error.retry_after is not None:
+                return min(max(error.retry_after, 0.0), self.max_delay)
+        elif not (isinstance(error, APIError) and error.retryable):
+            return None
+        # Full jitter keeps retrying clients from stampeding in lockstep.
+        return rand() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+
+def get_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=get_retry_max_attempts(),
+        base_delay=get_retry_base_delay(),
+        max_delay=get_retry_max_delay(),
+        deadline=get_upstream_deadline(),
+    )
+
+
+def is_transient(status: int) -> bool:
+    """Whether an HTTP error status is worth retrying (timeouts and 5xx)."""
+    return status == 408 or status >= 500
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from `retry-after-ms` or `Retry-After` (seconds or HTTP date)."""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _admit(breaker: CircuitBreaker, bucket, timeout: float) -> None:
+    breaker.before_call()
+    if bucket is not None:
+        try:
+            acquire(bucket, timeout)
+        except BaseException:
+            breaker.release()
+            raise
+
+
+async def _admit_async(breaker: CircuitBreaker, bucket, timeout: float) -> None:
+    breaker.before_call()
+    if bucket is not None:
+        try:
+            await acquire_async(bucket, timeout)
+        except BaseException:
+            breaker.release()
+            raise
+
+
+def call(
+    upstream: str,
+    send: Callable[[float], T],
+    timeout: float,
+    policy: Optional[RetryPolicy] = None,
+) -> T:
+    """Run `send(timeout)` under the upstream's rate limit, retrying transient errors.
+
+    Raises:
+        The last attempt's error; CircuitOpenError when the upstream's
+        breaker is open; RateLimitError when the client-side limiter can't
+        grant a token before the deadline.
+    """
+    policy = policy or get_retry_policy()
+    deadline = time.monotonic() + policy.deadline
+    breaker = get_breaker(upstream)
+    bucket = get_bucket(upstream)
+    attempt = 0
+    while True:
+        attempt += 1
+        _admit(breaker, bucket, deadline - time.monotonic())
+        started = time.monotonic()
+        try:
+            with span(f"{upstream}.request", attempt=attempt):
+                result = send(max(min(timeout, deadline - started), 0.001))
+        except BaseException as e:
+            elapsed = time.monotonic() - started
+            _record(breaker, elapsed, e)
+            observe_upstream(upstream, elapsed, e)
+            if not isinstance(e, (RateLimitError, APIError)):
+                raise
+            delay = policy.delay(attempt, e)
+            if (
+                delay is None
+                or attempt >= policy.max_attempts
+                or time.monotonic() + delay >= deadline
+            ):
+                raise
+            time.sleep(delay)
+        else:
+            elapsed = time.monotonic() - started
+            breaker.record(elapsed, None)
+            observe_upstream(upstream, elapsed, None)
+            return result
+
+
+async def call_async(
+    upstream: str,
+    send: Callable[[float], Awaitable[T]],
+    timeout: float,
+    policy: Optional[RetryPolicy] = None,
+) -> T:
+    """Async version of `call`."""
+    policy = policy or get_retry_policy()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline
+    breaker = get_breaker(upstream)
+    bucket = get_bucket(upstream)
+    attempt = 0
+    while True:
+        attempt += 1
+        await _admit_async(breaker, bucket, deadline - loop.time())
+        started = loop.time()
+        try:
+            with span(f"{upstream}.request", attempt=attempt):
+                result = await send(max(min(timeout, deadline - started), 0.001))
+        except BaseException as e:
+            elapsed = loop.time() - started
+            _record(breaker, elapsed, e)
+            observe_upstream(upstream, elapsed, e)
+            if not isinstance(e, (RateLimitError, APIError)):
+                raise
+            delay = policy.delay(attempt, e)
+            if (
+                delay is None
+                or attempt >= policy.max_attempts
+                or loop.time() + delay >= deadline
+            ):
+                raise
+            await asyncio.sleep(delay)
+        else:
+            elapsed = loop.time() - started
+            breaker.record(elapsed, None)
+            observe_upstream(upstream, elapsed, None)
+            return result
+
+
+def _record(breaker: CircuitBreaker, duration: float, error: BaseException) -> None:
+    if isinstance(error, Exception):
+        breaker.record(duration, error)
+    else:
+        # Cancelled: no verdict on the upstream's health.
+        breaker.release()
+
+
+async def admit_async(upstream: str, timeout: Optional[float] = None) -> CircuitBreaker:
+    """Admit a request that isn't retried (e.g. a stream) and take one token.
+
+    The caller must report the outcome to the returned breaker with
+    `record` (or `release` if it ends without one).
+    """
+    breaker = get_breaker(upstream)
+    await _admit_async(
+        breaker,
+        get_bucket(upstream),
+        get_upstream_deadline() if timeout is None else timeout,
+    )
+    return breaker
@@ -0,0 +1,278 @@
+"""Property valuation: trained price-per-sqft model with a heuristic fallback.
+
+Train from a local CSV (columns: area, bedrooms, bathrooms, floor, location,
+price) with:
+
+    python -m app.services.valuation train data.csv [--out models/valuation]
+
+Each run writes a new version directory and points `LATEST` at it. Inference
+is plain NumPy over memory-mapped arrays, so serving never imports sklearn.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from .lazy import lazy_import
+from .metrics import timed
+from .settings import get_valuation_model_dir
+
+np = lazy_import("numpy")
+
+
+NUMERIC_FEATURES = ("area", "bedrooms", "bathrooms", "floor")
+LOCALITY_BUCKETS = 64
+ARTIFACT_FORMAT = 1
+
+
+def heuristic_rate(bedrooms: int, bathrooms: int, floor: int) -> int:
+    """Original fixed-rate pricing: ₹7,500/sqft plus per-room/floor increments."""
+    base_rate = 7500
+    adjustment = 0
+    adjustment += max(bedrooms - 2, 0) * 500
+    adjustment += max(bathrooms - 2, 0) * 400
+    adjustment += max(floor - 1, 0) * 100
+    return max(base_rate + adjustment, 0)
+
+
+def normalize_locality(location: str) -> str:
+    return " ".join((location or "").lower().replace(",", " ").split())
+
+
+def locality_bucket(location: str) -> int:
+    # crc32 is stable across processes, unlike the builtin str hash.
+    return zlib.crc32(normalize_locality(location).encode("utf-8")) % LOCALITY_BUCKETS
+
+
+def _design_matrix(
+    numeric: np.ndarray, buckets: np.ndarray, mean: np.ndarray, scale: np.ndarray
+) -> np.ndarray:
+    n = numeric.shape[0]
+    X = np.zeros((n, numeric.shape[1] + LOCALITY_BUCKETS))
+    X[:, : numeric.shape[1]] = (numeric - mean) / scale
+    X[np.arange(n), numeric.shape[1] + buckets] = 1.0
+    return X
+
+
+def _columns(rows: Iterable[dict]) -> tuple[np.ndarray, np.ndarray]:
+    rows = list(rows)
+    numeric = np.array(
+        [[float(r.get(f) or 0) for f in NUMERIC_FEATURES] for r in rows], dtype=float
+    ).reshape(len(rows), len(NUMERIC_FEATURES))
+    buckets = np.array([locality_bucket(r.get("location", "")) for r in rows], dtype=int)
+    return numeric, buckets
+
+
+@dataclass(frozen=True)
+class ValuationModel:
+    """A loaded model version. Arrays may be read-only memory maps."""
+
+    version: str
+    coef: np.ndarray
+    mean: np.ndarray
+    scale: np.ndarray
+    intercept: float
+    metrics: dict
+
+    def predict_rates(self, numeric: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        X = _design_matrix(numeric, buckets, self.mean, self.scale)
+        return np.maximum(X @ self.coef + self.intercept, 0.0)
+
+    def predict_many(self, rows: Sequence[dict]) -> np.ndarray:
+        """Predicted total values (₹) for a batch of property dicts."""
+        if not rows:
+            return np.zeros(0)
+        numeric, buckets = _columns(rows)
+        return np.maximum(numeric[:, 0], 0.0) * self.predict_rates(numeric, buckets)
+
+
+def read_training_csv(path: str | Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load (numeric features, locality buckets, price per sqft); skips bad rows."""
+    rows: list[dict] = []
+    rates: list[float] = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for rec in csv.DictReader(fh):
+            try:
+                area = float(rec["area"])
+                price = float(rec["price"])
+                # Blank features count as 0, as at prediction time.
+                features = [float(rec.get(f) or 0) for f in NUMERIC_FEATURES]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if area <= 0 or price <= 0 or not all(map(math.isfinite, features + [price])):
+                continue
+            rows.append(rec)
+            rates.append(price / area)
+    numeric, buckets = _columns(rows)
+    return numeric, buckets, np.array(rates, dtype=float)
+
+
+def train(
+    csv_path: str | Path,
+    out_dir: str | Path | None = None,
+    alpha: float = 1.0,
+) -> Path:
+    """Fit a ridge model on price per sqft and write a new artifact version.
+
+    Returns:
+        The directory of the new version.
+
+    Raises:
+        ValueError: If the CSV has too few usable rows.
+    """
+    from sklearn.linear_model import Ridge
+    from sklearn.model_selection import train_test_split
+
+    numeric, buckets, rates = read_training_csv(csv_path)
+    if len(rates) < 10:
+        raise ValueError(f"Need at least 10 valid rows to train, got {len(rates)}.")
+
+    mean = numeric.mean(axis=0)
+    scale = numeric.std(axis=0)
+    scale[scale == 0] = 1.0
+    X = _design_matrix(numeric, buckets, mean, scale)
+
+    X_tr, X_te, y_tr, y_te = train_test_split(X, rates, test_size=0.2, random_state=0)
+    holdout = Ridge(alpha=alpha).fit(X_tr, y_tr)
+    pred = holdout.predict(X_te)
+    metrics = {
+        "rows": int(len(rates)),
+        "mae_rate": float(np.mean(np.abs(pred - y_te))),
+        "r2": float(holdout.score(X_te, y_te)),
+    }
+    model = Ridge(alpha=alpha).fit(X, rates)
+
+    root = Path(out_dir) if out_dir else Path(get_valuation_model_dir())
+    version = time.strftime("v%Y%m%d-%H%M%S")
+    target = root / version
+    suffix = 1
+    while target.exists():
+        target = root / f"{version}-{suffix}"
+        suffix += 1
+    target.mkdir(parents=True)
+    np.save(target / "coef.npy", model.coef_.astype(np.float64))
+    np.save(target / "mean.npy", mean)
+    np.save(target / "scale.npy", scale)
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": target.name,
+        "features": list(NUMERIC_FEATURES),
+        "locality_buckets": LOCALITY_BUCKETS,
+        "intercept": float(model.intercept_),
+        "alpha": alpha,
+        "metrics": metrics,
+        "created_at": time.time(),
+    }
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    # Point LATEST at the new version last, so readers never see a partial one.
+    tmp = root / "LATEST.tmp"
+    tmp.write_text(target.name)
+    tmp.replace(root / "LATEST")
+    return target
+
+
+def load_model(path: str | Path) -> ValuationModel:
+    """Load one artifact version; the weight arrays are memory-mapped."""
+    path = Path(path)
+    manifest = json.loads((path / "manifest.json").read_text())
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported valuation artifact format in {path}.")
+    if manifest.get("locality_buckets") != LOCALITY_BUCKETS:
+        raise ValueError(f"Locality bucket count mismatch in {path}.")
+    return ValuationModel(
+        version=manifest["version"],
+        coef=np.load(path / "coef.npy", mmap_mode="r"),
+        mean=np.load(path / "mean.npy", mmap_mode="r"),
+        scale=np.load(path / "scale.npy", mmap_mode="r"),
+        intercept=float(manifest["intercept"]),
+        metrics=manifest.get("metrics", {}),
+    )
+
+
+_model: Optional[ValuationModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_model() -> Optional[ValuationModel]:
+    """The process-wide model (latest version), loaded once; None if absent."""
+    global _model, _model_loaded
+    if _model_loaded:
+        return _model
+    with _model_lock:
+        if not _model_loaded:
+            root = Path(get_valuation_model_dir())
+            latest = root / "LATEST"
+            try:
+                _model = load_model(root / latest.read_text().strip())
+            except (OSError, ValueError, KeyError):
+                _model = None
+            _model_loaded = True
+    return _model
+
+
+def reset_model() -> None:
+    global _model, _model_loaded
+    with _model_lock:
+        _model = None
+        _model_loaded = False
+
+
+@timed
+def predict_many(rows: Sequence[dict]) -> np.ndarray:
+    """Predicted values (₹) for a batch; heuristic pricing when no model exists."""
+    model = get_model()
+    if model is not None:
+        return model.predict_many(rows)
+    return np.array(
+        [
+            max(int(r.get("area") or 0), 0)
+            * heuristic_rate(
+                int(r.get("bedrooms") or 0),
+                int(r.get("bathrooms") or 0),
+                int(r.get("floor") or 0),
+            )
+            for r in rows
+        ],
+        dtype=float,
+    )
+
+
+def estimate_value(
+    area: int, bedrooms: int, bathrooms: int, floor: int, location: str = ""
+) -> int:
+    """Predicted value (₹) of a single property."""
+    row = {
+        "area": area,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "floor": floor,
+        "location": location,
+    }
+    return int(predict_many([row])[0])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.services.valuation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_p = sub.add_parser("train", help="Train a new model version from a CSV.")
+    train_p.add_argument("csv_path")
+    train_p.add_argument("--out", default=None, help="Model root (default: settings).")
+    train_p.add_argument("--alpha", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    target = train(args.csv_path, args.out, alpha=args.alpha)
+    manifest = json.loads((target / "manifest.json").read_text())
+    print(f"Wrote {target} ({json.dumps(manifest['metrics'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import reflex as rx
 from typing import List
 from app.states.state import Message
-from app.services.openai_client import generate_chat_reply
+from app.services.metrics import timed_event
+from app.services.chat_cache import stream_chat_reply_cached_async
+from app.services.settings import get_chat_stream_fps
+from app.services.tracing import span
 from app.services.errors import (
     APIError,
     AuthenticationError,
     RateLimitError,
     ConfigError,
+    CircuitOpenError,
 )
 import time
 
@@ -15,7 +19,12 @@ class ChatState(rx.State):
     messages: List[Message] = []
     is_processing: bool = False
     last_chat_duration_ms: int = 0
+    last_chat_ttft_ms: int = 0
+    # Assistant reply being streamed; kept out of `messages` so each frame
+    # sends only this string instead of the whole conversation.
+    streaming_reply: str = ""
 
+    @timed_event
     def on_page_load(self):
         if not self.messages:
             self.messages.append(
@@ -25,37 +34,80 @@ class ChatState(rx.State):
                 }
             )
 
-    def send_quick_question(self, question: str):
-        self.messages.append({"role": "user", "content": question})
-        self._respond(question)
+    @rx.event(background=True)
+    @timed_event
+    async def send_quick_question(self, question: str):
+        async with self:
+            self.messages.append({"role": "user", "content": question})
+        await self._respond(question)
 
-    def process_query(self, form_data: dict):
+    @rx.event(background=True)
+    @timed_event
+    async def process_query(self, form_data: dict):
         query = form_data.get("query", "") if isinstance(form_data, dict) else ""
-        if query:
-            self.messages.append({"role": "user", "content": query})
-        self._respond(query)
+        async with self:
+            if query:
+                self.messages.append({"role": "user", "content": query})
+        await self._respond(query)
 
-    def _respond(self, query: str):
-        self.is_processing = True
+    async def _respond(self, query: str):
         t0 = time.perf_counter()
-        try:
-            reply = generate_chat_reply(query, history=self.messages)
-        except ConfigError:
-            reply = (
-                "API key not configured. Set OPENAI_API_KEY in the server environment."
-            )
-        except AuthenticationError:
-            reply = "Authentication failed. Please verify your API key is valid."
-        except RateLimitError:
-            reply = (
-                "Rate limit exceeded. Please wait a moment before trying again."
-            )
-        except APIError as e:
-            reply = f"Service error: {e}"
-        except Exception:
-            reply = "Unexpected error while processing your request."
-
-        self.messages.append({"role": "assistant", "content": reply})
-        t1 = time.perf_counter()
-        self.last_chat_duration_ms = int((t1 - t0) * 1000)
-        self.is_processing = False
\ No newline at end of file
+        with span("ChatState.respond") as root:
+            with span("state.read"):
+                async with self:
+                    self.is_processing = True
+                    self.streaming_reply = ""
+                    history = list(self.messages)
+            root.set(history_messages=len(history))
+
+            frame_interval = 1.0 / get_chat_stream_fps()
+            parts: List[str] = []
+            ttft_ms = 0
+            frames = 0
+            last_flush = t0
+            try:
+                with span("openai.stream") as stream:
+                    async for token in stream_chat_reply_cached_async(query, history=history):
+                        now = time.perf_counter()
+                        if not parts:
+                            ttft_ms = int((now - t0) * 1000)
+                        parts.append(token)
+                        # Batch tokens so the UI updates at a bounded frame rate.
+                        if now - last_flush >= frame_interval:
+                            last_flush = now
+                            frames += 1
+                            async with self:
+                                self.streaming_reply = "".join(parts)
+                                self.last_chat_ttft_ms = ttft_ms
+                    stream.set(ttft_ms=ttft_ms, tokens=len(parts), frames=frames)
+                reply = "".join(parts).strip()
+                if not reply:
+                    raise APIError("Unexpected OpenAI response format.")
+            except ConfigError:
+                reply = (
+                    "API key not configured. Set OPENAI_API_KEY in the server environment."
+                )
+            except AuthenticationError:
+                reply = "Authentication failed. Please verify your API key is valid."
+            except RateLimitError:
+                reply = (
+                    "Rate limit exceeded. Please wait a moment before trying again."
+                )
+            except CircuitOpenError as e:
+                reply = (
+                    "The assistant is temporarily unavailable. "
+                    f"Please try again in about {max(int(e.retry_after), 1)} seconds."
+                )
+            except APIError as e:
+                reply = f"Service error: {e}"
+            except Exception:
+                reply = "Unexpected error while processing your request."
+
+            with span("state.update"):
+                async with self:
+                    self.messages.append({"role": "assistant", "content": reply})
+                    self.streaming_reply = ""
+                    t1 = time.perf_counter()
+                    self.last_chat_duration_ms = int((t1 - t0) * 1000)
+                    self.last_chat_ttft_ms = ttft_ms
+                    self.is_processing = False
@@ -1,8 +1,12 @@
 import reflex as rx
+from reflex.experimental.client_state import ClientStateVar
 from typing import TypedDict, List
+import functools
 import time
-from app.services.tavily_client import search_web
-from app.services.openai_client import extract_loan_offers_from_tavily
+from app.services.loan_offers import get_loan_offer_snapshot
+from app.services.loan_engine import Scenario, amortize, yearly_totals
+from app.services.metrics import timed_event
+from app.services.tracing import span
 from app.services.errors import ConfigError, AuthenticationError, RateLimitError, APIError
 
 
@@ -12,13 +16,128 @@ class LoanOffer(TypedDict):
     processing_fee: str
 
 
+class ScenarioRow(TypedDict):
+    name: str
+    tenure: str
+    total_interest: str
+    interest_saved: str
+
+
+class YearRow(TypedDict):
+    year: int
+    principal: str
+    interest: str
+    prepayment: str
+    balance: str
+
+
+def _inr(value: float) -> str:
+    return f"₹ {value:,.0f}"
+
+
+def _tenure_label(months: int) -> str:
+    years, rem = divmod(int(months), 12)
+    return f"{years} y {rem} m" if rem else f"{years} y"
+
+
+@functools.lru_cache(maxsize=256)
+def _repayment_plan(
+    principal: int,
+    annual_rate: float,
+    years: int,
+    annual_prepayment: int,
+    step_up_pct: float,
+) -> dict:
+    """All loan figures for one set of inputs from a single `amortize` pass.
+
+    Cached because each computed var below reads the same plan.
+    """
+    scenarios = [Scenario(name="Standard EMI")]
+    if annual_prepayment > 0:
+        scenarios.append(
+            Scenario(name="Annual prepayment", annual_prepayment=annual_prepayment)
+        )
+    if step_up_pct > 0:
+        scenarios.append(Scenario(name="Step-up EMI", step_up_pct=step_up_pct))
+    if annual_prepayment > 0 and step_up_pct > 0:
+        scenarios.append(
+            Scenario(
+                name="Prepayment + step-up",
+                annual_prepayment=annual_prepayment,
+                step_up_pct=step_up_pct,
+            )
+        )
+    # Only cache misses reach here, so the span shows real recomputation.
+    with span("loan_engine.amortize", scenarios=len(scenarios), months=years * 12):
+        sched = amortize(principal, annual_rate, years * 12, scenarios)
+    total_interest = sched.total_interest
+    # The last scenario combines every option the user picked.
+    chosen = len(scenarios) - 1
+    yearly = yearly_totals(sched)
+    year_rows: List[YearRow] = [
+        {
+            "year": y + 1,
+            "principal": _inr(yearly["principal"][chosen, y]),
+            "interest": _inr(yearly["interest"][chosen, y]),
+            "prepayment": _inr(yearly["prepayment"][chosen, y]),
+            "balance": _inr(yearly["balance"][chosen, y]),
+        }
+        for y in range(-(-int(sched.tenure_months[chosen]) // 12))
+    ]
+    scenario_rows: List[ScenarioRow] = [
+        {
+            "name": sc.name,
+            "tenure": _tenure_label(sched.tenure_months[i]),
+            "total_interest": _inr(total_interest[i]),
+            "interest_saved": _inr(max(total_interest[0] - total_interest[i], 0.0)),
+        }
+        for i, sc in enumerate(scenarios)
+    ]
+    return {
+        "emi": sched.emi,
+        "total_payment": float(sched.total_paid[0]),
+        "total_interest": float(total_interest[0]),
+        "scenarios": scenario_rows,
+        "yearly": year_rows,
+    }
+
+
+DEFAULT_LOAN_AMOUNT = 1000000
+DEFAULT_TENURE_YEARS = 20
+DEFAULT_INTEREST_RATE = 8.0
+
+# Browser-side copies of the EMI inputs: the sliders update them on every tick
+# and send only the final value to the server. They start from literal
+# defaults (a state Var default would need the state context in every
+# memoized component that reads them) and `sync_emi_inputs` pushes the
+# session's values on page load.
+LOAN_AMOUNT_INPUT = ClientStateVar.create("loanAmount", DEFAULT_LOAN_AMOUNT)
+TENURE_YEARS_INPUT = ClientStateVar.create("tenureYears", DEFAULT_TENURE_YEARS)
+INTEREST_RATE_INPUT = ClientStateVar.create("interestRate", DEFAULT_INTEREST_RATE)
+
+
 class LoanState(rx.State):
-    loan_amount: int = 1000000
-    tenure_years: int = 20
-    interest_rate: float = 8.0
+    loan_amount: int = DEFAULT_LOAN_AMOUNT
+    tenure_years: int = DEFAULT_TENURE_YEARS
+    interest_rate: float = DEFAULT_INTEREST_RATE
+    annual_prepayment: int = 0
+    step_up_pct: float = 0.0
     is_fetching_loans: bool = False
     loan_offers: List[LoanOffer] = []
     last_fetch_duration_ms: int = 0
+    loan_offers_age_seconds: int = 0
+    loan_offers_stale: bool = False
+
+    @rx.var
+    def loan_offers_age_label(self) -> str:
+        age = int(self.loan_offers_age_seconds or 0)
+        if age < 60:
+            label = "Updated just now"
+        elif age < 3600:
+            label = f"Updated {age // 60} min ago"
+        else:
+            label = f"Updated {age // 3600} h ago"
+        return f"{label} (refreshing)" if self.loan_offers_stale else label
 
     @rx.var
     def tenure_months(self) -> int:
@@ -28,42 +147,36 @@ class LoanState(rx.State):
     def monthly_interest_rate(self) -> float:
         return float(self.interest_rate) / 12.0 / 100.0
 
+    def _plan(self) -> dict:
+        return _repayment_plan(
+            int(self.loan_amount or 0),
+            float(self.interest_rate),
+            max(int(self.tenure_years or 1), 1),
+            int(self.annual_prepayment or 0),
+            float(self.step_up_pct or 0.0),
+        )
+
     @rx.var
     def emi(self) -> str:
-        P = float(self.loan_amount or 0)
-        r = float(self.monthly_interest_rate)
-        n = int(self.tenure_months or 1)
-        if r == 0 or n == 0:
-            emi_val = P / max(n, 1)
-        else:
-            emi_val = P * r * (1 + r) ** n / ((1 + r) ** n - 1)
-        return f"₹ {emi_val:,.0f}"
+        return _inr(self._plan()["emi"])
 
     @rx.var
     def total_payment(self) -> str:
-        P = float(self.loan_amount or 0)
-        r = float(self.monthly_interest_rate)
-        n = int(self.tenure_months or 1)
-        if r == 0 or n == 0:
-            total = P
-        else:
-            emi_val = P * r * (1 + r) ** n / ((1 + r) ** n - 1)
-            total = emi_val * n
-        return f"₹ {total:,.0f}"
+        return _inr(self._plan()["total_payment"])
 
     @rx.var
     def total_interest(self) -> str:
-        P = float(self.loan_amount or 0)
-        total = self._parse_currency(self.total_payment)
-        interest = max(total - P, 0)
-        return f"₹ {interest:,.0f}"
+        return _inr(max(self._plan()["total_interest"], 0))
 
-    def _parse_currency(self, currency_str: str) -> float:
-        try:
-            return float(currency_str.replace("₹", "").replace(",", "").strip())
-        except Exception:
-            return 0.0
+    @rx.var
+    def scenario_comparison(self) -> List[ScenarioRow]:
+        return self._plan()["scenarios"]
 
+    @rx.var
+    def yearly_schedule(self) -> List[YearRow]:
+        return self._plan()["yearly"]
+
+    @timed_event
     def set_loan_amount(self, value: float):
         try:
             amt = float(value)
@@ -73,6 +186,7 @@ class LoanState(rx.State):
         amt = max(100000.0, min(amt, 20000000.0))
         self.loan_amount = int(amt)
 
+    @timed_event
     def set_tenure_years(self, value: float):
         try:
             yrs = float(value)
@@ -81,6 +195,24 @@ class LoanState(rx.State):
         yrs = max(1.0, min(yrs, 30.0))
         self.tenure_years = int(yrs)
 
+    @timed_event
+    def set_annual_prepayment(self, value: float):
+        try:
+            amt = float(value)
+        except Exception:
+            amt = 0.0
+        amt = max(0.0, min(amt, 2000000.0))
+        self.annual_prepayment = int(amt)
+
+    @timed_event
+    def set_step_up_pct(self, value: float):
+        try:
+            pct = float(value)
+        except Exception:
+            pct = 0.0
+        self.step_up_pct = max(0.0, min(pct, 15.0))
+
+    @timed_event
     def set_interest_rate(self, value: float):
         try:
             rate = float(value)
@@ -90,48 +222,65 @@ class LoanState(rx.State):
         self.interest_rate = rate
 
     @rx.event(background=True)
+    @timed_event
     async def fetch_loan_offers(self):
         t0 = time.perf_counter()
-        async with self:
-            self.is_fetching_loans = True
-            self.loan_offers = []
+        with span("LoanState.fetch_loan_offers") as root:
+            with span("state.read"):
+                async with self:
+                    self.is_fetching_loans = True
 
-        # Query common Indian banks for home loan rates.
-        query = (
-            "latest home loan interest rates from HDFC, SBI, ICICI, Axis Bank in India"
-        )
+            offers: List[LoanOffer] = []
+            age_seconds = 0
+            stale = False
+            try:
+                # Served from the shared snapshot; only the first call ever waits
+                # on Tavily + OpenAI, expired snapshots refresh in the background.
+                with span("loan_offers.snapshot"):
+                    snapshot = await get_loan_offer_snapshot()
+                age_seconds = int(snapshot.age_seconds())
+                stale = snapshot.is_stale()
+                root.set(offers=len(snapshot.offers), stale=stale)
+                # Normalize into LoanOffer TypedDict shape.
+                for o in snapshot.offers:
+                    offers.append(
+                        {
+                            "bank_name": o.get("bank_name", "").strip(),
+                            "interest_rate": o.get("interest_rate", "").strip(),
+                            "processing_fee": o.get("processing_fee", "").strip(),
+                        }
+                    )
+            except ConfigError:
+                # Missing keys; keep empty offers.
+                pass
+            except AuthenticationError:
+                pass
+            except RateLimitError:
+                pass
+            except APIError:
+                pass
+            except Exception:
+                # Any unexpected error should not crash UI.
+                pass
 
-        offers: List[LoanOffer] = []
-        try:
-            tavily_results = search_web(query, max_results=5)
-            extracted = extract_loan_offers_from_tavily(tavily_results)
-            # Normalize into LoanOffer TypedDict shape.
-            for o in extracted:
-                offers.append(
-                    {
-                        "bank_name": o.get("bank_name", "").strip(),
-                        "interest_rate": o.get("interest_rate", "").strip(),
-                        "processing_fee": o.get("processing_fee", "").strip(),
-                    }
-                )
-        except ConfigError:
-            # Missing keys; keep empty offers.
-            pass
-        except AuthenticationError:
-            pass
-        except RateLimitError:
-            pass
-        except APIError:
-            pass
-        except Exception:
-            # Any unexpected error should not crash UI.
-            pass
-
-        async with self:
-            self.loan_offers = offers
-            t1 = time.perf_counter()
-            self.last_fetch_duration_ms = int((t1 - t0) * 1000)
-            self.is_fetching_loans = False
+            with span("state.update"):
+                async with self:
+                    self.loan_offers = offers
+                    self.loan_offers_age_seconds = age_seconds
+                    self.loan_offers_stale = stale
+                    t1 = time.perf_counter()
+                    self.last_fetch_duration_ms = int((t1 - t0) * 1000)
+                    self.is_fetching_loans = False
 
+    @timed_event
     def on_load_calculate(self):
-        pass
\ No newline at end of file
+        pass
+
+    @timed_event
+    def sync_emi_inputs(self):
+        """Seed the browser-side slider values from this session's state."""
+        return [
+            LOAN_AMOUNT_INPUT.push(self.loan_amount),
+            TENURE_YEARS_INPUT.push(self.tenure_years),
+            INTEREST_RATE_INPUT.push(self.interest_rate),
+        ]
\ No newline at end of file
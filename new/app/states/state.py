@@ -1,10 +1,36 @@
 import reflex as rx
 from typing import TypedDict, List
+import asyncio
+import sqlite3
 import time
-from app.services.tavily_client import search_web
+from app.services.search_cache import search_web_cached_async
+from app.services.valuation import estimate_value
+from app.services.bulk import map_bounded, parse_property_csv, value_rows
+from app.services.repository import AnalysisQuery, get_repository
+from app.services.comparables import comparables_for, get_index, ppsf_percentiles
+from app.services.listings import ingest_results
+from app.services.metrics import timed_event
+from app.services.tracing import span
+from app.services.settings import (
+    get_bulk_concurrency,
+    get_bulk_max_rows,
+    get_history_page_size,
+)
 from app.services.errors import APIError, AuthenticationError, RateLimitError, ConfigError
 
 
+class Comparable(TypedDict):
+    location: str
+    area: int
+    bedrooms: int
+    bathrooms: int
+    floor: int
+    value: int
+    price_per_sqft: int
+    source: str
+    url: str
+
+
 class Property(TypedDict):
     location: str
     area: int
@@ -17,6 +43,14 @@ class Property(TypedDict):
     ai_insights: str
     market_insights: str
     tavily_results: List[dict]
+    comparables: List[Comparable]
+    ppsf_p25: int
+    ppsf_p50: int
+    ppsf_p75: int
+
+
+# Fields added after the first stored analyses; filled in for older entries.
+_ENTRY_DEFAULTS = {"comparables": [], "ppsf_p25": 0, "ppsf_p50": 0, "ppsf_p75": 0}
 
 
 class Message(TypedDict):
@@ -31,97 +65,306 @@ class PropMateState(rx.State):
     floor: int = 0
     location: str = ""
     is_analyzing: bool = False
+    # Only the displayed Analysis History page; the full history is server-side.
     property_database: List[Property] = []
+    history_total: int = 0
+    history_offset: int = 0
     last_analysis_duration_ms: int = 0
     last_web_fetch_duration_ms: int = 0
     analysis_count: int = 0
+    is_bulk_running: bool = False
+    bulk_total: int = 0
+    bulk_done: int = 0
+    bulk_errors: List[str] = []
+    # Parsed upload rows waiting for `run_bulk_analysis`; backend-only.
+    _bulk_rows: List[dict] = []
 
+    @timed_event
     def set_area(self, value: int):
         try:
             self.area = int(value)
         except Exception:
             self.area = 0
 
+    @timed_event
     def set_bedrooms(self, value: int):
         try:
             self.bedrooms = int(value)
         except Exception:
             self.bedrooms = 0
 
+    @timed_event
     def set_bathrooms(self, value: int):
         try:
             self.bathrooms = int(value)
         except Exception:
             self.bathrooms = 0
 
+    @timed_event
     def set_floor(self, value: int):
         try:
             self.floor = int(value)
         except Exception:
             self.floor = 0
 
+    @timed_event
     def set_location(self, value: str):
         self.location = value or ""
 
-    def analyze_property(self):
-        self.is_analyzing = True
-        t0 = time.perf_counter()
-        base_rate = 7500
-        adjustment = 0
-        adjustment += max(self.bedrooms - 2, 0) * 500
-        adjustment += max(self.bathrooms - 2, 0) * 400
-        adjustment += max(self.floor - 1, 0) * 100
-        rate = max(base_rate + adjustment, 0)
-        predicted = int(max(self.area, 0) * rate)
-
-        ai_insights = (
-            "Based on the inputs, this property has a reasonable valuation. "
-            "Consider verifying locality amenities, recent sales, and builder reputation."
-        )
-        market_insights = (
-            "Recent market trends indicate stable prices with moderate demand. "
-            "Negotiation margin could be around 3–7% depending on competition."
+    @rx.var
+    def has_newer_history(self) -> bool:
+        return self.history_offset > 0
+
+    @rx.var
+    def has_older_history(self) -> bool:
+        return self.history_offset + len(self.property_database) < self.history_total
+
+    def _history_session(self) -> str:
+        return self.router.session.client_token
+
+    async def _show_history_page(self, offset: int):
+        # Repository reads block (and flush pending writes); keep them off the loop.
+        total, offset, entries = await asyncio.to_thread(
+            _read_history_page, self._history_session(), offset
         )
+        self.history_total = total
+        self.history_offset = offset
+        self.property_database = [{**_ENTRY_DEFAULTS, **e} for e in entries]
+
+    def _record_analyses(self, entries: List[Property], values: List[int]):
+        """Store new entries (oldest first) and update the visible page in O(page).
+
+        Only buffers the writes (see `AnalysisRepository.add`), so it is cheap
+        to call while holding the state lock.
+        """
+        get_repository().add(self._history_session(), entries, values)
+        get_index().add(entries, values)
+        self.history_total += len(entries)
+        if self.history_offset == 0:
+            size = get_history_page_size()
+            newest = list(entries[-size:])[::-1]
+            self.property_database = (newest + list(self.property_database))[:size]
+        else:
+            # Keep showing the same analyses while the user browses older pages.
+            self.history_offset += len(entries)
+
+    @timed_event
+    async def load_history(self):
+        await self._show_history_page(self.history_offset)
+
+    @timed_event
+    async def newer_history_page(self):
+        await self._show_history_page(self.history_offset - get_history_page_size())
+
+    @timed_event
+    async def older_history_page(self):
+        await self._show_history_page(self.history_offset + get_history_page_size())
+
+    @rx.event(background=True)
+    @timed_event
+    async def analyze_property(self):
+        t0 = time.perf_counter()
+        with span("PropMateState.analyze_property") as root:
+            with span("state.read"):
+                async with self:
+                    self.is_analyzing = True
+                    location = self.location or ""
+                    area = int(self.area or 0)
+                    bedrooms = int(self.bedrooms or 0)
+                    bathrooms = int(self.bathrooms or 0)
+                    floor = int(self.floor or 0)
+            root.set(location=location, area=area, bedrooms=bedrooms)
+
+            recorded = False
+            try:
+                # Trained model when an artifact exists, otherwise the fixed-rate heuristic.
+                with span("valuation"):
+                    predicted = estimate_value(area, bedrooms, bathrooms, floor, location)
+                    new_entry = _build_entry(
+                        location, area, bedrooms, bathrooms, floor, predicted
+                    )
+                # KD-tree queries can wait on the index lock during a rebuild.
+                with span("comparables"):
+                    await asyncio.to_thread(_attach_comparables, [new_entry])
 
-        investment_score = min(max(int(predicted / 100000), 0), 100)
-        area_growth = "Up 4.2% YoY"
-        estimated_value = f"₹ {predicted:,.0f}"
-
-        new_entry: Property = {
-            "location": self.location or "",
-            "area": int(self.area or 0),
-            "bedrooms": int(self.bedrooms or 0),
-            "bathrooms": int(self.bathrooms or 0),
-            "floor": int(self.floor or 0),
-            "investment_score": investment_score,
-            "area_growth": area_growth,
-            "estimated_value": estimated_value,
-            "ai_insights": ai_insights,
-            "market_insights": market_insights,
-            "tavily_results": [],
-        }
-        # Fetch live web results via Tavily.
-        tw0 = time.perf_counter()
+                # Fetch live web results via Tavily without holding the state lock.
+                tw0 = time.perf_counter()
+                with span("web_fetch"):
+                    new_entry["tavily_results"] = await _fetch_web_results(new_entry)
+                tw1 = time.perf_counter()
+
+                # Covers the lock, the page update and Reflex's delta serialization
+                # and send on exit; "record" is the part spent in our code.
+                with span("state.update"):
+                    async with self:
+                        self.last_web_fetch_duration_ms = int((tw1 - tw0) * 1000)
+                        with span("record"):
+                            self._record_analyses([new_entry], [predicted])
+                        t1 = time.perf_counter()
+                        self.last_analysis_duration_ms = int((t1 - t0) * 1000)
+                        self.analysis_count += 1
+                        self.is_analyzing = False
+                        recorded = True
+            finally:
+                # Never leave the spinner on when valuation or storage failed.
+                if not recorded:
+                    async with self:
+                        self.is_analyzing = False
+
+    @timed_event
+    async def handle_bulk_upload(self, files: List[rx.UploadFile]):
+        if self.is_bulk_running or not files:
+            return
+        data = await files[0].read()
+        try:
+            rows, errors = parse_property_csv(data, max_rows=get_bulk_max_rows())
+        except ValueError as e:
+            self.bulk_errors = [str(e)]
+            return
+        self._bulk_rows = rows
+        self.bulk_errors = errors[:20]
+        self.bulk_total = len(rows)
+        self.bulk_done = 0
+        if rows:
+            return PropMateState.run_bulk_analysis
+
+    @rx.event(background=True)
+    @timed_event
+    async def run_bulk_analysis(self):
+        t0 = time.perf_counter()
+        async with self:
+            if self.is_bulk_running:
+                return
+            rows = list(self._bulk_rows)
+            self._bulk_rows = []
+            self.is_bulk_running = True
+
+        finished: List[int] = []
+        try:
+            # Value every row up front in vectorized batches; with the
+            # comparables lookups this is CPU-bound, so keep it off the loop.
+            values, entries = await asyncio.to_thread(_value_bulk_rows, rows)
+
+            # Enrich with bounded concurrency; flush finished rows a few times a
+            # second rather than one state update per row.
+            last_flush = time.perf_counter()
+            async for i, results in map_bounded(
+                entries, _fetch_web_results, concurrency=get_bulk_concurrency()
+            ):
+                entries[i]["tavily_results"] = results if isinstance(results, list) else []
+                finished.append(i)
+                now = time.perf_counter()
+                if now - last_flush >= 0.25:
+                    last_flush = now
+                    async with self:
+                        self._record_analyses(
+                            [entries[j] for j in finished], [values[j] for j in finished]
+                        )
+                        self.bulk_done += len(finished)
+                        self.analysis_count += len(finished)
+                    finished = []
+        finally:
+            # Record what finished and clear the flag, even after a failure.
+            async with self:
+                self.is_bulk_running = False
+                self.last_analysis_duration_ms = int((time.perf_counter() - t0) * 1000)
+                if finished:
+                    self._record_analyses(
+                        [entries[j] for j in finished], [values[j] for j in finished]
+                    )
+                    self.bulk_done += len(finished)
+                    self.analysis_count += len(finished)
+
+
+def _build_entry(
+    location: str, area: int, bedrooms: int, bathrooms: int, floor: int, predicted: int
+) -> Property:
+    ai_insights = (
+        "Based on the inputs, this property has a reasonable valuation. "
+        "Consider verifying locality amenities, recent sales, and builder reputation."
+    )
+    market_insights = (
+        "Recent market trends indicate stable prices with moderate demand. "
+        "Negotiation margin could be around 3–7% depending on competition."
+    )
+
+    investment_score = min(max(int(predicted / 100000), 0), 100)
+    area_growth = "Up 4.2% YoY"
+    estimated_value = f"₹ {predicted:,.0f}"
+
+    return {
+        "location": location,
+        "area": area,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "floor": floor,
+        "investment_score": investment_score,
+        "area_growth": area_growth,
+        "estimated_value": estimated_value,
+        "ai_insights": ai_insights,
+        "market_insights": market_insights,
+        "tavily_results": [],
+        "comparables": [],
+        "ppsf_p25": 0,
+        "ppsf_p50": 0,
+        "ppsf_p75": 0,
+    }
+
+
+def _value_bulk_rows(rows: List[dict]) -> tuple[List[int], List[Property]]:
+    """Values and comparables-enriched entries for parsed CSV rows. Blocking."""
+    values = value_rows(rows)
+    entries = [
+        _build_entry(r["location"], r["area"], r["bedrooms"], r["bathrooms"], r["floor"], v)
+        for r, v in zip(rows, values)
+    ]
+    _attach_comparables(entries)
+    return values, entries
+
+
+def _read_history_page(session: str, offset: int) -> tuple[int, int, List[dict]]:
+    """(total, clamped offset, entries) of a session's history page. Blocking."""
+    repo = get_repository()
+    total = repo.count(AnalysisQuery(session=session))
+    offset = min(max(offset, 0), max(total - 1, 0))
+    return total, offset, repo.history(session, offset, get_history_page_size())
+
+
+def _attach_comparables(entries: List[Property]) -> None:
+    """Top-k stored comparables and their price-per-sqft percentiles, in place."""
+    for entry, comps in zip(entries, comparables_for(entries)):
+        pct = ppsf_percentiles(comps)
+        entry["comparables"] = comps
+        entry["ppsf_p25"] = pct["p25"]
+        entry["ppsf_p50"] = pct["p50"]
+        entry["ppsf_p75"] = pct["p75"]
+
+
+async def _fetch_web_results(entry: Property) -> List[dict]:
+    """Live web results for an entry; empty when Tavily is unavailable.
+
+    Results are also stored as structured listings, which feed comparables.
+    """
+    try:
+        query = (
+            f"{entry['bedrooms']} BHK in {entry['location']} around {entry['estimated_value']}"
+        )
+        results = await search_web_cached_async(query, max_results=6)
+    except ConfigError:
+        # Keep running without web data.
+        pass
+    except AuthenticationError:
+        pass
+    except RateLimitError:
+        pass
+    except APIError:
+        pass
+    else:
         try:
-            query = (
-                f"{new_entry['bedrooms']} BHK in {new_entry['location']} around {new_entry['estimated_value']}"
-            )
-            results = search_web(query, max_results=6)
-            new_entry["tavily_results"] = results
-        except ConfigError:
-            # Keep running without web data.
-            pass
-        except AuthenticationError:
-            pass
-        except RateLimitError:
-            pass
-        except APIError:
-            pass
-        tw1 = time.perf_counter()
-        self.last_web_fetch_duration_ms = int((tw1 - tw0) * 1000)
-
-        self.property_database = [new_entry] + list(self.property_database)
-        t1 = time.perf_counter()
-        self.last_analysis_duration_ms = int((t1 - t0) * 1000)
-        self.analysis_count += 1
-        self.is_analyzing = False
\ No newline at end of file
+            # SQLite writes block; keep them off the event loop.
+            with span("listings.ingest", results=len(results)):
+                return await asyncio.to_thread(ingest_results, results)
+        except sqlite3.Error:
+            # The listings corpus is best-effort; show the raw results.
+            return results
+    return []
@@ -0,0 +1 @@
+"""Performance benchmarks for PropMate. Run modules with `python -m benchmarks.<name>` from `new/`."""
@@ -0,0 +1,66 @@
+"""Comparables index build time and k-NN lookup latency at scale.
+
+Usage: python -m benchmarks.bench_comparables [--rows 1000000] [--k 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import timeit
+
+from app.services.comparables import ComparablesIndex
+
+
+def synthetic(n: int, localities: int, seed: int = 0) -> tuple[list[dict], list[float]]:
+    rng = random.Random(seed)
+    rows = [
+        {
+            "location": f"Locality {rng.randrange(localities)}",
+            "area": rng.randint(400, 3000),
+            "bedrooms": rng.randint(1, 5),
+            "bathrooms": rng.randint(1, 4),
+            "floor": rng.randint(0, 30),
+        }
+        for _ in range(n)
+    ]
+    values = [r["area"] * rng.uniform(5000, 15000) for r in rows]
+    return rows, values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--localities", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--pending", type=int, default=4096)
+    args = parser.parse_args()
+
+    rows, values = synthetic(args.rows, args.localities)
+    index = ComparablesIndex(max_pending=args.pending)
+    t0 = time.perf_counter()
+    index.add(rows, values)
+    t1 = time.perf_counter()
+    index.rebuild()
+    t2 = time.perf_counter()
+    print(f"rows: {args.rows:,} in {args.localities} localities")
+    print(f"  insert          : {(t1 - t0):8.2f} s")
+    print(f"  build trees     : {(t2 - t1):8.2f} s")
+
+    probes, _ = synthetic(1000, args.localities, seed=1)
+    it = iter(probes * 1000)
+    one = min(timeit.repeat(lambda: index.query(next(it), args.k), number=200, repeat=5)) / 200
+    print(f"  query (trees)   : {one * 1e3:8.3f} ms")
+
+    # Worst case between rebuilds: a full pending buffer in every partition.
+    extra, extra_values = synthetic(args.pending, args.localities, seed=2)
+    index.add(extra, extra_values)
+    one = min(timeit.repeat(lambda: index.query(next(it), args.k), number=200, repeat=5)) / 200
+    print(f"  query (+pending): {one * 1e3:8.3f} ms")
+
+    batch = min(timeit.repeat(lambda: index.query_many(probes, args.k), number=1, repeat=3))
+    print(f"  batch of 1000   : {batch * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""End-to-end event handler benchmarks against mocked, slowed-down upstreams.
+
+Runs the real Reflex handlers (`analyze_property`, `fetch_loan_offers`,
+`ChatState._respond` via `process_query`, and the EMI computed vars via
+`set_loan_amount`) through the app's state manager with Tavily and OpenAI
+mocked by respx. Every run reports latency percentiles and throughput, plus
+the number and serialized size of the state deltas sent to the browser.
+
+Usage:
+    python -m benchmarks.bench_handlers [--iterations 50] [--concurrency 4]
+        [--latency-ms 200] [--jitter-ms 50] [--failure-rate 0.05]
+        [--output results.json] [--baseline base.json] [--threshold 0.2]
+        [--save-baseline base.json]
+
+Exits with status 1 when a metric regresses past `--threshold` (relative)
+against `--baseline`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Optional
+
+# Isolated, offline settings; must be in place before the app is imported.
+_TMP = tempfile.mkdtemp(prefix="propmate-bench-")
+os.environ.setdefault("REFLEX_STATE_MANAGER_MODE", "memory")
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+os.environ.setdefault("PROPMATE_ANALYSIS_DB_URL", f"sqlite:///{_TMP}/analyses.db")
+os.environ.setdefault("PROPMATE_LISTINGS_DB", f"{_TMP}/listings.db")
+os.environ.setdefault("PROPMATE_RATE_LIMIT_DB", "")
+os.environ.setdefault("PROPMATE_SEARCH_CACHE_TTL", "0")
+for _upstream in ("OPENAI", "TAVILY"):
+    os.environ.setdefault(f"PROPMATE_{_upstream}_RATE_LIMIT", "0")
+
+import numpy as np  # noqa: E402
+from reflex.app import process  # noqa: E402
+from reflex.event import Event  # noqa: E402
+from reflex.istate.data import RouterData  # noqa: E402
+
+from app.app import app  # noqa: E402
+from app.services.loan_offers import reset_snapshot  # noqa: E402
+from app.states.chat_state import ChatState  # noqa: E402
+from app.states.loan_state import LoanState  # noqa: E402
+from app.states.state import PropMateState  # noqa: E402
+from benchmarks.mock_upstreams import UpstreamProfile, mock_upstreams  # noqa: E402
+
+
+# Metrics compared against the baseline; lower is better for all of them.
+GATED = ("p50_ms", "p95_ms", "bytes_per_op")
+# Latency changes below this many milliseconds are noise, never regressions.
+NOISE_FLOOR_MS = 2.0
+
+
+class _Namespace:
+    """Stand-in for the socket namespace; records deltas pushed by background events."""
+
+    def __init__(self) -> None:
+        self.sizes: dict[str, list[int]] = {}
+
+    async def emit_update(self, update, token: str) -> None:
+        self.sizes.setdefault(token.split("_")[0], []).append(len(update.json()))
+
+    async def emit(self, *args, **kwargs) -> None:
+        pass
+
+
+def _path(state_cls) -> list[str]:
+    return state_cls.get_full_name().split(".")[1:]
+
+
+class Harness:
+    def __init__(self) -> None:
+        self.ns = _Namespace()
+        app._event_namespace = self.ns
+
+    async def open_session(self, token: str, path: str = "/") -> None:
+        """Create a session's state with router data, as a page load would."""
+        ev = Event(token=token, name=f"{PropMateState.get_full_name()}.load_history")
+        async with app.state_manager.modify_state(ev.substate_token) as state:
+            state.router_data = {"token": token, "pathname": path, "query": {}}
+            state.router = RouterData.from_router_data(state.router_data)
+            for sub in state.substates.values():
+                sub.router = state.router
+
+    async def edit(self, token: str, state_cls, **values) -> None:
+        ev = Event(token=token, name=f"{state_cls.get_full_name()}.noop")
+        async with app.state_manager.modify_state(ev.substate_token) as state:
+            sub = state.get_substate(_path(state_cls))
+            for k, v in values.items():
+                setattr(sub, k, v)
+
+    async def background(
+        self, token: str, state_cls, handler: str, payload: Optional[dict] = None
+    ) -> list[int]:
+        """Run a background event to completion; return the delta sizes it emitted."""
+        ev = Event(
+            token=token, name=f"{state_cls.get_full_name()}.{handler}", payload=payload or {}
+        )
+        before = len(self.ns.sizes.get(token, []))
+        async with app.state_manager.modify_state(ev.substate_token) as state:
+            task = app._process_background(state, ev)
+        await task
+        return self.ns.sizes.get(token, [])[before:]
+
+    async def event(
+        self, token: str, state_cls, handler: str, payload: Optional[dict] = None
+    ) -> list[int]:
+        """Run a regular event through `reflex.app.process`; return its delta sizes."""
+        ev = Event(
+            token=token,
+            name=f"{state_cls.get_full_name()}.{handler}",
+            payload=payload or {},
+            router_data={"pathname": "/", "query": {}},
+        )
+        return [len(u.json()) async for u in process(app, ev, "bench", {}, "127.0.0.1")]
+
+
+Scenario = Callable[[Harness, str, int], Awaitable[list[int]]]
+
+
+async def analyze_property(h: Harness, token: str, i: int) -> list[int]:
+    await h.edit(
+        token,
+        PropMateState,
+        location=f"Locality {i % 25}",
+        area=600 + i % 1400,
+        bedrooms=1 + i % 4,
+    )
+    return await h.background(token, PropMateState, "analyze_property")
+
+
+async def fetch_loan_offers(h: Harness, token: str, i: int) -> list[int]:
+    return await h.background(token, LoanState, "fetch_loan_offers")
+
+
+async def fetch_loan_offers_cold(h: Harness, token: str, i: int) -> list[int]:
+    # Drop the shared snapshot so the call waits on Tavily + OpenAI.
+    reset_snapshot()
+    return await h.background(token, LoanState, "fetch_loan_offers")
+
+
+async def chat_respond(h: Harness, token: str, i: int) -> list[int]:
+    query = f"Is Baner a good buy? #{i}"
+    return await h.background(token, ChatState, "process_query", {"form_data": {"query": query}})
+
+
+async def emi_update(h: Harness, token: str, i: int) -> list[int]:
+    # A new amount each time, so the cached repayment plan is recomputed.
+    return await h.event(token, LoanState, "set_loan_amount", {"value": 2_000_000 + 10_000 * i})
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "analyze_property": analyze_property,
+    "fetch_loan_offers": fetch_loan_offers,
+    "fetch_loan_offers_cold": fetch_loan_offers_cold,
+    "chat_respond": chat_respond,
+    "emi_update": emi_update,
+}
+
+
+def summarize(latencies: list[float], deltas: list[list[int]], wall: float) -> dict:
+    ms = np.asarray(latencies) * 1000
+    sizes = [s for op in deltas for s in op]
+    return {
+        "ops": len(latencies),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "deltas_per_op": round(len(sizes) / len(deltas), 2),
+        "bytes_per_op": round(sum(sizes) / len(deltas), 1),
+        "max_delta_bytes": max(sizes, default=0),
+    }
+
+
+async def run_scenario(
+    h: Harness, name: str, iterations: int, concurrency: int, warmup: int
+) -> dict:
+    scenario = SCENARIOS[name]
+    tokens = [f"bench{name.replace('_', '')}{w}" for w in range(concurrency)]
+    for token in tokens:
+        await h.open_session(token)
+    for i in range(warmup):
+        await scenario(h, tokens[0], i)
+
+    latencies: list[float] = []
+    deltas: list[list[int]] = []
+    counter = iter(range(iterations))
+
+    async def worker(token: str) -> None:
+        for i in counter:
+            t0 = time.perf_counter()
+            sizes = await scenario(h, token, warmup + i)
+            latencies.append(time.perf_counter() - t0)
+            deltas.append(sizes)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(t) for t in tokens))
+    return summarize(latencies, deltas, time.perf_counter() - t0)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Human-readable regressions of `results` against `baseline`."""
+    problems = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in GATED:
+            old, new = base.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if metric.endswith("_ms") and new - old < NOISE_FLOOR_MS:
+                continue
+            if new > old * (1 + threshold):
+                change = f" (+{(new / old - 1) * 100:.0f}%)" if old else ""
+                problems.append(f"{name}.{metric}: {old} -> {new}{change}")
+    return problems
+
+
+async def run(args: argparse.Namespace) -> dict:
+    profile = dict(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        token_delay_ms=args.token_delay_ms,
+    )
+    h = Harness()
+    results = {}
+    with mock_upstreams(UpstreamProfile(seed=1, **profile), UpstreamProfile(seed=2, **profile)):
+        for name in args.scenarios:
+            results[name] = await run_scenario(h, name, args.iterations, args.concurrency, args.warmup)
+            r = results[name]
+            print(
+                f"{name:24s} p50 {r['p50_ms']:9.2f} ms  p95 {r['p95_ms']:9.2f} ms  "
+                f"p99 {r['p99_ms']:9.2f} ms  {r['throughput_per_s']:8.1f} ops/s  "
+                f"{r['deltas_per_op']:5.1f} deltas  {r['bytes_per_op']:9.0f} B/op"
+            )
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent sessions per scenario")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="upstream time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="pause between streamed chunks")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", help="also write results here as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "created": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "save_baseline")},
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Delta sizes grow with history, so only like-for-like runs compare.
+        old_args = baseline.get("meta", {}).get("args", {})
+        changed = [k for k, v in report["meta"]["args"].items() if k in old_args and old_args[k] != v]
+        if changed:
+            print(f"Warning: baseline was recorded with different {', '.join(changed)}.")
+        problems = compare(results, baseline["results"], args.threshold)
+        if problems:
+            print(f"\nRegressions past {args.threshold:.0%}:")
+            for p in problems:
+                print(f"  {p}")
+            return 1
+        print(f"\nNo regressions past {args.threshold:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
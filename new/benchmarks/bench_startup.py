@@ -0,0 +1,123 @@
+"""Worker startup time against a budget.
+
+Each run starts a fresh interpreter and times, in order:
+
+- `framework`: importing Reflex and Starlette, which every worker pays and we
+  do not control;
+- `app`: importing `app.app` on top of that (our components, states and
+  service layer; heavy libraries are deferred by `app.services.lazy`);
+- `warmup`: `lifecycle.warm_services()`, the blocking part of the startup
+  warm-up (heavy imports, model load, stores), against throwaway databases.
+
+Medians over `--runs` are compared with the budgets for `app` and `warmup`;
+the framework share is reported but not gated.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--import-budget-ms 250]
+        [--warmup-budget-ms 3000] [--output results.json]
+
+Exits with status 1 when a median is over its budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in the child interpreter; prints one JSON line of timings in ms.
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import reflex.app, reflex.state, starlette.applications
+t1 = time.perf_counter()
+import app.app
+t2 = time.perf_counter()
+from app.services.lifecycle import warm_services
+warm_services()
+t3 = time.perf_counter()
+print(json.dumps({"framework": (t1 - t0) * 1000, "app": (t2 - t1) * 1000, "warmup": (t3 - t2) * 1000}))
+"""
+
+PHASES = ("framework", "app", "warmup")
+
+
+def measure_once(python: str = sys.executable) -> dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix="propmate-startup-") as tmp:
+        env = {
+            **os.environ,
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "PROPMATE_ANALYSIS_DB_URL": f"sqlite:///{tmp}/analyses.db",
+            "PROPMATE_LISTINGS_DB": f"{tmp}/listings.db",
+            "PROPMATE_CASSETTE_DB": f"{tmp}/cassettes.db",
+            "PROPMATE_RATE_LIMIT_DB": "",
+        }
+        proc = subprocess.run(
+            [python, "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup run failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    return {
+        phase: {
+            "median_ms": round(statistics.median(r[phase] for r in runs), 1),
+            "min_ms": round(min(r[phase] for r in runs), 1),
+            "max_ms": round(max(r[phase] for r in runs), 1),
+        }
+        for phase in PHASES
+    }
+
+
+def over_budget(summary: dict, budgets: dict[str, float]) -> list[str]:
+    """Human-readable phases whose median exceeds its budget."""
+    return [
+        f"{phase}: {summary[phase]['median_ms']} ms > {budget} ms"
+        for phase, budget in budgets.items()
+        if summary[phase]["median_ms"] > budget
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=250.0, help="budget for importing app.app")
+    parser.add_argument("--warmup-budget-ms", type=float, default=3000.0, help="budget for warm_services()")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    # The first run also fills the bytecode cache of the framework; discard it.
+    measure_once()
+    runs = [measure_once() for _ in range(args.runs)]
+    summary = summarize(runs)
+    for phase in PHASES:
+        s = summary[phase]
+        print(f"{phase:10s} median {s['median_ms']:8.1f} ms  min {s['min_ms']:8.1f} ms  max {s['max_ms']:8.1f} ms")
+
+    budgets = {"app": args.import_budget_ms, "warmup": args.warmup_budget_ms}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"budgets_ms": budgets, "summary": summary, "runs": runs}, f, indent=2)
+
+    problems = over_budget(summary, budgets)
+    if problems:
+        print("\nOver budget:")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print("\nWithin budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
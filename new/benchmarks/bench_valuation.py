@@ -0,0 +1,74 @@
+"""Single-row and batch inference latency of the valuation engine.
+
+Trains a throwaway model on synthetic data unless --model-dir points at an
+existing model root.
+
+Usage: python -m benchmarks.bench_valuation [--batch 1000] [--model-dir DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from app.services import valuation
+
+
+LOCALITIES = ["Koramangala, Bangalore", "Hinjewadi, Pune", "Andheri, Mumbai", "Gachibowli, Hyderabad"]
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "area": rng.randint(400, 3000),
+            "bedrooms": rng.randint(1, 5),
+            "bathrooms": rng.randint(1, 4),
+            "floor": rng.randint(0, 30),
+            "location": rng.choice(LOCALITIES),
+        }
+        for _ in range(n)
+    ]
+
+
+def _train_synthetic(root: Path) -> None:
+    data = root / "train.csv"
+    with open(data, "w", newline="") as fh:
+        w = csv.DictWriter(fh, fieldnames=[*valuation.NUMERIC_FEATURES, "location", "price"])
+        w.writeheader()
+        for r in synthetic_rows(5000, seed=1):
+            w.writerow({**r, "price": r["area"] * (6000 + 800 * r["bedrooms"])})
+    valuation.train(data, root / "models")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--model-dir", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.model_dir:
+            os.environ["PROPMATE_VALUATION_MODEL_DIR"] = args.model_dir
+        else:
+            _train_synthetic(Path(tmp))
+            os.environ["PROPMATE_VALUATION_MODEL_DIR"] = str(Path(tmp) / "models")
+        valuation.reset_model()
+        model = valuation.get_model()
+        print(f"model: {model.version if model else 'none (heuristic fallback)'}")
+
+        one = synthetic_rows(1)[0]
+        batch = synthetic_rows(args.batch)
+        single = min(timeit.repeat(lambda: valuation.estimate_value(**one), number=100, repeat=args.repeat)) / 100
+        many = min(timeit.repeat(lambda: valuation.predict_many(batch), number=1, repeat=args.repeat))
+        print(f"  single estimate : {single * 1e6:8.1f} us")
+        print(f"  batch of {args.batch:<6} : {many * 1e3:8.3f} ms ({many / args.batch * 1e6:.2f} us/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Import-time cost of the app, per module.
+
+Imports a module (default `app.app`) in a fresh interpreter under
+`python -X importtime` and reports:
+
+- the slowest modules by their own (self) import time;
+- self time summed per top-level package;
+- every third-party package our modules (`--prefix`, default `app`) import
+  directly, with its cumulative cost and the importing module — the
+  candidates for `app.services.lazy.lazy_import`.
+
+Usage:
+    python -m benchmarks.import_profile [app.app] [--top 20] [--prefix app]
+        [--output profile.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    parent: Optional[str] = None
+    children: list[str] = field(default_factory=list)
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+def parse_importtime(text: str) -> list[ImportRecord]:
+    """Records from `-X importtime` stderr, in import order, with parents set.
+
+    Python prints a module after everything it imported, one indentation
+    level deeper, so each record adopts the deeper records before it.
+    """
+    records: list[ImportRecord] = []
+    pending: list[ImportRecord] = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        label = parts[2]
+        name = label.strip()
+        depth = (len(label) - len(label.lstrip()) - 1) // 2
+        record = ImportRecord(name, int(parts[0]), int(parts[1]), depth)
+        while pending and pending[-1].depth > depth:
+            child = pending.pop()
+            if child.depth == depth + 1:
+                child.parent = name
+                record.children.append(child.name)
+        pending.append(record)
+        records.append(record)
+    return records
+
+
+def profile_import(module: str, python: str = sys.executable) -> list[ImportRecord]:
+    """Import `module` in a fresh interpreter (from the project root) and parse the timings."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(errors[-20:]))
+    return parse_importtime(proc.stderr)
+
+
+def by_package(records: list[ImportRecord]) -> dict[str, int]:
+    """Self time (µs) per top-level package, largest first."""
+    totals: dict[str, int] = {}
+    for r in records:
+        totals[r.package] = totals.get(r.package, 0) + r.self_us
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def pulled_in_by(records: list[ImportRecord], prefix: str) -> list[dict]:
+    """Third-party packages imported directly by a `prefix` module, costliest first."""
+    found: dict[str, dict] = {}
+    for r in records:
+        parent = r.parent or ""
+        if r.name != r.package or r.package == prefix or r.package in sys.stdlib_module_names:
+            continue
+        if r.name in found or not (parent == prefix or parent.startswith(prefix + ".")):
+            continue
+        found[r.name] = {"package": r.name, "cumulative_us": r.cumulative_us, "imported_by": parent}
+    return sorted(found.values(), key=lambda f: -f["cumulative_us"])
+
+
+def _ms(us: int) -> str:
+    return f"{us / 1000:9.1f} ms"
+
+
+def print_report(module: str, records: list[ImportRecord], top: int, prefix: str) -> None:
+    root = next((r for r in reversed(records) if r.name == module), None)
+    total = root.cumulative_us if root else sum(r.self_us for r in records)
+    print(f"import {module}: {total / 1000:.1f} ms, {len(records)} modules\n")
+
+    print("Slowest modules (self):")
+    for r in sorted(records, key=lambda r: -r.self_us)[:top]:
+        print(f"  {_ms(r.self_us)}  {r.name}")
+
+    print("\nBy package (self):")
+    for name, us in list(by_package(records).items())[:top]:
+        print(f"  {_ms(us)}  {name}")
+
+    ours = [r for r in records if r.package == prefix]
+    print(f"\n{prefix}.* modules: {sum(r.self_us for r in ours) / 1000:.1f} ms self")
+    for r in sorted(ours, key=lambda r: -r.cumulative_us)[:top]:
+        print(f"  {_ms(r.cumulative_us)}  {r.name}")
+
+    pulled = pulled_in_by(records, prefix)
+    print(f"\nThird-party packages imported by {prefix}:")
+    for p in pulled:
+        print(f"  {_ms(p['cumulative_us'])}  {p['package']}  <- {p['imported_by']}")
+    if not pulled:
+        print("  (none)")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="app.app")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--prefix", default="app", help="top-level package counted as ours")
+    parser.add_argument("--output", help="write all records as JSON")
+    args = parser.parse_args(argv)
+
+    records = profile_import(args.module)
+    print_report(args.module, records, args.top, args.prefix)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "module": args.module,
+                    "records": [asdict(r) for r in records],
+                    "pulled_in": pulled_in_by(records, args.prefix),
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,577 @@
+"""Load generator: simulated browser sessions against a real PropMate backend.
+
+Starts the Tavily and OpenAI stand-ins (`benchmarks.standin_upstreams`) and
+the Reflex backend under granian as child processes on localhost. The
+backend's `TAVILY_BASE_URL` and `OPENAI_BASE_URL` point at the stand-ins.
+Then N websocket sessions connect the way the browser does (Socket.IO on
+`/_event`) and each one runs the analyze, loans and chat flows. Nothing
+leaves the machine.
+
+Reported per flow: latency percentiles and throughput, measured from sending
+the triggering event to the state delta that ends it. Also reported: backend
+RSS (idle, with all sessions connected, peak, and growth per session),
+upstream traffic from the stand-ins, and errors from the backend's `/metrics`.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 20] [--rounds 3]
+        [--flows analyze loans chat] [--warmup 1] [--ramp-up 5] [--think-ms 500]
+        [--latency-ms 300] [--jitter-ms 100] [--token-delay-ms 20]
+        [--failure-rate 0.02] [--failure-status 503] [--workers 1]
+        [--output results.json]
+
+Client-side rate limits are off unless `PROPMATE_*_RATE_LIMIT` is set in the
+environment; every other backend setting can be passed the same way.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+import numpy as np
+import simple_websocket
+
+from benchmarks.mock_upstreams import CHAT_REPLY
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Full state names as they appear in event names and deltas. Fixed by the
+# module and class names of the states; checked against the backend's
+# hydrate reply on connect.
+ROOT_STATE = "reflex___state____state"
+PROPMATE_STATE = f"{ROOT_STATE}.app___states___state____prop_mate_state"
+LOAN_STATE = f"{ROOT_STATE}.app___states___loan_state____loan_state"
+CHAT_STATE = f"{ROOT_STATE}.app___states___chat_state____chat_state"
+# Suffix Reflex adds to var names in deltas.
+FIELD_MARKER = "_rx_state_"
+
+LOCALITIES = ("Baner", "Wakad", "Kothrud", "Hinjewadi", "Viman Nagar", "Aundh", "Hadapsar")
+
+
+class SessionError(Exception):
+    pass
+
+
+class Session:
+    """One simulated browser tab: a Socket.IO connection plus its client token."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        self.token = str(uuid.uuid4())
+        self.url = (
+            base_url.replace("http", "ws", 1)
+            + f"/_event/?EIO=4&transport=websocket&token={self.token}"
+        )
+        self.timeout = timeout
+        self._ws: Optional[simple_websocket.AioClient] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._waiters: list[tuple[Callable[[dict], bool], asyncio.Future]] = []
+
+    async def connect(self) -> None:
+        self._ws = await simple_websocket.AioClient.connect(self.url)
+        opened = str(await asyncio.wait_for(self._ws.receive(), self.timeout))
+        if not opened.startswith("0"):
+            raise SessionError(f"unexpected engine.io handshake: {opened!r}")
+        await self._ws.send("40/_event,")
+        while not str(await asyncio.wait_for(self._ws.receive(), self.timeout)).startswith("40/_event,"):
+            pass
+        self._reader = asyncio.create_task(self._read())
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                message = str(await self._ws.receive())
+                if message == "2":
+                    # Engine.IO ping; an unanswered ping drops the session.
+                    await self._ws.send("3")
+                    continue
+                if not message.startswith("42/_event,"):
+                    continue
+                name, update = json.loads(message[len("42/_event,"):])[:2]
+                if name != "event":
+                    continue
+                update["_received"] = time.perf_counter()
+                for waiter in list(self._waiters):
+                    matches, fut = waiter
+                    if not fut.done() and matches(update):
+                        fut.set_result(update)
+                        self._waiters.remove(waiter)
+        except (simple_websocket.ConnectionClosed, asyncio.CancelledError):
+            pass
+        finally:
+            for _, fut in self._waiters:
+                if not fut.done():
+                    fut.set_exception(SessionError("connection closed"))
+
+    def expect(self, matches: Callable[[dict], bool]) -> asyncio.Future:
+        """A future for the next update satisfying `matches`; register before sending."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((matches, fut))
+        return fut
+
+    async def wait(self, fut: asyncio.Future) -> dict:
+        try:
+            return await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            raise SessionError(f"no update within {self.timeout:.0f}s") from None
+
+    async def send(self, state: str, handler: str, payload: Optional[dict] = None, path: str = "/") -> None:
+        event = {
+            "token": self.token,
+            "name": f"{state}.{handler}",
+            "payload": payload or {},
+            "router_data": {"pathname": path, "query": {}, "asPath": path},
+        }
+        await self._ws.send("42/_event," + json.dumps(["event", event]))
+
+    async def call(self, state: str, handler: str, payload: Optional[dict] = None, path: str = "/") -> dict:
+        """Send a regular event and wait for its final update."""
+        done = self.expect(lambda u: bool(u.get("final")))
+        await self.send(state, handler, payload, path)
+        return await self.wait(done)
+
+
+def _var(update: dict, state: str, var: str, default=None):
+    return update.get("delta", {}).get(state, {}).get(var + FIELD_MARKER, default)
+
+
+def _sets(state: str, var: str, value) -> Callable[[dict], bool]:
+    marker = object()
+    return lambda u: _var(u, state, var, marker) == value
+
+
+async def open_session(session: Session) -> None:
+    """Connect and load the index page: hydrate, then its on_load handlers."""
+    await session.connect()
+    hydrated = await session.call(ROOT_STATE, "hydrate")
+    if PROPMATE_STATE not in hydrated.get("delta", {}):
+        raise SessionError("hydrate reply lacks PropMateState; state names changed?")
+    await session.call(LOAN_STATE, "on_load_calculate")
+    await session.call(PROPMATE_STATE, "load_history")
+
+
+# Flows return (seconds by operation, degraded), where degraded means the
+# flow completed but showed a fallback instead of upstream data.
+async def analyze_flow(session: Session, i: int) -> tuple[dict[str, float], bool]:
+    rng = random.Random(f"{session.token}{i}")
+    await session.call(PROPMATE_STATE, "set_location", {"value": rng.choice(LOCALITIES)})
+    await session.call(PROPMATE_STATE, "set_area", {"value": rng.randrange(500, 2500, 50)})
+    await session.call(PROPMATE_STATE, "set_bedrooms", {"value": rng.randint(1, 4)})
+    done = session.expect(_sets(PROPMATE_STATE, "is_analyzing", False))
+    t0 = time.perf_counter()
+    await session.send(PROPMATE_STATE, "analyze_property")
+    update = await session.wait(done)
+    entries = _var(update, PROPMATE_STATE, "property_database") or [{}]
+    return {"analyze": time.perf_counter() - t0}, not entries[0].get("tavily_results")
+
+
+async def loans_flow(session: Session, i: int) -> tuple[dict[str, float], bool]:
+    await session.call(LOAN_STATE, "on_load_calculate", path="/loans")
+    t0 = time.perf_counter()
+    await session.call(LOAN_STATE, "set_loan_amount", {"value": 2_000_000 + 50_000 * i}, path="/loans")
+    emi = time.perf_counter() - t0
+    done = session.expect(_sets(LOAN_STATE, "is_fetching_loans", False))
+    t0 = time.perf_counter()
+    await session.send(LOAN_STATE, "fetch_loan_offers", path="/loans")
+    update = await session.wait(done)
+    offers = _var(update, LOAN_STATE, "loan_offers")
+    return {"loans.emi": emi, "loans": time.perf_counter() - t0}, not offers
+
+
+async def chat_flow(session: Session, i: int) -> tuple[dict[str, float], bool]:
+    await session.call(CHAT_STATE, "on_page_load", path="/chat")
+    first = session.expect(lambda u: bool(_var(u, CHAT_STATE, "streaming_reply")))
+    done = session.expect(_sets(CHAT_STATE, "is_processing", False))
+    t0 = time.perf_counter()
+    query = f"Is {LOCALITIES[i % len(LOCALITIES)]} a good place to buy a 2 BHK? ({i})"
+    await session.send(CHAT_STATE, "process_query", {"form_data": {"query": query}}, path="/chat")
+    update = await session.wait(done)
+    latencies = {"chat": time.perf_counter() - t0}
+    if first.done() and not first.exception():
+        latencies["chat.first_token"] = first.result()["_received"] - t0
+    else:
+        first.cancel()
+    messages = _var(update, CHAT_STATE, "messages") or [{}]
+    return latencies, messages[-1].get("content") != CHAT_REPLY
+
+
+FLOWS: dict[str, Callable] = {
+    "analyze": analyze_flow,
+    "loans": loans_flow,
+    "chat": chat_flow,
+}
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {}
+        self.degraded: dict[str, int] = {}
+        self.failed: dict[str, list[str]] = {}
+
+    def add(self, flow: str, latencies: dict[str, float], degraded: bool) -> None:
+        for op, seconds in latencies.items():
+            self.latencies.setdefault(op, []).append(seconds)
+        self.degraded[flow] = self.degraded.get(flow, 0) + int(degraded)
+
+    def fail(self, flow: str, error: BaseException) -> None:
+        self.failed.setdefault(flow, []).append(f"{type(error).__name__}: {error}")
+
+    def summary(self, wall: float) -> dict:
+        out = {}
+        for op, values in sorted(self.latencies.items()):
+            ms = np.asarray(values) * 1000
+            flow = op.split(".")[0]
+            out[op] = {
+                "ops": len(values),
+                "p50_ms": round(float(np.percentile(ms, 50)), 1),
+                "p95_ms": round(float(np.percentile(ms, 95)), 1),
+                "p99_ms": round(float(np.percentile(ms, 99)), 1),
+                "max_ms": round(float(ms.max()), 1),
+                "throughput_per_s": round(len(values) / wall, 2) if wall > 0 else 0.0,
+                "degraded": self.degraded.get(op, 0) if op == flow else None,
+                "failed": len(self.failed.get(op, [])) if op == flow else None,
+            }
+        return out
+
+
+def _tree_pids(pid: int) -> list[int]:
+    pids, i = [pid], 0
+    while i < len(pids):
+        try:
+            for task in os.listdir(f"/proc/{pids[i]}/task"):
+                with open(f"/proc/{pids[i]}/task/{task}/children") as f:
+                    pids.extend(int(p) for p in f.read().split())
+        except OSError:
+            pass
+        i += 1
+    return pids
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its descendants (Linux /proc)."""
+    total = 0
+    for p in _tree_pids(pid):
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class MemorySampler:
+    def __init__(self, pid: int, interval: float = 0.25) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> int:
+        rss = rss_bytes(self.pid)
+        self.peak = max(self.peak, rss)
+        return rss
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+def _metric_totals(text: str, name: str) -> dict[str, float]:
+    """Sum a Prometheus metric's samples by label set, e.g. `{error="APIError"}`."""
+    totals: dict[str, float] = {}
+    for line in text.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            labels, _, value = line[len(name):].rpartition(" ")
+            totals[labels or "{}"] = totals.get(labels or "{}", 0.0) + float(value)
+    return totals
+
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_standins(args: argparse.Namespace, log) -> tuple[subprocess.Popen, str, str]:
+    cmd = [
+        sys.executable, "-m", "benchmarks.standin_upstreams",
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--token-delay-ms", str(args.token_delay_ms),
+        "--failure-rate", str(args.failure_rate),
+        "--failure-status", str(args.failure_status),
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=log, text=True)
+    line = proc.stdout.readline()
+    if not line.startswith("READY"):
+        proc.kill()
+        raise RuntimeError(f"stand-in upstreams failed to start: {line!r}")
+    urls = dict(part.split("=", 1) for part in line.split()[1:])
+    return proc, urls["tavily"], urls["openai"]
+
+
+def start_backend(args: argparse.Namespace, tavily_url: str, openai_url: str, tmp: str, log) -> tuple[subprocess.Popen, str]:
+    from reflex.environment import environment
+
+    # Serve the backend without compiling the frontend, as
+    # `reflex run --env prod --backend-only` does after an export.
+    (ROOT / ".web" / "backend").mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ)
+    env.update(
+        {
+            environment.REFLEX_SKIP_COMPILE.name: "true",
+            "TAVILY_BASE_URL": tavily_url,
+            "OPENAI_BASE_URL": openai_url,
+            "OPENAI_API_KEY": "sk-load-test",
+            "TAVILY_API_KEY": "tvly-load-test",
+            "PROPMATE_ANALYSIS_DB_URL": f"sqlite:///{tmp}/analyses.db",
+            "PROPMATE_LISTINGS_DB": f"{tmp}/listings.db",
+            "PROPMATE_RATE_LIMIT_DB": f"{tmp}/ratelimit.db",
+            "PROPMATE_SEARCH_CACHE_DB": "",
+        }
+    )
+    env.setdefault("REFLEX_STATE_MANAGER_MODE", "memory")
+    for upstream in ("OPENAI", "TAVILY"):
+        env.setdefault(f"PROPMATE_{upstream}_RATE_LIMIT", "0")
+    port = args.port or _free_port()
+    cmd = [
+        sys.executable, "-m", "granian",
+        "--interface", "asgi",
+        "--factory",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "app.app:app",
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=log)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(url: str, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"backend exited with status {proc.returncode}")
+            try:
+                if (await client.get(f"{url}/ping", timeout=1.0)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"backend not ready after {timeout:.0f}s")
+
+
+async def drive(args: argparse.Namespace, url: str, sampler: MemorySampler) -> dict:
+    recorder = Recorder()
+    sessions = [Session(url, args.timeout) for _ in range(args.sessions)]
+    connect_times: list[float] = []
+    stagger = args.ramp_up / max(args.sessions, 1)
+
+    async def connect(i: int, session: Session) -> None:
+        await asyncio.sleep(i * stagger)
+        t0 = time.perf_counter()
+        await open_session(session)
+        connect_times.append(time.perf_counter() - t0)
+
+    # One session through every flow first, so lazy imports, model loading
+    # and pool setup count toward the idle baseline, not the first sessions.
+    for _ in range(args.warmup):
+        warm = Session(url, args.timeout)
+        await open_session(warm)
+        for flow in args.flows:
+            await FLOWS[flow](warm, 0)
+        await warm.close()
+
+    rss_idle = sampler.sample()
+    results = await asyncio.gather(*(connect(i, s) for i, s in enumerate(sessions)), return_exceptions=True)
+    connected = [s for s, r in zip(sessions, results) if r is None]
+    connect_errors = [f"{type(r).__name__}: {r}" for r in results if r is not None]
+    rss_connected = sampler.sample()
+
+    async def user(n: int, session: Session) -> None:
+        rng = random.Random(n)
+        for round_ in range(args.rounds):
+            for flow in args.flows:
+                i = round_ * len(sessions) + n
+                try:
+                    latencies, degraded = await FLOWS[flow](session, i)
+                    recorder.add(flow, latencies, degraded)
+                except Exception as e:  # noqa: BLE001 - recorded and reported
+                    recorder.fail(flow, e)
+                if args.think_ms:
+                    await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(user(n, s) for n, s in enumerate(connected)))
+    wall = time.perf_counter() - t0
+    rss_after = sampler.sample()
+    for session in connected:
+        await session.close()
+
+    mb = 1024 * 1024
+    summary = recorder.summary(wall)
+    if connect_times:
+        ms = np.asarray(connect_times) * 1000
+        summary["connect"] = {
+            "ops": len(connect_times),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "p99_ms": round(float(np.percentile(ms, 99)), 1),
+            "max_ms": round(float(ms.max()), 1),
+        }
+    n = max(len(connected), 1)
+    return {
+        "sessions": len(connected),
+        "connect_errors": connect_errors,
+        "wall_s": round(wall, 2),
+        "flows_per_s": round(sum(len(recorder.latencies.get(f, [])) for f in args.flows) / wall, 2) if wall else 0.0,
+        "operations": summary,
+        "failures": {k: v[:5] for k, v in recorder.failed.items()},
+        "memory": {
+            "idle_mb": round(rss_idle / mb, 1),
+            "connected_mb": round(rss_connected / mb, 1),
+            "after_mb": round(rss_after / mb, 1),
+            "peak_mb": round(sampler.peak / mb, 1),
+            "per_session_connected_kb": round((rss_connected - rss_idle) / n / 1024, 1),
+            "per_session_after_kb": round((rss_after - rss_idle) / n / 1024, 1),
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    tmp = tempfile.mkdtemp(prefix="propmate-load-")
+    log_path = Path(tmp) / "processes.log"
+    with open(log_path, "w") as log:
+        standins, tavily_url, openai_url = start_standins(args, log)
+        backend, url = start_backend(args, tavily_url, openai_url, tmp, log)
+        try:
+            await wait_ready(url, backend, args.startup_timeout)
+            sampler = MemorySampler(backend.pid)
+            sampler.start()
+            try:
+                report = await drive(args, url, sampler)
+            finally:
+                sampler.stop()
+            async with httpx.AsyncClient() as client:
+                metrics = (await client.get(f"{url}/metrics")).text
+                report["upstreams"] = {
+                    name: (await client.get(f"{base.removesuffix('/v1')}/_stats")).json()
+                    for name, base in (("tavily", tavily_url), ("openai", openai_url))
+                }
+            report["upstream_attempts"] = _metric_totals(
+                metrics, "propmate_upstream_request_duration_seconds_count"
+            )
+            report["backend_errors"] = _metric_totals(metrics, "propmate_errors_total")
+            return report
+        except RuntimeError:
+            log.flush()
+            print(log_path.read_text()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            for proc in (backend, standins):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{report['sessions']} sessions, {report['wall_s']} s, {report['flows_per_s']} flows/s")
+    if report["connect_errors"]:
+        print(f"  {len(report['connect_errors'])} sessions failed to connect: {report['connect_errors'][0]}")
+    print(f"\n{'operation':18s} {'ops':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'ops/s':>7s} {'degraded':>9s} {'failed':>7s}")
+    for op, r in report["operations"].items():
+        print(
+            f"{op:18s} {r['ops']:5d} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['p99_ms']:9.1f} "
+            f"{r['max_ms']:9.1f} {r.get('throughput_per_s', ''):>7} "
+            f"{'' if r.get('degraded') is None else r['degraded']:>9} "
+            f"{'' if r.get('failed') is None else r['failed']:>7}"
+        )
+    for flow, errors in report["failures"].items():
+        print(f"  {flow} failure: {errors[0]}")
+    m = report["memory"]
+    print(
+        f"\nbackend RSS: idle {m['idle_mb']} MB, connected {m['connected_mb']} MB, "
+        f"after {m['after_mb']} MB, peak {m['peak_mb']} MB"
+    )
+    print(
+        f"per session: {m['per_session_connected_kb']} KB on connect, "
+        f"{m['per_session_after_kb']} KB after the flows"
+    )
+    for name, stats in report["upstreams"].items():
+        print(f"{name}: {stats['requests']} requests, {stats['failures']} injected failures")
+    if report["backend_errors"]:
+        print("backend errors:")
+        for labels, count in sorted(report["backend_errors"].items()):
+            print(f"  {labels} {count:g}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent websocket sessions")
+    parser.add_argument("--rounds", type=int, default=3, help="times each session runs its flows")
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured sessions run first")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which sessions connect")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean pause between flows")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for one update")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="upstream time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="pause between streamed chunks")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--workers", type=int, default=1, help="granian worker processes")
+    parser.add_argument("--port", type=int, default=0, help="backend port; 0 picks a free one")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        report["meta"] = {
+            "created": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
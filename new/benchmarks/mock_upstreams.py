@@ -0,0 +1,150 @@
+"""Canned OpenAI and Tavily responses with injectable latency and failures.
+
+Shared by the benchmarks: `mock_upstreams(profile)` patches httpx through
+respx (the same mocking the tests use). The payload builders are also
+served by the stand-in HTTP servers of the load generator.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+import respx
+
+
+LOAN_OFFERS = [
+    {"bank_name": "HDFC", "interest_rate": "8.50%", "processing_fee": "0.5%"},
+    {"bank_name": "SBI", "interest_rate": "8.40%", "processing_fee": "0.35%"},
+    {"bank_name": "ICICI", "interest_rate": "8.75%", "processing_fee": "0.5%"},
+    {"bank_name": "Axis Bank", "interest_rate": "8.75%", "processing_fee": "1%"},
+]
+CHAT_REPLY = (
+    "Prices in this locality have grown steadily. Compare price per sqft with "
+    "recent listings, check the builder's track record and negotiate on floor rise."
+)
+
+
+@dataclass
+class UpstreamProfile:
+    """How a simulated upstream behaves.
+
+    Args:
+        latency_ms: Mean time to first byte.
+        jitter_ms: Uniform +/- spread around the mean.
+        failure_rate: Fraction of requests answered with `failure_status`.
+        failure_status: HTTP status for injected failures (503, 429, ...).
+        token_delay_ms: Pause between streamed chat chunks.
+        seed: RNG seed, so runs are repeatable.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 503
+    token_delay_ms: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def delay(self) -> float:
+        spread = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + spread, 0.0) / 1000.0
+
+    def fails(self) -> bool:
+        return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+
+def tavily_payload(query: str, max_results: int = 6) -> dict:
+    """A Tavily /search body with listing-like snippets for `query`."""
+    seed = sum(map(ord, query))
+    results = []
+    for i in range(max(1, min(max_results, 20))):
+        area = 600 + (seed * 7 + i * 131) % 1800
+        lakhs = area * (60 + (seed + i) % 60) // 1000
+        results.append(
+            {
+                "title": f"{1 + i % 4} BHK Flat for Sale in Baner, Pune - {area} sqft",
+                "content": f"Ready to move {1 + i % 4} BHK, {area} sq ft, ₹ {lakhs} Lakh. {query}",
+                "url": f"https://listings.example/{seed % 997}/{i}",
+            }
+        )
+    return {"query": query, "results": results}
+
+
+def chat_completion_payload(request: dict) -> dict:
+    """A Chat Completions body: loan offers JSON for JSON mode, else prose."""
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        content = json.dumps({"loan_offers": LOAN_OFFERS})
+    else:
+        content = CHAT_REPLY
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "model": request.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+    }
+
+
+def chat_stream_chunks(text: str = CHAT_REPLY, words_per_chunk: int = 3) -> list[str]:
+    """SSE lines for a streamed reply, ending with `[DONE]`."""
+    words = text.split(" ")
+    lines = []
+    for i in range(0, len(words), words_per_chunk):
+        piece = " ".join(words[i:i + words_per_chunk]) + " "
+        chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+        lines.append(f"data: {json.dumps(chunk)}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return lines
+
+
+class _SSE(httpx.AsyncByteStream):
+    def __init__(self, lines: list[str], delay: float) -> None:
+        self._lines = lines
+        self._delay = delay
+
+    async def __aiter__(self):
+        for line in self._lines:
+            if self._delay:
+                await asyncio.sleep(self._delay)
+            yield line.encode("utf-8")
+
+
+def mock_upstreams(
+    tavily: Optional[UpstreamProfile] = None,
+    openai: Optional[UpstreamProfile] = None,
+    tavily_url: str = "https://api.tavily.com/search",
+    openai_url: str = "https://api.openai.com/v1/chat/completions",
+) -> respx.MockRouter:
+    """A respx router answering Tavily and OpenAI calls per their profiles."""
+    tavily = tavily or UpstreamProfile()
+    openai = openai or UpstreamProfile()
+
+    async def search(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(tavily.delay())
+        if tavily.fails():
+            return httpx.Response(tavily.failure_status)
+        body = json.loads(request.content)
+        return httpx.Response(200, json=tavily_payload(body.get("query", ""), body.get("max_results", 6)))
+
+    async def chat(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(openai.delay())
+        if openai.fails():
+            return httpx.Response(openai.failure_status)
+        body = json.loads(request.content)
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/event-stream"},
+                stream=_SSE(chat_stream_chunks(), openai.token_delay_ms / 1000.0),
+            )
+        return httpx.Response(200, json=chat_completion_payload(body))
+
+    router = respx.mock(assert_all_called=False)
+    router.post(tavily_url).mock(side_effect=search)
+    router.post(openai_url).mock(side_effect=chat)
+    return router
@@ -0,0 +1,223 @@
+"""Local stand-in HTTP servers for Tavily `/search` and OpenAI `/v1/chat/completions`.
+
+Plain asyncio HTTP/1.1 servers (keep-alive, chunked SSE for streamed chat)
+that answer with the canned payloads of `mock_upstreams`, shaped by an
+`UpstreamProfile` (latency, jitter, failure rate and status, token pacing).
+Unlike the respx mocks they sit behind a real socket, so the backend's
+connection pools, timeouts and retries are exercised as in production.
+
+`GET /_stats` on either server returns its request and injected-failure counts.
+
+Usage:
+    python -m benchmarks.standin_upstreams [--tavily-port 0] [--openai-port 0]
+        [--latency-ms 200] [--jitter-ms 50] [--failure-rate 0.05]
+        [--failure-status 503] [--token-delay-ms 20]
+
+Prints one `READY tavily=<url> openai=<url>` line once both are listening;
+set `TAVILY_BASE_URL` and `OPENAI_BASE_URL` to those URLs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Awaitable, Callable, Optional
+
+from benchmarks.mock_upstreams import (
+    UpstreamProfile,
+    chat_completion_payload,
+    chat_stream_chunks,
+    tavily_payload,
+)
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    408: "Request Timeout",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class _Response:
+    """Writes one HTTP/1.1 response to a stream."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+
+    def _head(self, status: int, headers: dict) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self._head(
+            status,
+            {"Content-Type": "application/json", "Content-Length": len(data), **(headers or {})},
+        )
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def stream(self, lines: list[str], delay: float) -> None:
+        self._head(200, {"Content-Type": "text/event-stream", "Transfer-Encoding": "chunked"})
+        await self._writer.drain()
+        for line in lines:
+            if delay:
+                await asyncio.sleep(delay)
+            data = line.encode("utf-8")
+            self._writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await self._writer.drain()
+        self._writer.write(b"0\r\n\r\n")
+        await self._writer.drain()
+
+
+Handler = Callable[[dict, _Response], Awaitable[None]]
+
+
+class StandInServer:
+    """One stand-in upstream on a local port.
+
+    Args:
+        name: Upstream name, reported by `/_stats`.
+        profile: Latency and failure behaviour for every request.
+        routes: POST handlers by path.
+    """
+
+    def __init__(self, name: str, profile: UpstreamProfile, routes: dict[str, Handler]) -> None:
+        self.name = name
+        self.profile = profile
+        self.routes = routes
+        self.requests = 0
+        self.failures = 0
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening; return the base URL."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        bound_host, bound_port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{bound_host}:{bound_port}"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                await self._dispatch(method, target.split("?", 1)[0], body, _Response(writer))
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, response: _Response) -> None:
+        if method == "GET" and path == "/_stats":
+            await response.json(
+                200, {"upstream": self.name, "requests": self.requests, "failures": self.failures}
+            )
+            return
+        handler = self.routes.get(path.rstrip("/"))
+        if method != "POST" or handler is None:
+            await response.json(404, {"error": f"no route for {method} {path}"})
+            return
+        self.requests += 1
+        await asyncio.sleep(self.profile.delay())
+        if self.profile.fails():
+            self.failures += 1
+            status = self.profile.failure_status
+            await response.json(
+                status,
+                {"error": {"message": "injected failure"}},
+                {"Retry-After": "1"} if status == 429 else None,
+            )
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            await response.json(400, {"error": "invalid JSON"})
+            return
+        await handler(request, response)
+
+
+def tavily_server(profile: UpstreamProfile) -> StandInServer:
+    async def search(request: dict, response: _Response) -> None:
+        await response.json(
+            200, tavily_payload(request.get("query", ""), request.get("max_results", 6))
+        )
+
+    return StandInServer("tavily", profile, {"/search": search})
+
+
+def openai_server(profile: UpstreamProfile) -> StandInServer:
+    async def chat(request: dict, response: _Response) -> None:
+        if request.get("stream"):
+            await response.stream(chat_stream_chunks(), profile.token_delay_ms / 1000.0)
+        else:
+            await response.json(200, chat_completion_payload(request))
+
+    return StandInServer("openai", profile, {"/v1/chat/completions": chat})
+
+
+async def _serve_forever(args: argparse.Namespace) -> None:
+    profile = dict(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        token_delay_ms=args.token_delay_ms,
+    )
+    tavily = tavily_server(UpstreamProfile(seed=args.seed, **profile))
+    openai = openai_server(UpstreamProfile(seed=args.seed + 1, **profile))
+    tavily_url = await tavily.start(args.host, args.tavily_port)
+    openai_url = await openai.start(args.host, args.openai_port)
+    print(f"READY tavily={tavily_url} openai={openai_url}/v1", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await tavily.close()
+        await openai.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--tavily-port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--openai-port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="pause between streamed chunks")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
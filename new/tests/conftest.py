@@ -0,0 +1,19 @@
+import pytest
+
+from app.services import cassettes, circuit_breaker, rate_limit
+
+
+@pytest.fixture(autouse=True)
+def isolated_upstreams(tmp_path, monkeypatch):
+    """Fresh, per-test limiter, breaker and cassette state and no real backoff sleeps."""
+    monkeypatch.setenv("PROPMATE_RATE_LIMIT_DB", str(tmp_path / "ratelimit.db"))
+    monkeypatch.setenv("PROPMATE_RETRY_BASE_DELAY", "0")
+    monkeypatch.setenv("PROPMATE_CASSETTE_DB", str(tmp_path / "cassettes.db"))
+    monkeypatch.delenv("PROPMATE_UPSTREAM_MODE", raising=False)
+    rate_limit.reset_buckets()
+    circuit_breaker.reset_breakers()
+    cassettes.reset_cassette_store()
+    yield
+    rate_limit.reset_buckets()
+    circuit_breaker.reset_breakers()
+    cassettes.reset_cassette_store()
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services import valuation
+from app.services.bulk import map_bounded, parse_property_csv, value_rows
+
+
+@pytest.fixture(autouse=True)
+def no_model(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROPMATE_VALUATION_MODEL_DIR", str(tmp_path))
+    valuation.reset_model()
+    yield
+    valuation.reset_model()
+
+
+def test_parse_csv_skips_bad_rows_and_matches_headers_loosely():
+    data = (
+        "﻿Area,Bedrooms,Bathrooms,Floor,Location\n"
+        "1200,3,2,5,\"Koramangala, Bangalore\"\n"
+        "abc,2,2,1,Pune\n"
+        "0,2,2,1,Pune\n"
+        "950.0,2,1,,Pune\n"
+    ).encode("utf-8")
+    rows, errors = parse_property_csv(data)
+    assert rows == [
+        {"area": 1200, "bedrooms": 3, "bathrooms": 2, "floor": 5, "location": "Koramangala, Bangalore"},
+        {"area": 950, "bedrooms": 2, "bathrooms": 1, "floor": 0, "location": "Pune"},
+    ]
+    assert len(errors) == 2
+
+
+def test_parse_csv_requires_columns():
+    with pytest.raises(ValueError):
+        parse_property_csv("area,location\n100,Pune\n")
+
+
+def test_value_rows_batches_match_single_estimates():
+    rows = [{"area": 1000 + i, "bedrooms": 3, "bathrooms": 2, "floor": 2, "location": "x"} for i in range(7)]
+    assert value_rows(rows, batch_size=3) == [
+        valuation.estimate_value(**r) for r in rows
+    ]
+
+
+def test_map_bounded_limits_concurrency_and_isolates_errors():
+    in_flight = 0
+    peak = 0
+
+    async def work(x):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if x == 3:
+            raise RuntimeError("boom")
+        return x * 2
+
+    async def run():
+        return [item async for item in map_bounded(list(range(20)), work, concurrency=4)]
+
+    results = dict(asyncio.run(run()))
+    assert peak <= 4
+    assert isinstance(results.pop(3), RuntimeError)
+    assert results == {i: i * 2 for i in range(20) if i != 3}
@@ -0,0 +1,51 @@
+from app.services.cache import SQLiteCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_hit_and_expiry():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.expirations == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats.evictions == 1
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = SQLiteCache(path, ttl=60)
+    first.set("k", [{"url": "https://example.com"}])
+    first.close()
+    second = SQLiteCache(path, ttl=60)
+    assert second.get("k") == [{"url": "https://example.com"}]
+    assert second.stats.hits == 1
+
+
+def test_sqlite_cache_prunes_expired(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.set("old", 1, ttl=-1)
+    cache.set("new", 2)
+    assert cache.prune() == 1
+    assert cache.get("old") is None
+    assert cache.get("new") == 2
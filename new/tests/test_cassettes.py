@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from app.services import cassettes
+from app.services.errors import CassetteMissError, ConfigError
+from app.services.openai_client import (
+    extract_loan_offers_from_tavily_async,
+    generate_chat_reply,
+    stream_chat_reply_async,
+)
+from app.services.tavily_client import search_web, search_web_async
+
+
+TAVILY_URL = "https://api.tavily.com/search"
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+
+
+@pytest.fixture(autouse=True)
+def keys(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+
+
+def _search_response():
+    return httpx.Response(
+        200,
+        json={
+            "query": "q",
+            "response_time": 1.2,
+            "results": [
+                {"title": "A", "content": "c", "url": "https://a", "score": 0.9, "raw_content": None}
+            ],
+        },
+    )
+
+
+def test_normalize_request_sorts_keys_and_collapses_whitespace():
+    a = cassettes.normalize_request({"b": [" x  y "], "a": 1})
+    assert list(a) == ["a", "b"]
+    assert a["b"] == ["x y"]
+    assert cassettes.cassette_key("tavily", "/search", {"query": "2 BHK  Pune", "n": 1}) == (
+        cassettes.cassette_key("tavily", "/search", {"n": 1, "query": " 2 BHK Pune"})
+    )
+
+
+def test_invalid_mode_is_a_config_error(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "replya")
+    with pytest.raises(ConfigError):
+        search_web("2 BHK in Pune")
+
+
+@respx.mock
+def test_record_then_replay_search_without_network_or_keys(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "record")
+    route = respx.post(TAVILY_URL).mock(return_value=_search_response())
+    recorded = search_web("2 BHK in Pune")
+    assert route.call_count == 1
+
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "replay")
+    monkeypatch.delenv("TAVILY_API_KEY")
+    cassettes.reset_cassette_store()
+    assert search_web("2 BHK  in Pune") == recorded == [
+        {"title": "A", "content": "c", "url": "https://a"}
+    ]
+    assert asyncio.run(search_web_async("2 BHK in Pune")) == recorded
+    assert route.call_count == 1
+
+
+@respx.mock
+def test_record_stores_compact_responses_without_headers(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "record")
+    respx.post(TAVILY_URL).mock(return_value=_search_response())
+    respx.post(OPENAI_URL).mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-1",
+                "usage": {"total_tokens": 42},
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi."}}],
+            },
+        )
+    )
+    search_web("2 BHK in Pune")
+    generate_chat_reply("Hello")
+    store = cassettes.get_cassette_store()
+    assert store.count() == 2
+    raw = (tmp_path / "cassettes.db").read_bytes()
+    assert b"sk-test" not in raw and b"tvly-test" not in raw
+    rows = store._conn.execute("SELECT upstream, response FROM exchanges ORDER BY upstream").fetchall()
+    openai, tavily = (cassettes._unpack(blob) for _, blob in rows)
+    assert openai == {"choices": [{"message": {"role": "assistant", "content": "Hi."}}]}
+    assert tavily == {"results": [{"title": "A", "content": "c", "url": "https://a"}]}
+
+
+@respx.mock
+def test_replay_miss_raises_without_calling_upstream(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "replay")
+    route = respx.post(OPENAI_URL).mock(return_value=httpx.Response(200, json={}))
+    with pytest.raises(CassetteMissError):
+        generate_chat_reply("Never recorded")
+    with pytest.raises(CassetteMissError):
+        asyncio.run(extract_loan_offers_from_tavily_async([]))
+    assert not route.called
+
+
+@respx.mock
+def test_errors_are_not_recorded(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "record")
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "1")
+    respx.post(TAVILY_URL).mock(return_value=httpx.Response(500))
+    with pytest.raises(Exception):
+        search_web("2 BHK in Pune")
+    assert cassettes.get_cassette_store().count() == 0
+
+
+@respx.mock
+def test_stream_record_and_replay(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "record")
+    body = (
+        'data: {"choices":[{"delta":{"content":"Buy "}}]}\n\n'
+        'data: {"choices":[{"delta":{"content":"now."}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    route = respx.post(OPENAI_URL).mock(
+        return_value=httpx.Response(200, headers={"Content-Type": "text/event-stream"}, text=body)
+    )
+
+    async def collect():
+        return [t async for t in stream_chat_reply_async("Baner?")]
+
+    assert asyncio.run(collect()) == ["Buy ", "now."]
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "replay")
+    assert asyncio.run(collect()) == ["Buy ", "now."]
+    assert route.call_count == 1
+    # Streamed and non-streamed requests are recorded separately.
+    with pytest.raises(CassetteMissError):
+        generate_chat_reply("Baner?")
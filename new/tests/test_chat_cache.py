@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from app.services import chat_cache
+from app.services.chat_cache import SemanticCache, context_key, embed
+from app.services.errors import APIError
+
+COMPLETIONS = "https://api.openai.com/v1/chat/completions"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "1")
+    chat_cache.reset_chat_cache()
+    yield
+    chat_cache.reset_chat_cache()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _reply(text):
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+
+def test_rewording_matches_but_a_different_subject_does_not():
+    base = embed("What's the investment potential?")
+    assert float(base @ embed("what is the investment potential")) == pytest.approx(1.0)
+    assert float(base @ embed("What's the rental potential?")) < 0.9
+    assert float(embed("Is Baner a good place to buy?") @ embed("Is Wakad a good place to buy?")) < 0.9
+
+
+def test_context_key_covers_history_and_figures():
+    history = [{"role": "assistant", "content": "Hi! Ask me anything."}]
+    key = context_key("Show me 3BHK options under 90L", history)
+    assert key == context_key("show me 3 bhk options under 90l", history)
+    assert key != context_key("Show me 2BHK options under 90L", history)
+    assert key != context_key("Show me 3BHK options under 90L", [])
+
+
+def test_semantic_cache_hits_near_duplicates_within_context():
+    cache = SemanticCache(maxsize=4, threshold=0.9)
+    cache.set("ctx", embed("Is this property overpriced?"), "Probably not.")
+    assert cache.get("ctx", embed("is the property overpriced")) == "Probably not."
+    assert cache.get("other", embed("Is this property overpriced?")) is None
+    assert cache.get("ctx", embed("Is this property underpriced?")) is None
+    # A near-duplicate replaces the entry instead of adding one.
+    cache.set("ctx", embed("Is this property overpriced"), "No.")
+    assert len(cache) == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 2
+
+
+def test_semantic_cache_ttl_and_lru():
+    clock = FakeClock()
+    cache = SemanticCache(maxsize=2, ttl=10.0, clock=clock)
+    cache.set("ctx", embed("loan documents"), "a")
+    cache.set("ctx", embed("stamp duty"), "b")
+    assert cache.get("ctx", embed("loan documents")) == "a"
+    cache.set("ctx", embed("metro connectivity"), "c")
+    assert cache.get("ctx", embed("stamp duty")) is None
+    assert cache.stats.evictions == 1
+    clock.now = 11.0
+    assert cache.get("ctx", embed("loan documents")) is None
+    assert cache.stats.expirations == 2 and len(cache) == 0
+
+
+@respx.mock
+def test_generate_reply_served_from_cache():
+    route = respx.post(COMPLETIONS).mock(return_value=_reply("Prices are fair."))
+    history = [{"role": "assistant", "content": "Hi!"}]
+    first = chat_cache.generate_chat_reply_cached("Is this property overpriced?", history)
+    second = asyncio.run(
+        chat_cache.generate_chat_reply_cached_async("is this property overpriced", history)
+    )
+    assert first == second == "Prices are fair."
+    assert route.call_count == 1
+    assert chat_cache.chat_cache_stats()["hits"] == 1
+
+
+@respx.mock
+def test_errors_are_not_cached():
+    route = respx.post(COMPLETIONS).mock(side_effect=[httpx.Response(500), _reply("Ok.")])
+    with pytest.raises(APIError):
+        chat_cache.generate_chat_reply_cached("Hi there")
+    assert chat_cache.generate_chat_reply_cached("Hi there") == "Ok."
+    assert route.call_count == 2
+
+
+@respx.mock
+def test_stream_caches_complete_replies_only():
+    body = (
+        'data: {"choices": [{"delta": {"content": "Good "}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "buy."}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    route = respx.post(COMPLETIONS).mock(
+        return_value=httpx.Response(
+            200, content=body.encode(), headers={"Content-Type": "text/event-stream"}
+        )
+    )
+
+    async def first_delta(query):
+        agen = chat_cache.stream_chat_reply_cached_async(query)
+        try:
+            return await agen.__anext__()
+        finally:
+            await agen.aclose()
+
+    async def collect(query):
+        return [d async for d in chat_cache.stream_chat_reply_cached_async(query)]
+
+    assert asyncio.run(first_delta("Is Baner a good buy?")) == "Good "
+    assert asyncio.run(collect("Is Baner a good buy?")) == ["Good ", "buy."]
+    assert asyncio.run(collect("is baner a good buy")) == ["Good buy."]
+    assert route.call_count == 2
+
+
+@respx.mock
+def test_cache_disabled_with_size_zero(monkeypatch):
+    monkeypatch.setenv("PROPMATE_CHAT_CACHE_SIZE", "0")
+    route = respx.post(COMPLETIONS).mock(return_value=_reply("Hello."))
+    chat_cache.generate_chat_reply_cached("Hi")
+    chat_cache.generate_chat_reply_cached("Hi")
+    assert route.call_count == 2
+    assert chat_cache.chat_cache_stats() is None
@@ -0,0 +1,74 @@
+import json
+
+import httpx
+import respx
+
+from app.services import chat_history
+from app.services.openai_client import generate_chat_reply
+
+
+def _turns(n):
+    out = []
+    for i in range(n):
+        out.append({"role": "user", "content": f"Question {i} about flats in Pune. Extra detail here."})
+        out.append({"role": "assistant", "content": f"Answer {i}: prices vary by locality. " * 5})
+    return out
+
+
+def test_estimate_tokens_is_monotonic():
+    assert chat_history.estimate_tokens("") == 0
+    short = chat_history.estimate_tokens("3 BHK in Pune")
+    assert 0 < short < chat_history.estimate_tokens("3 BHK in Pune under 90 lakh")
+
+
+def test_dedupe_drops_repeats_and_trailing_query():
+    history = [
+        {"role": "assistant", "content": "Hi!"},
+        {"role": "user", "content": "Price?"},
+        {"role": "user", "content": "Price?"},
+        {"role": "assistant", "content": ""},
+        {"role": "user", "content": "Next"},
+    ]
+    assert chat_history.dedupe_turns(history, "Next") == [
+        {"role": "assistant", "content": "Hi!"},
+        {"role": "user", "content": "Price?"},
+    ]
+
+
+def test_short_history_is_kept_verbatim():
+    history = _turns(1)
+    assert chat_history.compact_history(history, budget=1000) == history
+
+
+def test_long_history_fits_budget_with_summary():
+    history = _turns(40)
+    out = chat_history.compact_history(history, budget=300)
+    assert sum(chat_history.message_tokens(m) for m in out) <= 300
+    assert out[0]["role"] == "system"
+    assert out[0]["content"].startswith("Summary of the earlier conversation")
+    assert out[-1] == history[-1]
+
+
+def test_running_summary_reuses_cached_prefix(monkeypatch):
+    history = _turns(20)
+    chat_history.compact_history(history, budget=300)
+    calls = []
+    original = chat_history._summary_line
+    monkeypatch.setattr(
+        chat_history, "_summary_line", lambda m: calls.append(m) or original(m)
+    )
+    chat_history.compact_history(history + _turns(1), budget=300)
+    # Only the newly folded turns are summarized again.
+    assert len(calls) <= 4
+
+
+@respx.mock
+def test_generate_chat_reply_sends_query_once(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    route = respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+    )
+    history = [{"role": "user", "content": "Is it overpriced?"}]
+    generate_chat_reply("Is it overpriced?", history=history)
+    sent = json.loads(route.calls.last.request.content)["messages"]
+    assert [m["content"] for m in sent].count("Is it overpriced?") == 1
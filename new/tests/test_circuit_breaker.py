@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.errors import APIError, AuthenticationError, CircuitOpenError
+from app.services.openai_client import stream_chat_reply_async
+from app.services.tavily_client import search_web, search_web_async
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+TRANSIENT = APIError("timed out", retryable=True)
+
+
+def _breaker(clock, **kw):
+    changes = []
+    opts = dict(window=10, min_calls=4, error_rate=0.5, slow_call=1.0, slow_rate=0.75, open_seconds=5)
+    opts.update(kw)
+    return CircuitBreaker("up", clock=clock, on_transition=changes.append, **opts), changes
+
+
+def test_opens_on_error_rate_and_fails_fast():
+    clock = FakeClock()
+    b, changes = _breaker(clock)
+    for err in (None, TRANSIENT, None, TRANSIENT):
+        b.before_call()
+        b.record(0.1, err)
+    assert b.state == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        b.before_call()
+    assert info.value.retry_after == pytest.approx(5.0)
+    assert isinstance(info.value, APIError)
+    assert [(c.from_state, c.to_state) for c in changes] == [(CLOSED, OPEN)]
+
+
+def test_needs_min_calls_and_ignores_non_transient_errors():
+    clock = FakeClock()
+    b, _ = _breaker(clock)
+    for _ in range(3):
+        b.record(0.1, TRANSIENT)
+    assert b.state == CLOSED
+    b2, _ = _breaker(clock)
+    for _ in range(10):
+        b2.record(0.1, AuthenticationError("no"))
+    assert b2.state == CLOSED
+
+
+def test_old_outcomes_leave_the_window():
+    clock = FakeClock()
+    b, _ = _breaker(clock)
+    for _ in range(3):
+        b.record(0.1, TRANSIENT)
+    clock.now += 11
+    b.record(0.1, TRANSIENT)
+    assert b.state == CLOSED
+    assert b.snapshot()["calls"] == 1
+
+
+def test_opens_on_slow_calls():
+    clock = FakeClock()
+    b, changes = _breaker(clock)
+    for d in (2.0, 2.0, 0.1, 3.0):
+        b.record(d, None)
+    assert b.state == OPEN
+    assert "slow" in changes[-1].reason
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    b, changes = _breaker(clock)
+    for _ in range(4):
+        b.record(0.1, TRANSIENT)
+    clock.now += 5
+    b.before_call()
+    assert b.state == HALF_OPEN
+    # Only one probe at a time.
+    with pytest.raises(CircuitOpenError):
+        b.before_call()
+    b.record(0.1, TRANSIENT)
+    assert b.state == OPEN
+    clock.now += 5
+    b.before_call()
+    b.record(0.1, None)
+    assert b.state == CLOSED
+    assert [c.to_state for c in changes] == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+
+
+def test_release_frees_probe_slot():
+    clock = FakeClock()
+    b, _ = _breaker(clock)
+    for _ in range(4):
+        b.record(0.1, TRANSIENT)
+    clock.now += 5
+    b.before_call()
+    b.release()
+    b.before_call()
+    assert b.state == HALF_OPEN
+
+
+@respx.mock
+def test_search_fails_fast_while_open(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "1")
+    monkeypatch.setenv("PROPMATE_BREAKER_MIN_CALLS", "2")
+    route = respx.post("https://api.tavily.com/search").mock(return_value=httpx.Response(503))
+    for q in ("a", "b"):
+        with pytest.raises(APIError):
+            search_web(q)
+    started = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        search_web("c")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(search_web_async("d"))
+    assert time.perf_counter() - started < 0.5
+    assert route.call_count == 2
+    states = circuit_breaker.breaker_states()
+    assert states["tavily"]["state"] == OPEN
+    assert circuit_breaker.breaker_transitions()[-1]["to_state"] == OPEN
+
+
+@respx.mock
+def test_retries_stop_when_circuit_opens(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "5")
+    monkeypatch.setenv("PROPMATE_BREAKER_MIN_CALLS", "2")
+    route = respx.post("https://api.tavily.com/search").mock(return_value=httpx.Response(502))
+    with pytest.raises(CircuitOpenError):
+        search_web("q")
+    assert route.call_count == 2
+
+
+@respx.mock
+def test_stream_fails_fast_while_open(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("PROPMATE_BREAKER_MIN_CALLS", "1")
+    route = respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(500)
+    )
+
+    async def consume():
+        return [d async for d in stream_chat_reply_async("hi")]
+
+    with pytest.raises(APIError):
+        asyncio.run(consume())
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(consume())
+    assert route.call_count == 1
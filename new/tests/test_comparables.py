@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.services import comparables
+from app.services.comparables import ComparablesIndex, ppsf_percentiles
+
+
+def _row(location, area, bedrooms=2, bathrooms=2, floor=1):
+    return {
+        "location": location,
+        "area": area,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "floor": floor,
+    }
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    comparables.reset_index()
+    yield
+    comparables.reset_index()
+
+
+def test_nearest_same_locality_first():
+    index = ComparablesIndex()
+    index.add(
+        [_row("Pune", 1000), _row("Pune", 2000, 4), _row("pune", 1100), _row("Mumbai", 1000)],
+        [8_000_000, 20_000_000, 9_900_000, 20_000_000],
+    )
+    hits = index.query(_row("Pune", 1040), k=2)
+    assert [h["area"] for h in hits] == [1000, 1100]
+    assert hits[0]["price_per_sqft"] == 8000
+    assert hits[0]["source"] == "analysis"
+
+
+def test_tops_up_from_other_localities():
+    index = ComparablesIndex()
+    index.add([_row("Pune", 1000), _row("Mumbai", 1000), _row("Delhi", 5000, 5)], [1e7, 2e7, 3e7])
+    hits = index.query(_row("Pune", 1000), k=2)
+    assert [h["location"] for h in hits] == ["Pune", "Mumbai"]
+    assert len(index.query(_row("Nowhere", 1000), k=5)) == 3
+
+
+def test_pending_and_tree_points_are_merged():
+    index = ComparablesIndex(max_pending=2)
+    index.add([_row("Pune", 1000), _row("Pune", 3000)], [1e7, 3e7])
+    assert index.needs_rebuild()
+    assert index.rebuild() == 4  # locality partition + global partition
+    assert not index.needs_rebuild()
+    index.add([_row("Pune", 1010)], [1.1e7])
+    hits = index.query(_row("Pune", 1003), k=3)
+    assert [h["area"] for h in hits] == [1000, 1010, 3000]
+
+
+def test_skips_rows_without_area_or_value():
+    index = ComparablesIndex()
+    index.add([_row("Pune", 0), _row("Pune", 1000)], [1e7, 0])
+    assert len(index) == 0
+    assert index.query(_row("Pune", 1000)) == []
+
+
+def test_ppsf_percentiles():
+    comps = [{"price_per_sqft": v} for v in (4000, 5000, 6000, 7000, 8000)]
+    assert ppsf_percentiles(comps) == {"p25": 5000, "p50": 6000, "p75": 7000}
+    assert ppsf_percentiles([]) == {"p25": 0, "p50": 0, "p75": 0}
+
+
+def test_load_index_and_comparables_for(monkeypatch):
+    monkeypatch.setenv("PROPMATE_COMPARABLES_K", "1")
+    records = [
+        {"entry": _row("Pune", 1000), "value": 8_000_000},
+        {"entry": _row("Pune", 2000), "value": 14_000_000},
+    ]
+    assert comparables.load_index(records) == 2
+    [hits] = comparables.comparables_for([_row("Pune", 1900)])
+    assert [h["value"] for h in hits] == [14_000_000]
+
+
+def test_maintainer_loads_analyses_and_listings(monkeypatch, tmp_path):
+    from app.services import listings, repository
+
+    monkeypatch.setenv("PROPMATE_ANALYSIS_DB_URL", f"sqlite:///{tmp_path / 'a.db'}")
+    monkeypatch.setenv("PROPMATE_LISTINGS_DB", str(tmp_path / "l.db"))
+    repository.reset_repository()
+    listings.reset_listings_store()
+    try:
+        repository.get_repository().add("s", [_row("Pune", 1000)], [8_000_000])
+        listings.get_listings_store().ingest(
+            [{"title": "2 BHK in Wakad, Pune ₹ 90 L 1000 sqft", "content": "", "url": "https://a.com/1"}]
+        )
+
+        async def run():
+            task = asyncio.ensure_future(comparables.run_index_maintainer(interval=0.01))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if len(comparables.get_index()) == 2:
+                    break
+            task.cancel()
+
+        asyncio.run(run())
+        index = comparables.get_index()
+        assert index.query(_row("Pune", 1000))[0]["value"] == 8_000_000
+        assert index.query(_row("Wakad, Pune", 1000))[0]["source"] == "listing"
+    finally:
+        repository.reset_repository()
+        listings.reset_listings_store()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import respx
+
+from app.services import http_client
+from app.services.tavily_client import search_web
+
+
+def test_get_client_is_shared_per_upstream():
+    a = http_client.get_client("openai")
+    assert http_client.get_client("openai") is a
+    assert http_client.get_client("tavily") is not a
+
+
+def test_close_clients_recreates_on_next_use():
+    a = http_client.get_client("openai")
+    http_client.close_clients()
+    assert a.is_closed
+    b = http_client.get_client("openai")
+    assert b is not a and not b.is_closed
+
+
+def test_async_client_bound_to_running_loop():
+    async def grab():
+        c1 = http_client.get_async_client("openai")
+        c2 = http_client.get_async_client("openai")
+        await http_client.aclose_clients()
+        return c1, c2
+
+    c1, c2 = asyncio.run(grab())
+    assert c1 is c2
+    assert c1.is_closed
+
+
+def test_client_from_running_loop_closed_on_its_loop():
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    async def make():
+        return http_client.get_async_client("openai")
+
+    try:
+        old = asyncio.run_coroutine_threadsafe(make(), other).result(5)
+
+        async def replace():
+            return http_client.get_async_client("openai")
+
+        new = asyncio.run(replace())
+        assert new is not old
+        for _ in range(100):
+            if old.is_closed:
+                break
+            time.sleep(0.01)
+        assert old.is_closed
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
+
+
+def test_client_from_finished_loop_drops_connections():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def fetch():
+        client = http_client.get_async_client("tavily")
+        await client.get(url)
+        return client
+
+    try:
+        old = asyncio.run(fetch())
+        pool = old._transport._pool
+        assert len(pool.connections) == 1
+        asyncio.run(fetch())
+        assert pool.connections == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@respx.mock
+def test_search_web_reuses_shared_client(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    route = respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(200, json={"results": []})
+    )
+    search_web("a")
+    client = http_client.get_client("tavily")
+    search_web("b")
+    assert route.call_count == 2
+    assert http_client.get_client("tavily") is client
+
+
+@respx.mock
+def test_preconnect_reports_errors_per_upstream():
+    ok = respx.head("https://api.openai.com/v1").mock(return_value=httpx.Response(404))
+    respx.head("https://api.tavily.com").mock(side_effect=httpx.ConnectError("refused"))
+
+    async def run():
+        try:
+            return await http_client.preconnect(
+                {"openai": "https://api.openai.com/v1", "tavily": "https://api.tavily.com"}, 2
+            )
+        finally:
+            await http_client.aclose_clients()
+
+    errors = asyncio.run(run())
+    assert errors["openai"] is None
+    assert errors["tavily"].startswith("ConnectError")
+    assert ok.call_count == 2
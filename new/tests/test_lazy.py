@@ -0,0 +1,35 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.services.lazy import LazyModule, lazy_import
+
+
+def test_lazy_import_defers_until_first_attribute(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    colorsys = lazy_import("colorsys")
+    assert isinstance(colorsys, LazyModule)
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    # Later lookups hit the copied attributes, not __getattr__.
+    assert "rgb_to_hsv" in vars(colorsys)
+
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_import("json") is sys.modules["json"]
+
+
+def test_service_layer_imports_without_heavy_libraries():
+    code = (
+        "import sys, app.services.lifecycle, app.services.bulk, app.services.loan_engine; "
+        "print(sorted(m for m in ('numpy', 'httpx', 'sklearn') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip().splitlines()[-1] == "[]"
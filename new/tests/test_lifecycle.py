@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from app.services import lifecycle, repository, settings
+from app.services.errors import ConfigError
+from app.services.metrics import EVENTS_IN_FLIGHT
+
+
+@pytest.fixture(autouse=True)
+def isolated_services(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROPMATE_ANALYSIS_DB_URL", f"sqlite:///{tmp_path}/analyses.db")
+    monkeypatch.setenv("PROPMATE_LISTINGS_DB", str(tmp_path / "listings.db"))
+    monkeypatch.setenv("PROPMATE_SHUTDOWN_GRACE", "1")
+    # Keep the loops (and the loan offer refresher's network calls) out of these tests.
+    monkeypatch.setattr(lifecycle, "MAINTENANCE_TASKS", ())
+    EVENTS_IN_FLIGHT.reset()
+    yield
+    settings.thaw_settings()
+    EVENTS_IN_FLIGHT.reset()
+
+
+def test_drain_waits_for_running_handlers():
+    async def run():
+        EVENTS_IN_FLIGHT.inc(handler="h")
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            EVENTS_IN_FLIGHT.dec(handler="h")
+
+        task = asyncio.create_task(finish())
+        drained = await lifecycle.drain(1.0, interval=0.01)
+        await task
+        return drained
+
+    assert asyncio.run(run()) is True
+
+
+def test_drain_gives_up_after_timeout():
+    EVENTS_IN_FLIGHT.inc(handler="stuck")
+    assert asyncio.run(lifecycle.drain(0.05, interval=0.01)) is False
+
+
+@respx.mock
+def test_lifespan_warms_up_and_closes(monkeypatch):
+    openai = respx.head("https://api.openai.com/v1").mock(return_value=httpx.Response(404))
+    tavily = respx.head("https://api.tavily.com").mock(return_value=httpx.Response(404))
+
+    async def run():
+        async with lifecycle.lifespan():
+            # Frozen: changes after startup are not seen.
+            monkeypatch.setenv("PROPMATE_SHUTDOWN_GRACE", "99")
+            assert settings.get_shutdown_grace() == 1
+            assert repository._repository is not None
+
+    asyncio.run(run())
+    assert openai.call_count == tavily.call_count == 2
+    assert repository._repository is None
+    assert settings.get_shutdown_grace() == 99
+
+
+def test_lifespan_fails_startup_on_invalid_settings(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "offline")
+
+    async def run():
+        async with lifecycle.lifespan():
+            pass
+
+    with pytest.raises(ConfigError):
+        asyncio.run(run())
+
+
+def test_lifespan_skips_warm_up_when_disabled(monkeypatch):
+    monkeypatch.setenv("PROPMATE_PREWARM", "0")
+    monkeypatch.setattr(lifecycle, "warm_up", lambda: pytest.fail("warmed up"))
+
+    async def run():
+        async with lifecycle.lifespan():
+            pass
+
+    asyncio.run(run())
+
+
+def test_lifespan_stops_maintenance_before_closing(monkeypatch):
+    monkeypatch.setenv("PROPMATE_PREWARM", "0")
+    events = []
+
+    async def loop():
+        events.append("started")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            events.append("stopped")
+
+    real_close = lifecycle.close_resources
+
+    async def close_resources():
+        events.append("closed")
+        await real_close()
+
+    monkeypatch.setattr(lifecycle, "MAINTENANCE_TASKS", (loop, loop))
+    monkeypatch.setattr(lifecycle, "close_resources", close_resources)
+
+    async def run():
+        async with lifecycle.lifespan():
+            await asyncio.sleep(0)
+            assert events == ["started", "started"]
+
+    asyncio.run(run())
+    assert events == ["started", "started", "stopped", "stopped", "closed"]
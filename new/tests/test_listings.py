@@ -0,0 +1,164 @@
+import pytest
+
+from app.services import comparables, listings
+from app.services.listings import (
+    ListingsStore,
+    canonical_url,
+    content_hash,
+    extract_listing,
+    format_price,
+    parse_area,
+    parse_price,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROPMATE_LISTINGS_DB", str(tmp_path / "listings.db"))
+    listings.reset_listings_store()
+    comparables.reset_index()
+    yield
+    listings.reset_listings_store()
+    comparables.reset_index()
+
+
+def _result(title, url="https://example.com/p/1", content=""):
+    return {"title": title, "content": content, "url": url}
+
+
+def test_extracts_listing_fields():
+    rec = extract_listing(
+        _result("3 BHK Flat for Sale in Baner, Pune", content="Price ₹ 1.25 Cr. 1,450 sq.ft super built-up.")
+    )
+    assert rec["price"] == 12_500_000
+    assert rec["area"] == 1450
+    assert rec["bedrooms"] == 3
+    assert rec["location"] == "Baner, Pune"
+    assert rec["locality"] == "baner pune"
+
+
+@pytest.mark.parametrize(
+    "text,price",
+    [
+        ("Rs. 85 Lakh onwards", 8_500_000),
+        ("INR 95,00,000 negotiable", 9_500_000),
+        ("priced at 1.2 crore", 12_000_000),
+        ("₹ 8,500/sq ft in this project", 0),
+        ("Rent ₹ 25,000 per month", 0),
+        ("no price here", 0),
+    ],
+)
+def test_parse_price(text, price):
+    assert parse_price(text) == price
+
+
+def test_parse_area_converts_square_metres():
+    assert parse_area("carpet 120 sq m") == 1291
+    assert parse_area("980 sqft") == 980
+    assert parse_area("big house") == 0
+
+
+def test_canonical_url_and_hash():
+    assert (
+        canonical_url("HTTP://www.Example.com/p/1/?utm_source=x&b=2&a=1#photos")
+        == "https://example.com/p/1?a=1&b=2"
+    )
+    assert canonical_url("mailto:x@example.com") == ""
+    assert content_hash("A  Title", "Body") == content_hash("a title", " body ")
+
+
+def test_format_price():
+    assert format_price(12_500_000) == "₹ 1.25 Cr"
+    assert format_price(8_500_000) == "₹ 85 L"
+    assert format_price(0) == ""
+
+
+def test_store_dedupes_by_url_and_content(tmp_path):
+    store = ListingsStore(str(tmp_path / "l.db"))
+    first = [
+        _result("2 BHK in Baner, Pune ₹ 80 L 900 sqft", "https://a.com/1"),
+        _result("3 BHK in Wakad, Pune ₹ 1.1 Cr 1300 sqft", "https://a.com/2"),
+    ]
+    records, new = store.ingest(first)
+    assert len(new) == 2 and store.count() == 2
+
+    again = [
+        _result("changed title, same page", "https://www.a.com/1/?utm_medium=x"),
+        _result("3 BHK in Wakad, Pune ₹ 1.1 Cr 1300 sqft", "https://mirror.com/copy"),
+        _result("no url", ""),
+    ]
+    records, new = store.ingest(again)
+    assert new == []
+    assert records[0]["price"] == 8_000_000  # stored record, not re-extracted
+    assert records[1]["canonical_url"] == "https://a.com/2"
+    assert records[2] is None
+    assert store.count() == 2
+
+    seen = dict(store._conn.execute("SELECT canonical_url, seen_count FROM listings"))
+    assert seen == {"https://a.com/1": 2, "https://a.com/2": 2}
+
+
+def test_store_dedupes_within_one_batch(tmp_path):
+    store = ListingsStore(str(tmp_path / "l.db"))
+    _, new = store.ingest([_result("same", "https://a.com/1"), _result("same", "https://b.com/1")])
+    assert len(new) == 1 and store.count() == 1
+
+
+def test_find_filters(tmp_path):
+    store = ListingsStore(str(tmp_path / "l.db"))
+    store.ingest(
+        [
+            _result("2 BHK in Baner, Pune ₹ 80 L 900 sqft", "https://a.com/1"),
+            _result("2 BHK in Baner, Pune", "https://a.com/2"),
+            _result("3 BHK in Wakad, Pune ₹ 1.1 Cr 1300 sqft", "https://a.com/3"),
+        ]
+    )
+    assert len(store.find(location="baner,  PUNE")) == 2
+    assert [l["url"] for l in store.find(location="Baner, Pune", priced_only=True)] == ["https://a.com/1"]
+    assert len(store.find(bedrooms=3)) == 1
+
+
+def test_iter_comparables_pages_priced_listings(tmp_path):
+    store = ListingsStore(str(tmp_path / "l.db"))
+    store.ingest(
+        [
+            _result("2 BHK in Baner, Pune ₹ 80 L 900 sqft", "https://a.com/1"),
+            _result("2 BHK in Baner, Pune", "https://a.com/2"),
+            _result("3 BHK in Wakad, Pune ₹ 1.1 Cr 1300 sqft", "https://a.com/3"),
+            _result("1 BHK in Hinjewadi, Pune ₹ 45 L 600 sqft", "https://a.com/4"),
+        ]
+    )
+    pages = list(store.iter_comparables(limit=10, page_size=2))
+    assert [len(p) for p in pages] == [2, 1]
+    rows = {r["url"]: r for p in pages for r in p}
+    assert set(rows) == {"https://a.com/1", "https://a.com/3", "https://a.com/4"}
+    assert rows["https://a.com/3"] == {
+        "location": "Wakad, Pune",
+        "area": 1300,
+        "bedrooms": 3,
+        "bathrooms": 3,
+        "floor": 0,
+        "url": "https://a.com/3",
+        "value": 11_000_000,
+    }
+    assert sum(len(p) for p in store.iter_comparables(limit=2, page_size=10)) == 2
+
+
+def test_ingest_results_annotates_and_feeds_comparables():
+    results = [
+        _result("2 BHK in Baner, Pune ₹ 80 L 1000 sqft", "https://a.com/1"),
+        _result("Market news", "https://news.com/x"),
+    ]
+    out = listings.ingest_results(results)
+    assert out[0]["price"] == 8_000_000
+    assert out[0]["price_label"] == "₹ 80 L"
+    assert out[0]["area"] == 1000 and out[0]["bedrooms"] == 2
+    assert out[1]["price"] == 0 and out[1]["title"] == "Market news"
+
+    hits = comparables.get_index().query({"location": "Baner, Pune", "area": 1000, "bedrooms": 2})
+    assert [(h["source"], h["price_per_sqft"], h["url"]) for h in hits] == [
+        ("listing", 8000, "https://a.com/1")
+    ]
+    # Seen again: not indexed twice.
+    listings.ingest_results(results)
+    assert len(comparables.get_index()) == 1
@@ -0,0 +1,46 @@
+import re
+
+from reflex.compiler.compiler import compile_page, compile_stateful_components
+
+from app.states.loan_state import (
+    DEFAULT_INTEREST_RATE,
+    DEFAULT_LOAN_AMOUNT,
+    DEFAULT_TENURE_YEARS,
+    LoanState,
+)
+
+_STATE_REF = re.compile(r"\b(reflex___state____state__\w+)\.")
+_FUNCTION = re.compile(r"function (\w+) \(\) \{(.*?)\n\}\n", re.S)
+
+
+def _compile_loans_page() -> str:
+    import app.app
+
+    _, stateful_code, pages = compile_stateful_components([app.app.loans()], lambda: None)
+    _, page_code = compile_page("loans", pages[0])
+    return stateful_code + page_code
+
+
+def test_loans_page_declares_state_contexts_it_reads():
+    code = _compile_loans_page()
+    functions = _FUNCTION.findall(code)
+    assert functions
+    for name, body in functions:
+        for state in set(_STATE_REF.findall(body)):
+            assert f"const {state} = useContext(" in body, (name, state)
+    # The client-side slider values start from literals, not state Vars.
+    assert "useState(reflex___state" not in code
+    assert f"useState({DEFAULT_LOAN_AMOUNT})" in code
+    assert f"useState({DEFAULT_TENURE_YEARS})" in code
+    assert f"useState({DEFAULT_INTEREST_RATE})" in code
+    assert "onPointerUp" in code and "onMouseUp" not in code
+
+
+def test_sync_emi_inputs_pushes_session_values():
+    state = LoanState(_reflex_internal_init=True)
+    state.loan_amount = 4500000
+    events = LoanState.sync_emi_inputs.fn(state)
+    scripts = [str(e) for e in events]
+    assert len(scripts) == 3
+    assert "setLoanamount" in scripts[0] and "4500000" in scripts[0]
+    assert "setTenureyears" in scripts[1] and "setInterestrate" in scripts[2]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from app.services.loan_engine import Scenario, amortize, emi, yearly_totals
+
+
+def _loop_schedule(P, annual_rate, n, scenario):
+    """Reference month-by-month loop."""
+    r = annual_rate / 12 / 100
+    base = emi(P, annual_rate, n)
+    balance = P
+    interest_total = 0.0
+    months = 0
+    for k in range(1, n + 1):
+        if balance <= 1e-6:
+            break
+        interest = balance * r
+        pay = base * (1 + scenario.step_up_pct / 100) ** ((k - 1) // 12)
+        pre = scenario.prepayments.get(k, 0.0)
+        if k % 12 == 0:
+            pre += scenario.annual_prepayment
+        due = balance + interest
+        outflow = min(pay + pre, due)
+        interest_total += interest
+        balance = due - outflow
+        months = k
+    return months, interest_total
+
+
+def test_emi_matches_closed_form_and_zero_rate():
+    assert emi(1_000_000, 8.0, 240) == pytest.approx(8364.40, abs=0.01)
+    assert emi(120_000, 0.0, 12) == 10_000
+
+
+def test_standard_schedule_amortizes_to_zero():
+    sched = amortize(1_000_000, 8.0, 240)
+    assert sched.tenure_months[0] == 240
+    assert sched.balance[0, -1] == 0
+    assert sched.principal.sum() == pytest.approx(1_000_000)
+    assert sched.total_paid[0] == pytest.approx(sched.emi * 240)
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        Scenario(name="Lump", prepayments={6: 200_000, 30: 100_000}),
+        Scenario(name="Annual", annual_prepayment=50_000),
+        Scenario(name="Step-up", step_up_pct=5.0),
+        Scenario(name="Both", annual_prepayment=25_000, step_up_pct=3.0),
+    ],
+)
+def test_scenarios_match_reference_loop(scenario):
+    sched = amortize(2_500_000, 8.5, 360, [Scenario(), scenario])
+    months, interest = _loop_schedule(2_500_000, 8.5, 360, scenario)
+    assert sched.tenure_months[1] == months
+    assert sched.total_interest[1] == pytest.approx(interest, rel=1e-9)
+    assert sched.total_interest[1] < sched.total_interest[0]
+    assert sched.principal[1].sum() == pytest.approx(2_500_000)
+
+
+def test_yearly_totals_shape_and_sums():
+    sched = amortize(1_000_000, 9.0, 150, [Scenario(), Scenario(step_up_pct=10)])
+    years = yearly_totals(sched)
+    assert years["interest"].shape == (2, 13)
+    np.testing.assert_allclose(years["interest"].sum(axis=1), sched.total_interest)
+    assert years["balance"][0, -1] == 0
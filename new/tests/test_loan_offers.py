@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+
+from app.services import loan_offers
+from app.services.errors import RateLimitError
+
+
+OFFERS_JSON = '{"loan_offers": [{"bank_name": "SBI", "interest_rate": "8.3%", "processing_fee": "0.35%"}]}'
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    loan_offers.reset_snapshot()
+    yield
+    loan_offers.reset_snapshot()
+
+
+def _mock_upstreams():
+    search = respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(200, json={"results": []})
+    )
+    extract = respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": OFFERS_JSON}}]}
+        )
+    )
+    return search, extract
+
+
+@respx.mock
+def test_concurrent_first_calls_share_one_refresh():
+    search, extract = _mock_upstreams()
+
+    async def burst():
+        return await asyncio.gather(
+            *(loan_offers.get_loan_offer_snapshot() for _ in range(5))
+        )
+
+    snapshots = asyncio.run(burst())
+    assert all(s is snapshots[0] for s in snapshots)
+    assert snapshots[0].offers[0]["bank_name"] == "SBI"
+    assert search.call_count == 1 and extract.call_count == 1
+
+
+@respx.mock
+def test_fresh_snapshot_served_without_upstream_calls():
+    search, _ = _mock_upstreams()
+    asyncio.run(loan_offers.refresh_snapshot())
+    snapshot = asyncio.run(loan_offers.get_loan_offer_snapshot())
+    assert not snapshot.is_stale()
+    assert search.call_count == 1
+
+
+@respx.mock
+def test_stale_snapshot_returned_immediately_and_revalidated(monkeypatch):
+    search, _ = _mock_upstreams()
+    loan_offers._snapshot = loan_offers.LoanOfferSnapshot(
+        offers=[{"bank_name": "Old"}], fetched_at=time.time() - 7200
+    )
+
+    async def read_then_settle():
+        snapshot = await loan_offers.get_loan_offer_snapshot()
+        await loan_offers.trigger_refresh()
+        return snapshot
+
+    snapshot = asyncio.run(read_then_settle())
+    assert snapshot.offers == [{"bank_name": "Old"}]
+    assert snapshot.is_stale()
+    assert search.call_count == 1
+    assert loan_offers.get_snapshot().offers[0]["bank_name"] == "SBI"
+
+
+@respx.mock
+def test_failed_refresh_keeps_previous_snapshot():
+    respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(429)
+    )
+    previous = loan_offers.LoanOfferSnapshot(offers=[], fetched_at=time.time() - 7200)
+    loan_offers._snapshot = previous
+    with pytest.raises(RateLimitError):
+        asyncio.run(loan_offers.refresh_snapshot())
+    assert loan_offers.get_snapshot() is previous
@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from app.services import metrics
+from app.services.errors import APIError, RateLimitError
+from app.services.metrics import ERRORS, EVENT_SECONDS, EVENTS_IN_FLIGHT, SERVICE_SECONDS, Histogram
+from app.services.tavily_client import search_web
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    metrics.get_registry().reset()
+    yield
+    metrics.get_registry().reset()
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "test", ("fn",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.7, 3.0):
+        h.observe(v, fn="a")
+    lines = h.samples()
+    assert 't_seconds_bucket{fn="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{fn="a",le="1"} 3' in lines
+    assert 't_seconds_bucket{fn="a",le="+Inf"} 4' in lines
+    assert 't_seconds_count{fn="a"} 4' in lines
+    assert 't_seconds_sum{fn="a"} 4.25' in lines
+
+
+def test_histogram_quantiles_interpolate_within_bucket():
+    h = Histogram("q_seconds", "test", buckets=(0.1, 0.2, 0.5, 1.0))
+    for _ in range(90):
+        h.observe(0.15)
+    for _ in range(10):
+        h.observe(0.8)
+    assert h.quantile(0.5) == pytest.approx(0.1 + 0.1 * 50 / 90)
+    assert 0.5 < h.quantile(0.95) <= 1.0
+    assert h.quantile(0.99) == pytest.approx(0.5 + 0.5 * 9 / 10)
+    assert Histogram("empty", "x").quantile(0.5) is None
+
+
+def test_label_values_are_escaped():
+    c = metrics.Counter("c_total", "test", ("name",))
+    c.inc(name='a"b\\c\nd')
+    assert c.samples() == ['c_total{name="a\\"b\\\\c\\nd"} 1']
+
+
+def test_timed_records_sync_async_and_generators():
+    @metrics.timed
+    def plain(x):
+        return x * 2
+
+    @metrics.timed
+    async def coro(x):
+        return x + 1
+
+    @metrics.timed
+    def gen():
+        yield 1
+        yield 2
+
+    @metrics.timed
+    async def agen():
+        yield "a"
+        yield "b"
+
+    async def collect():
+        return [x async for x in agen()]
+
+    assert plain(2) == 4
+    assert asyncio.run(coro(1)) == 2
+    assert list(gen()) == [1, 2]
+    assert asyncio.run(collect()) == ["a", "b"]
+    prefix = "test_metrics."
+    for name in ("plain", "coro", "gen", "agen"):
+        qual = f"test_timed_records_sync_async_and_generators.<locals>.{name}"
+        assert SERVICE_SECONDS.count(function=prefix + qual) == 1
+
+
+def test_errors_are_counted_by_class():
+    @metrics.timed_event
+    async def handler(fail):
+        raise fail
+
+    for err in (APIError("x"), APIError("y"), RateLimitError("z")):
+        with pytest.raises(type(err)):
+            asyncio.run(handler(err))
+    name = handler.__qualname__
+    assert EVENT_SECONDS.count(handler=name) == 3
+    assert ERRORS.value(source=name, error="APIError") == 2
+    assert ERRORS.value(source=name, error="RateLimitError") == 1
+
+
+def test_in_flight_gauge_tracks_running_events():
+    seen = []
+
+    @metrics.timed_event
+    async def handler():
+        seen.append(EVENTS_IN_FLIGHT.total())
+        yield
+
+    async def run():
+        async for _ in handler():
+            pass
+
+    asyncio.run(run())
+    assert seen == [1]
+    assert EVENTS_IN_FLIGHT.total() == 0
+    assert "propmate_events_in_flight" in metrics.render()
+
+
+@respx.mock
+def test_upstream_calls_and_breaker_state_are_exported(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "1")
+    respx.post("https://api.tavily.com/search").mock(return_value=httpx.Response(503))
+    with pytest.raises(APIError):
+        search_web("q")
+    text = metrics.render()
+    assert 'propmate_service_duration_seconds_count{function="tavily_client.search_web"} 1' in text
+    assert 'propmate_errors_total{source="tavily_client.search_web",error="APIError"} 1' in text
+    assert (
+        'propmate_upstream_request_duration_seconds_count{upstream="tavily",outcome="APIError"} 1'
+        in text
+    )
+    assert 'propmate_circuit_state{upstream="tavily"} 0' in text
+
+
+def test_metrics_route_serves_prometheus_text():
+    api = Starlette(routes=[Route("/metrics", metrics.metrics_endpoint)])
+
+    async def scrape():
+        transport = httpx.ASGITransport(app=api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            return await client.get("/metrics")
+
+    resp = asyncio.run(scrape())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE propmate_service_duration_seconds histogram" in resp.text
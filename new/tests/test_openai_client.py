@@ -1,8 +1,16 @@
+import asyncio
+
 import pytest
 import respx
 import httpx
 
-from app.services.openai_client import generate_chat_reply, extract_loan_offers_from_tavily
+from app.services.openai_client import (
+    extract_loan_offers_from_tavily,
+    extract_loan_offers_from_tavily_async,
+    generate_chat_reply,
+    generate_chat_reply_async,
+    stream_chat_reply_async,
+)
 from app.services.errors import AuthenticationError, RateLimitError, APIError, ConfigError
 
 
@@ -95,4 +103,96 @@ def test_extract_loan_offers_rate_limit(monkeypatch):
         return_value=httpx.Response(429, json={"error": {"message": "rate limit"}})
     )
     with pytest.raises(RateLimitError):
-        extract_loan_offers_from_tavily([])
\ No newline at end of file
+        extract_loan_offers_from_tavily([])
+
+
+@respx.mock
+def test_openai_generate_async_success(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": "Async hello."}}]}
+        )
+    )
+    out = asyncio.run(generate_chat_reply_async("Hi"))
+    assert out == "Async hello."
+
+
+@respx.mock
+def test_openai_generate_async_auth_error(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(403, json={"error": {"message": "forbidden"}})
+    )
+    with pytest.raises(AuthenticationError):
+        asyncio.run(generate_chat_reply_async("Hi"))
+
+
+@respx.mock
+def test_extract_loan_offers_async_success(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"loan_offers": [{"bank_name": "Axis", "interest_rate": 8.75, "processing_fee": "1%"}]}'
+                        }
+                    }
+                ]
+            },
+        )
+    )
+    out = asyncio.run(extract_loan_offers_from_tavily_async([]))
+    assert out == [
+        {"bank_name": "Axis", "interest_rate": "8.75", "processing_fee": "1%"}
+    ]
+
+
+def _collect(agen):
+    async def run():
+        return [token async for token in agen]
+
+    return asyncio.run(run())
+
+
+@respx.mock
+def test_stream_chat_reply_yields_deltas(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    body = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        ": keep-alive\n\n"
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    route = respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200, content=body.encode(), headers={"Content-Type": "text/event-stream"}
+        )
+    )
+    assert _collect(stream_chat_reply_async("Hi")) == ["Hel", "lo"]
+    assert b'"stream":true' in route.calls.last.request.content.replace(b" ", b"")
+
+
+@respx.mock
+def test_stream_chat_reply_rate_limit(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(429, json={"error": {"message": "rate limit"}})
+    )
+    with pytest.raises(RateLimitError):
+        _collect(stream_chat_reply_async("Hi"))
+
+
+@respx.mock
+def test_openai_base_url_override(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:9000/v1/")
+    route = respx.post("http://127.0.0.1:9000/v1/chat/completions").mock(
+        return_value=httpx.Response(200, json={"choices": [{"message": {"content": "Local."}}]})
+    )
+    assert generate_chat_reply("Hi") == "Local."
+    assert route.called
@@ -0,0 +1,132 @@
+import asyncio
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from app.services import rate_limit
+from app.services.errors import RateLimitError
+from app.services.rate_limit import SQLiteTokenBucket, TokenBucket, acquire, acquire_async
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_allows_burst_then_reports_wait():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10.0, capacity=2, clock=clock)
+    bucket.try_acquire()
+    bucket.try_acquire()
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.1)]
+
+
+def test_sqlite_buckets_share_one_budget(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "rl.db")
+    a = SQLiteTokenBucket(path, "tavily", rate=1.0, capacity=2, clock=clock)
+    b = SQLiteTokenBucket(path, "tavily", rate=1.0, capacity=2, clock=clock)
+    other = SQLiteTokenBucket(path, "openai", rate=1.0, capacity=2, clock=clock)
+    assert a.try_acquire() == 0.0
+    assert b.try_acquire() == 0.0
+    assert a.try_acquire() == pytest.approx(1.0)
+    assert other.try_acquire() == 0.0
+    clock.now += 1.0
+    assert b.try_acquire() == 0.0
+    for bucket in (a, b, other):
+        bucket.close()
+
+
+def _drain(path: str, n: int, out) -> None:
+    bucket = SQLiteTokenBucket(path, "tavily", rate=0.001, capacity=10)
+    out.put(sum(1 for _ in range(n) if bucket.try_acquire() == 0.0))
+
+
+def test_sqlite_bucket_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "rl.db")
+    out = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_drain, args=(path, 8, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+    assert sum(out.get(timeout=5) for _ in procs) == 10
+
+
+def test_acquire_waits_for_a_token():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    acquire(bucket, timeout=1.0)
+    acquire(bucket, timeout=1.0)
+
+
+def test_acquire_raises_when_deadline_too_short():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    acquire(bucket, timeout=1.0)
+    with pytest.raises(RateLimitError) as info:
+        acquire(bucket, timeout=1.0)
+    assert info.value.retry_after == pytest.approx(10.0, rel=0.01)
+
+
+def test_acquire_async_raises_when_deadline_too_short():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+
+    async def run():
+        await acquire_async(bucket, timeout=1.0)
+        await acquire_async(bucket, timeout=1.0)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(run())
+
+
+def test_acquire_async_waits_for_sqlite_lock_off_the_loop(tmp_path):
+    path = str(tmp_path / "rl.db")
+    bucket = SQLiteTokenBucket(path, "tavily", rate=1.0, capacity=2)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    ticks = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.2, other.execute, "COMMIT")
+
+        async def tick():
+            while True:
+                ticks.append(loop.time())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await acquire_async(bucket, timeout=5.0)
+        ticker.cancel()
+
+    try:
+        asyncio.run(run())
+    finally:
+        other.close()
+        bucket.close()
+    # The loop kept running while another connection held the write lock.
+    assert len(ticks) >= 5
+
+
+def test_get_bucket_follows_settings(monkeypatch):
+    monkeypatch.setenv("PROPMATE_TAVILY_RATE_LIMIT", "0")
+    assert rate_limit.get_bucket("tavily") is None
+    monkeypatch.setenv("PROPMATE_OPENAI_RATE_LIMIT", "3")
+    monkeypatch.setenv("PROPMATE_RATE_LIMIT_DB", "")
+    bucket = rate_limit.get_bucket("openai")
+    assert isinstance(bucket, TokenBucket)
+    assert bucket.rate == 3.0
+    assert rate_limit.get_bucket("openai") is bucket
@@ -0,0 +1,326 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import repository
+from app.services.repository import (
+    AnalysisQuery,
+    AnalysisRepository,
+    MongoBackend,
+    SQLiteBackend,
+    open_backend,
+)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def skip(self, n):
+        self.docs = self.docs[n:]
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __iter__(self):
+        project = getattr(self, "project", dict)
+        return iter([project(d) for d in self.docs])
+
+
+class FakeCollection:
+    """Just enough of the pymongo Collection API for MongoBackend."""
+
+    def __init__(self):
+        self.docs = []
+        self.indexes = []
+        self.insert_calls = 0
+
+    def create_index(self, keys):
+        self.indexes.append(keys)
+
+    def insert_many(self, docs, ordered=True):
+        self.insert_calls += 1
+        for d in docs:
+            d["_id"] = len(self.docs)
+            self.docs.append(d)
+
+    def _match(self, doc, flt):
+        for key, cond in flt.items():
+            if isinstance(cond, dict):
+                if "$gte" in cond and not doc[key] >= cond["$gte"]:
+                    return False
+                if "$lte" in cond and not doc[key] <= cond["$lte"]:
+                    return False
+            elif doc[key] != cond:
+                return False
+        return True
+
+    @staticmethod
+    def _project(doc, projection):
+        if not projection:
+            return dict(doc)
+        included = [k for k, v in projection.items() if v]
+        if not included:
+            return {k: v for k, v in doc.items() if projection.get(k) != 0}
+        out = {}
+        for key in included:
+            top, _, sub = key.partition(".")
+            if top not in doc:
+                continue
+            if sub:
+                if sub in doc[top]:
+                    out.setdefault(top, {})[sub] = doc[top][sub]
+            else:
+                out[top] = doc[top]
+        if projection.get("_id") != 0:
+            out["_id"] = doc["_id"]
+        return out
+
+    def find(self, flt, projection=None):
+        # Sorting needs created_at even when the projection drops it.
+        docs = [d for d in self.docs if self._match(d, flt)]
+        cursor = FakeCursor(docs)
+        cursor.project = lambda d: self._project(d, projection)
+        return cursor
+
+    def count_documents(self, flt):
+        return sum(1 for d in self.docs if self._match(d, flt))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _entry(location, bedrooms, area):
+    return {"location": location, "bedrooms": bedrooms, "area": area, "tavily_results": []}
+
+
+@pytest.fixture(params=["sqlite", "mongo"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        b = SQLiteBackend(str(tmp_path / "analyses.db"))
+    else:
+        b = MongoBackend(FakeCollection())
+    yield b
+    b.close()
+
+
+def test_history_is_paged_newest_first_per_session(backend):
+    clock = Clock()
+    repo = AnalysisRepository(backend, batch_size=100, clock=clock)
+    for i in range(5):
+        clock.now += 1
+        repo.add("s1", [_entry("Pune", 2, 1000 + i)], [5_000_000])
+    repo.add("s2", [_entry("Pune", 2, 1)], [1])
+
+    assert repo.count(AnalysisQuery(session="s1")) == 5
+    assert [e["area"] for e in repo.history("s1", 0, 2)] == [1004, 1003]
+    assert [e["area"] for e in repo.history("s1", 4, 2)] == [1000]
+    assert repo.history("missing") == []
+
+
+def test_entries_from_one_call_keep_their_order(backend):
+    repo = AnalysisRepository(backend, clock=Clock())
+    repo.add("s", [_entry("Pune", 2, a) for a in (1, 2, 3)], [1, 2, 3])
+    assert [e["area"] for e in repo.history("s")] == [3, 2, 1]
+
+
+def test_iter_comparables_reads_newest_in_pages(backend):
+    clock = Clock()
+    repo = AnalysisRepository(backend, clock=clock)
+    for i in range(5):
+        clock.now += 1
+        entry = {**_entry("Baner, Pune", 2, 1000 + i), "bathrooms": 2, "floor": i}
+        repo.add("s", [entry], [5_000_000 + i])
+    pages = list(repo.iter_comparables(limit=4, page_size=3))
+    assert [len(p) for p in pages] == [3, 1]
+    assert pages[0][0] == {
+        "location": "Baner, Pune",
+        "area": 1004,
+        "bedrooms": 2,
+        "bathrooms": 2,
+        "floor": 4,
+        "value": 5_000_004,
+    }
+    assert [r["area"] for p in pages for r in p] == [1004, 1003, 1002, 1001]
+    assert list(repo.iter_comparables(limit=0)) == []
+
+
+def test_find_filters_and_compare(backend):
+    clock = Clock()
+    repo = AnalysisRepository(backend, clock=clock)
+    repo.add(
+        "s",
+        [
+            _entry("Koramangala, Bangalore", 3, 1200),
+            _entry("koramangala bangalore", 3, 1300),
+            _entry("Koramangala, Bangalore", 3, 2000),
+            _entry("Koramangala, Bangalore", 2, 1200),
+            _entry("Pune", 3, 1200),
+        ],
+        [12_000_000, 14_000_000, 30_000_000, 9_000_000, 7_000_000],
+    )
+    rows = repo.find(AnalysisQuery(location="KORAMANGALA,  Bangalore", bedrooms=3))
+    assert sorted(r["area"] for r in rows) == [1200, 1300, 2000]
+    assert repo.count(AnalysisQuery(min_area=1250, max_area=2000)) == 2
+    assert repo.count(AnalysisQuery(since=clock.now + 1)) == 0
+
+    summary = repo.compare("Koramangala, Bangalore", 3, 1250, tolerance=0.1)
+    assert summary["count"] == 2
+    assert summary["median_value"] == 13_000_000
+    assert summary["min_value"] == 12_000_000
+    assert summary["max_value"] == 14_000_000
+    assert repo.compare("Nowhere", 3, 1000)["count"] == 0
+
+
+def test_writes_are_batched():
+    collection = FakeCollection()
+    clock = Clock()
+    repo = AnalysisRepository(
+        MongoBackend(collection), batch_size=3, flush_interval=60, clock=clock
+    )
+    assert not repo.flush_due()
+    repo.add("s", [_entry("Pune", 2, 1)], [1])
+    repo.add("s", [_entry("Pune", 2, 2)], [1])
+    assert not repo.flush_due()
+    repo.add("s", [_entry("Pune", 2, 3)], [1])
+    # add() only buffers; the flusher does the write.
+    assert repo.flush_due() and collection.insert_calls == 0
+    assert repo.flush() == 3 and collection.insert_calls == 1
+
+    repo.add("s", [_entry("Pune", 2, 4)], [1])
+    assert not repo.flush_due()
+    clock.now += 61
+    assert repo.flush_due()
+
+
+def test_flusher_writes_due_batches(monkeypatch):
+    collection = FakeCollection()
+    repo = AnalysisRepository(MongoBackend(collection), batch_size=2, clock=Clock())
+    monkeypatch.setattr(repository, "_repository", repo)
+
+    async def run():
+        task = asyncio.create_task(repository.run_flusher(interval=0.01))
+        repo.add("s", [_entry("Pune", 2, 1), _entry("Pune", 2, 2)], [1, 1])
+        for _ in range(100):
+            if collection.insert_calls:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert collection.insert_calls == 1 and len(collection.docs) == 2
+
+
+def test_reads_flush_pending_writes():
+    collection = FakeCollection()
+    repo = AnalysisRepository(MongoBackend(collection), batch_size=100, clock=Clock())
+    repo.add("s", [_entry("Pune", 2, 1)], [1])
+    assert collection.docs == []
+    assert repo.history("s") == [_entry("Pune", 2, 1)]
+
+
+def test_add_does_not_wait_for_a_slow_write():
+    class Slow(FakeCollection):
+        def __init__(self):
+            super().__init__()
+            self.entered = threading.Event()
+            self.release = threading.Event()
+
+        def insert_many(self, docs, ordered=True):
+            self.entered.set()
+            assert self.release.wait(5)
+            super().insert_many(docs, ordered)
+
+    collection = Slow()
+    repo = AnalysisRepository(MongoBackend(collection), batch_size=100, clock=Clock())
+    repo.add("s", [_entry("Pune", 2, 1)], [1])
+    flusher = threading.Thread(target=repo.flush)
+    flusher.start()
+    assert collection.entered.wait(5)
+    t0 = time.monotonic()
+    repo.add("s", [_entry("Pune", 2, 2)], [1])
+    assert time.monotonic() - t0 < 1.0
+    collection.release.set()
+    flusher.join(5)
+    assert len(collection.docs) == 1
+    assert repo.count() == 2
+
+
+def test_failed_flush_keeps_records():
+    class Flaky(FakeCollection):
+        fail = True
+
+        def insert_many(self, docs, ordered=True):
+            if self.fail:
+                raise RuntimeError("down")
+            super().insert_many(docs, ordered)
+
+    collection = Flaky()
+    repo = AnalysisRepository(MongoBackend(collection), batch_size=100, clock=Clock())
+    repo.add("s", [_entry("Pune", 2, 1)], [1])
+    with pytest.raises(RuntimeError):
+        repo.flush()
+    collection.fail = False
+    assert repo.flush() == 1
+    assert repo.count() == 1
+
+
+def test_sqlite_queries_use_indexes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "analyses.db"))
+    conn = backend._conn
+    for query in (
+        AnalysisQuery(session="s"),
+        AnalysisQuery(location="Pune", bedrooms=2, min_area=900, max_area=1100),
+        AnalysisQuery(min_area=900),
+        AnalysisQuery(since=0.0),
+    ):
+        where, params = backend._where(query)
+        plan = " ".join(
+            str(r[-1])
+            for r in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM analyses{where}", params
+            )
+        )
+        assert "USING INDEX" in plan, plan
+    backend.close()
+
+
+def test_mongo_backend_creates_indexes():
+    collection = FakeCollection()
+    MongoBackend(collection)
+    assert [("locality", 1), ("bedrooms", 1), ("area", 1)] in collection.indexes
+    assert [("session", 1), ("created_at", -1)] in collection.indexes
+
+
+def test_open_backend_and_settings(monkeypatch, tmp_path):
+    with pytest.raises(ValueError):
+        open_backend("postgres://x")
+
+    monkeypatch.setenv("PROPMATE_ANALYSIS_DB_URL", f"sqlite:///{tmp_path / 'a.db'}")
+    monkeypatch.setenv("PROPMATE_ANALYSIS_BATCH_SIZE", "7")
+    repository.reset_repository()
+    try:
+        repo = repository.get_repository()
+        assert isinstance(repo.backend, SQLiteBackend)
+        assert repo.batch_size == 7
+        assert repository.get_repository() is repo
+    finally:
+        repository.reset_repository()
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from app.services import search_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.delenv("PROPMATE_SEARCH_CACHE_DB", raising=False)
+    search_cache.reset_cache()
+    yield
+    search_cache.reset_cache()
+
+
+def _mock_search():
+    return respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(
+            200, json={"results": [{"title": "A", "content": "c", "url": "https://a"}]}
+        )
+    )
+
+
+def test_normalize_query_equivalent_phrasings():
+    a = search_cache.normalize_query("3BHK in Koramangala, Bangalore around ₹ 12,600,000")
+    b = search_cache.normalize_query("  3 bhk in koramangala bangalore around Rs 12600000 ")
+    assert a == b == "3 bhk in koramangala bangalore around ₹12600000"
+
+
+@respx.mock
+def test_repeated_query_served_from_memory():
+    route = _mock_search()
+    first = search_cache.search_web_cached("2 BHK in Pune")
+    second = search_cache.search_web_cached("2bhk in pune")
+    assert first == second
+    assert route.call_count == 1
+    stats = search_cache.cache_stats()["memory"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+@respx.mock
+def test_disk_tier_survives_reset(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROPMATE_SEARCH_CACHE_DB", str(tmp_path / "search.db"))
+    route = _mock_search()
+    search_cache.search_web_cached("1 BHK in Goa")
+    search_cache.reset_cache()
+    out = asyncio.run(search_cache.search_web_cached_async("1 BHK in Goa"))
+    assert out[0]["url"] == "https://a"
+    assert route.call_count == 1
+    assert search_cache.cache_stats()["disk"]["hits"] == 1
+
+
+@respx.mock
+def test_pruner_deletes_expired_disk_rows(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROPMATE_SEARCH_CACHE_DB", str(tmp_path / "search.db"))
+    monkeypatch.setenv("PROPMATE_SEARCH_CACHE_TTL", "0.01")
+    _mock_search()
+    asyncio.run(search_cache.search_web_cached_async("1 BHK in Goa"))
+
+    async def run():
+        task = asyncio.create_task(search_cache.run_cache_pruner(interval=0.02))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if search_cache.cache_stats()["disk"]["evictions"]:
+                break
+        task.cancel()
+
+    asyncio.run(run())
+    assert search_cache.cache_stats()["disk"]["evictions"] == 1
+    assert search_cache.prune_cache() == 0
+
+
+@respx.mock
+def test_errors_are_not_cached(monkeypatch):
+    monkeypatch.setenv("PROPMATE_RETRY_MAX_ATTEMPTS", "1")
+    route = respx.post("https://api.tavily.com/search").mock(
+        side_effect=[httpx.Response(500), httpx.Response(200, json={"results": []})]
+    )
+    with pytest.raises(Exception):
+        search_cache.search_web_cached("q")
+    assert search_cache.search_web_cached("q") == []
+    assert route.call_count == 2
@@ -18,4 +18,32 @@ def test_get_openai_api_key_present(monkeypatch):
 
 def test_get_tavily_base_url_default(monkeypatch):
     monkeypatch.delenv("TAVILY_BASE_URL", raising=False)
-    assert settings.get_tavily_base_url() == "https://api.tavily.com"
\ No newline at end of file
+    assert settings.get_tavily_base_url() == "https://api.tavily.com"
+
+
+def test_get_openai_base_url_default(monkeypatch):
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    assert settings.get_openai_base_url() == "https://api.openai.com/v1"
+
+
+def test_frozen_settings_ignore_later_env_changes(monkeypatch):
+    monkeypatch.setenv("PROPMATE_SEARCH_CACHE_TTL", "60")
+    settings.freeze_settings()
+    try:
+        monkeypatch.setenv("PROPMATE_SEARCH_CACHE_TTL", "5")
+        assert settings.get_search_cache_ttl() == 60
+    finally:
+        settings.thaw_settings()
+    assert settings.get_search_cache_ttl() == 5
+
+
+def test_freeze_settings_rejects_invalid_values(monkeypatch):
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "offline")
+    monkeypatch.setenv("PROPMATE_SHUTDOWN_GRACE", "soon")
+    with pytest.raises(ConfigError) as exc:
+        settings.freeze_settings()
+    assert "PROPMATE_UPSTREAM_MODE" in str(exc.value)
+    assert "PROPMATE_SHUTDOWN_GRACE='soon'" in str(exc.value)
+    # Nothing was frozen.
+    monkeypatch.setenv("PROPMATE_UPSTREAM_MODE", "replay")
+    assert settings.get_upstream_mode() == "replay"
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+import respx
+
+from app.services import singleflight
+from app.services.errors import RateLimitError
+from app.services.singleflight import SingleFlight, request_key
+from app.services.tavily_client import search_web, search_web_async
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    singleflight.reset_flight_stats()
+    yield
+    singleflight.reset_flight_stats()
+
+
+def test_request_key_is_canonical():
+    a = request_key("tavily", "u", {"query": "x", "max_results": 3})
+    b = request_key("tavily", "u", {"max_results": 3, "query": "x"})
+    assert a == b
+    assert a != request_key("openai", "u", {"query": "x", "max_results": 3})
+
+
+def test_sync_callers_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {"ok": True}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait(2)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)
+    ]
+    for t in followers:
+        t.start()
+    while flight.stats.coalesced < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(2)
+
+    assert calls == [1]
+    assert results == [{"ok": True}] * 5
+    assert flight.stats.as_dict() == {"calls": 5, "executions": 1, "coalesced": 4}
+    # Not cached: the next call runs again.
+    release.set()
+    flight.do("k", work)
+    assert len(calls) == 2
+
+
+def test_sync_error_reaches_every_caller():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(2)
+        raise RateLimitError("slow down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fail)
+        except RateLimitError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(2)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while flight.stats.coalesced < 1:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert len(errors) == 2
+
+
+def test_async_callers_share_one_call_and_survive_cancellation():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("k", work))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(flight.do_async("k", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(*rest)
+
+    assert asyncio.run(main()) == [42, 42, 42]
+    assert calls == [1]
+    assert flight.stats.coalesced == 3
+
+
+def test_async_error_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RateLimitError("slow down")
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.do_async("k", fail) for _ in range(3)], return_exceptions=True
+        )
+
+    out = asyncio.run(main())
+    assert all(isinstance(e, RateLimitError) for e in out)
+    assert flight.stats.executions == 1
+
+
+@respx.mock
+def test_concurrent_identical_searches_make_one_request(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"results": [{"title": "A", "content": "c", "url": "u"}]})
+
+    route = respx.post("https://api.tavily.com/search").mock(side_effect=slow)
+
+    async def main():
+        return await asyncio.gather(*[search_web_async("3BHK Pune") for _ in range(5)])
+
+    out = asyncio.run(main())
+    assert route.call_count == 1
+    assert all(r == out[0] for r in out)
+    assert singleflight.flight_stats()["coalesced"] == 4
+
+
+@respx.mock
+def test_sync_search_still_works(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(200, json={"results": []})
+    )
+    assert search_web("x") == []
+    assert singleflight.flight_stats() == {"calls": 1, "executions": 1, "coalesced": 0}
@@ -1,9 +1,11 @@
+import asyncio
+
 import pytest
 import respx
 import httpx
 
-from app.services.tavily_client import search_web
-from app.services.errors import AuthenticationError, RateLimitError, ConfigError
+from app.services.tavily_client import search_web, search_web_async
+from app.services.errors import APIError, AuthenticationError, RateLimitError, ConfigError
 
 
 @respx.mock
@@ -51,4 +53,27 @@ def test_tavily_rate_limit(monkeypatch):
 def test_tavily_missing_key(monkeypatch):
     monkeypatch.delenv("TAVILY_API_KEY", raising=False)
     with pytest.raises(ConfigError):
-        search_web("test")
\ No newline at end of file
+        search_web("test")
+
+
+@respx.mock
+def test_tavily_search_async_success(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(
+            200,
+            json={"results": [{"source": "B", "snippet": "Flat", "url": "https://example.com/b"}]},
+        )
+    )
+    out = asyncio.run(search_web_async("2BHK in Pune"))
+    assert out == [{"title": "B", "content": "Flat", "url": "https://example.com/b"}]
+
+
+@respx.mock
+def test_tavily_search_async_timeout(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    respx.post("https://api.tavily.com/search").mock(
+        side_effect=httpx.ConnectTimeout("timed out")
+    )
+    with pytest.raises(APIError):
+        asyncio.run(search_web_async("test"))
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from app.services import tracing
+from app.services.tavily_client import search_web
+from app.services.tracing import JSONLExporter, span, traceparent
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("PROPMATE_TRACE_FILE", str(path))
+    tracing.reset_exporter()
+    yield path
+    tracing.reset_exporter()
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_spans_nest_and_export_when_root_ends(trace_file):
+    with span("root", user="u1") as root:
+        with span("child") as child:
+            child.set(rows=3)
+        assert not trace_file.exists()
+    spans = {s["name"]: s for s in _read(trace_file)}
+    assert spans["child"]["parent_id"] == root.span_id
+    assert spans["child"]["trace_id"] == spans["root"]["trace_id"] == root.trace_id
+    assert spans["root"]["parent_id"] is None
+    assert spans["child"]["attributes"] == {"rows": 3}
+    assert spans["root"]["attributes"] == {"user": "u1"}
+
+
+def test_errors_mark_the_span(trace_file):
+    with pytest.raises(ValueError):
+        with span("root"):
+            raise ValueError("boom")
+    (root,) = _read(trace_file)
+    assert root["status"] == "error"
+    assert root["error"] == "ValueError"
+
+
+def test_fast_traces_are_not_exported(tmp_path):
+    path = tmp_path / "t.jsonl"
+    exporter = JSONLExporter(str(path), min_duration_ms=50)
+    fast = tracing.Span("fast", None, {})
+    fast.end = fast.start + 0.001
+    exporter.on_end(fast)
+    slow = tracing.Span("slow", None, {})
+    child = tracing.Span("child", slow, {})
+    child.end = child.start
+    exporter.on_end(child)
+    slow.end = slow.start + 0.2
+    exporter.on_end(slow)
+    assert [s["name"] for s in _read(path)] == ["child", "slow"]
+    # Spans ending after their exported root are appended directly.
+    late = tracing.Span("late", slow, {})
+    late.end = late.start
+    exporter.on_end(late)
+    assert _read(path)[-1]["name"] == "late"
+
+
+def test_async_tasks_inherit_the_current_span(trace_file):
+    async def work():
+        with span("task"):
+            await asyncio.sleep(0)
+
+    async def main():
+        with span("root") as root:
+            await asyncio.gather(work(), work())
+        return root
+
+    root = asyncio.run(main())
+    tasks = [s for s in _read(trace_file) if s["name"] == "task"]
+    assert len(tasks) == 2
+    assert all(s["parent_id"] == root.span_id for s in tasks)
+
+
+def test_traceparent_format():
+    assert traceparent() is None
+    with span("root") as root:
+        assert traceparent() == f"00-{root.trace_id}-{root.span_id}-01"
+    assert traceparent() is None
+
+
+@respx.mock
+def test_outbound_requests_carry_traceparent(monkeypatch, trace_file):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    route = respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(200, json={"results": []})
+    )
+    with span("root") as root:
+        search_web("q")
+    header = route.calls.last.request.headers["traceparent"]
+    assert header.startswith(f"00-{root.trace_id}-")
+    attempt = next(s for s in _read(trace_file) if s["name"] == "tavily.request")
+    assert header == f"00-{root.trace_id}-{attempt['span_id']}-01"
+    assert attempt["parent_id"] == root.span_id
+
+
+@respx.mock
+def test_requests_outside_a_trace_start_one(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    route = respx.post("https://api.tavily.com/search").mock(
+        return_value=httpx.Response(200, json={"results": []})
+    )
+    search_web("q")
+    # The attempt span becomes the root.
+    assert route.calls.last.request.headers["traceparent"].startswith("00-")
@@ -0,0 +1,135 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+import respx
+
+from app.services.errors import APIError, AuthenticationError, RateLimitError
+from app.services.openai_client import generate_chat_reply_async
+from app.services.tavily_client import search_web
+from app.services.upstream import RetryPolicy, call, call_async, is_transient, parse_retry_after
+
+
+def _flaky(errors, result="ok"):
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return send, calls
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    err = APIError("x", retryable=True)
+    assert [policy.delay(n, err, rand=lambda: 1.0) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    assert policy.delay(3, err, rand=lambda: 0.25) == 1.0
+
+
+def test_retry_after_overrides_backoff():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    assert policy.delay(1, RateLimitError("x", retry_after=3.0)) == 3.0
+    assert policy.delay(1, RateLimitError("x", retry_after=60.0)) == 5.0
+
+
+def test_non_transient_errors_are_not_retried():
+    policy = RetryPolicy()
+    assert policy.delay(1, APIError("bad request")) is None
+    assert policy.delay(1, AuthenticationError("no")) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Headers({"Retry-After": "7"})) == 7.0
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "250"})) == 0.25
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= parse_retry_after(httpx.Headers({"Retry-After": date})) <= 30
+    assert parse_retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+
+
+def test_is_transient():
+    assert is_transient(408) and is_transient(500) and is_transient(503)
+    assert not is_transient(400) and not is_transient(404) and not is_transient(429)
+    assert parse_retry_after(httpx.Headers({})) is None
+
+
+def test_call_retries_transient_errors():
+    send, calls = _flaky([APIError("t", retryable=True), RateLimitError("r", retry_after=0)])
+    assert call("test", send, 5.0, RetryPolicy(base_delay=0)) == "ok"
+    assert len(calls) == 3
+
+
+def test_call_gives_up_after_max_attempts():
+    send, calls = _flaky([APIError("t", retryable=True)] * 5)
+    with pytest.raises(APIError):
+        call("test", send, 5.0, RetryPolicy(max_attempts=2, base_delay=0))
+    assert len(calls) == 2
+
+
+def test_call_does_not_sleep_past_deadline():
+    send, calls = _flaky([RateLimitError("r", retry_after=5.0)])
+    started = time.monotonic()
+    with pytest.raises(RateLimitError):
+        call("test", send, 5.0, RetryPolicy(max_delay=10.0, deadline=1.0))
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 1
+
+
+def test_attempt_timeout_is_bounded_by_deadline():
+    send, calls = _flaky([])
+    call("test", send, 15.0, RetryPolicy(deadline=2.0))
+    assert calls[0] <= 2.0
+
+
+def test_call_async_retries_transient_errors():
+    send, calls = _flaky([APIError("t", retryable=True)])
+
+    async def asend(timeout):
+        return send(timeout)
+
+    assert asyncio.run(call_async("test", asend, 5.0, RetryPolicy(base_delay=0))) == "ok"
+    assert len(calls) == 2
+
+
+@respx.mock
+def test_tavily_retries_after_429_and_503(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    route = respx.post("https://api.tavily.com/search").mock(
+        side_effect=[
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"results": [{"title": "A", "url": "https://a"}]}),
+        ]
+    )
+    assert search_web("q")[0]["url"] == "https://a"
+    assert route.call_count == 3
+
+
+@respx.mock
+def test_tavily_client_errors_are_not_retried(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    route = respx.post("https://api.tavily.com/search").mock(return_value=httpx.Response(400))
+    with pytest.raises(APIError):
+        search_web("q")
+    assert route.call_count == 1
+
+
+@respx.mock
+def test_openai_calls_are_rate_limited(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("PROPMATE_OPENAI_RATE_LIMIT", "0.01")
+    monkeypatch.setenv("PROPMATE_OPENAI_BURST", "1")
+    monkeypatch.setenv("PROPMATE_UPSTREAM_DEADLINE", "1")
+    route = respx.post("https://api.openai.com/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": "hi"}}]}
+        )
+    )
+    assert asyncio.run(generate_chat_reply_async("one")) == "hi"
+    with pytest.raises(RateLimitError):
+        asyncio.run(generate_chat_reply_async("two"))
+    assert route.call_count == 1
@@ -0,0 +1,81 @@
+import csv
+import random
+
+import numpy as np
+import pytest
+
+from app.services import valuation
+
+
+@pytest.fixture(autouse=True)
+def model_dir(monkeypatch, tmp_path):
+    root = tmp_path / "models"
+    monkeypatch.setenv("PROPMATE_VALUATION_MODEL_DIR", str(root))
+    valuation.reset_model()
+    yield root
+    valuation.reset_model()
+
+
+def _write_csv(path, n=300):
+    rng = random.Random(0)
+    rates = {"Koramangala, Bangalore": 14000, "Hinjewadi, Pune": 7000}
+    with open(path, "w", newline="") as fh:
+        w = csv.DictWriter(fh, fieldnames=["area", "bedrooms", "bathrooms", "floor", "location", "price"])
+        w.writeheader()
+        for _ in range(n):
+            loc = rng.choice(list(rates))
+            area = rng.randint(500, 2500)
+            rate = rates[loc] + rng.uniform(-300, 300)
+            w.writerow({"area": area, "bedrooms": rng.randint(1, 4), "bathrooms": 2,
+                        "floor": rng.randint(0, 20), "location": loc, "price": area * rate})
+        w.writerow({"area": "", "bedrooms": 2, "bathrooms": 2, "floor": 1, "location": "x", "price": 1})
+
+
+def test_falls_back_to_heuristic_without_model():
+    assert valuation.get_model() is None
+    assert valuation.estimate_value(1000, 3, 2, 5) == 1000 * (7500 + 500 + 400)
+
+
+def test_train_writes_versioned_artifact_and_predicts(model_dir, tmp_path):
+    pytest.importorskip("sklearn")
+    data = tmp_path / "train.csv"
+    _write_csv(data)
+    target = valuation.train(data)
+    assert (model_dir / "LATEST").read_text() == target.name
+
+    model = valuation.get_model()
+    assert model is not None and model.version == target.name
+    assert isinstance(model.coef, np.memmap)
+    assert model.metrics["rows"] == 300
+
+    rows = [
+        {"area": 1000, "bedrooms": 2, "bathrooms": 2, "floor": 3, "location": "Koramangala, Bangalore"},
+        {"area": 1000, "bedrooms": 2, "bathrooms": 2, "floor": 3, "location": "hinjewadi pune"},
+    ]
+    values = valuation.predict_many(rows)
+    assert values[0] == pytest.approx(14_000_000, rel=0.1)
+    assert values[1] == pytest.approx(7_000_000, rel=0.1)
+    assert valuation.estimate_value(**rows[0]) == int(values[0])
+
+
+def test_read_training_csv_skips_non_numeric_features(tmp_path):
+    data = tmp_path / "train.csv"
+    _write_csv(data, n=5)
+    with open(data, "a", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow([900, "two", 2, 1, "Hinjewadi, Pune", 6_300_000])
+        w.writerow([900, 2, "", "ground", "Hinjewadi, Pune", 6_300_000])
+        w.writerow([900, 2, 2, "nan", "Hinjewadi, Pune", 6_300_000])
+        w.writerow([900, 2, "", "", "Hinjewadi, Pune", 6_300_000])
+    numeric, buckets, rates = valuation.read_training_csv(data)
+    assert numeric.shape == (6, len(valuation.NUMERIC_FEATURES))
+    assert len(buckets) == len(rates) == 6
+    assert list(numeric[-1]) == [900.0, 2.0, 0.0, 0.0]
+
+
+def test_train_rejects_tiny_csv(tmp_path):
+    pytest.importorskip("sklearn")
+    data = tmp_path / "tiny.csv"
+    _write_csv(data, n=3)
+    with pytest.raises(ValueError):
+        valuation.train(data)